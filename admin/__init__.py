@@ -1,7 +1,5 @@
 """Administrator client for go-hcit servers."""
-import requests
-
-from golab_common import raise_err
+from golab_common import raise_err, codec, transport
 
 
 def lock(address_holder):
@@ -14,7 +12,7 @@ def lock(address_holder):
         of its "root"
 
     """
-    resp = requests.post(f'{address_holder.addr}/lock', json={'bool': True})
+    resp = transport.post(f'{address_holder.addr}/lock', json=codec.TRUE)
     raise_err(resp)
     return
 
@@ -29,6 +27,6 @@ def unlock(address_holder):
         of its "root"
 
     """
-    resp = requests.post(f'{address_holder.addr}/lock', json={'bool': False})
+    resp = transport.post(f'{address_holder.addr}/lock', json=codec.FALSE)
     raise_err(resp)
     return
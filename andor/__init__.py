@@ -5,20 +5,16 @@
 # in that circumstance, Camera will be re-exported
 # as SDK3Cam to maintain backwards compatible.
 
+import logging
 import numbers
 from io import BytesIO
 
-from astropy import units as u
-from astropy.io import fits
+# astropy and imageio are imported where they are used; together they take
+# longer to import than everything else a short-lived script needs.  So are
+# asyncio and concurrent.futures, which the synchronous clients rarely need
+from golab_common import raise_err, niceaddr, is_quantity, endpoints, codec, transport, aio
 
-try:
-    from imageio import imread
-except ImportError:
-    pass  # non-fits formats are optional
-
-import requests
-
-from golab_common import raise_err, niceaddr
+from .group import CameraGroup, Shot  # noqa: F401
 
 
 def proces_exposure_time(t):
@@ -40,7 +36,7 @@ def proces_exposure_time(t):
         wrong input type
 
     """
-    if isinstance(t, u.Quantity):
+    if is_quantity(t):
         # user wants to manage their own units
         t = str(t).replace(" ", "")
     elif isinstance(t, numbers.Number):
@@ -85,12 +81,12 @@ class Recorder:
         """
         url = f'{self.addr}/autowrite/root'
         if srvpath is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
             payload = {'str': srvpath}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     def prefix(self, string=None):
@@ -109,12 +105,12 @@ class Recorder:
         """
         url = f'{self.addr}/autowrite/prefix'
         if string is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
             payload = {'str': string}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     def enabled(self, boolean=None):
@@ -133,18 +129,26 @@ class Recorder:
         """
         url = f'{self.addr}/autowrite/enabled'
         if boolean is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
             payload = {'bool': boolean}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
 
 class Camera:
     """Camera is a wrapper around a camera from andor SDK3 v3 through go-hcit."""
 
+    # TTLs, seconds, for golab_common.cache.enable; these only change when a setter is called
+    cache_ttls = {
+        '/feature': 300,
+        '/feature/{feature}/options': 300,
+        '/temperature-setpoint-options': 300,
+        '/em-gain-range': 300,
+    }
+
     def __init__(self, addr, time_convention='float'):
         """Create a new Camera instance.
 
@@ -161,13 +165,27 @@ class Camera:
         self.addr = niceaddr(addr)
         self.time_convention = time_convention
         self.recorder = Recorder(addr)
+        self._frame_shape = None  # see frame_shape
+
+    def does_support(self, route):
+        """Return True if the server supports route, else False.
+
+        Parameters
+        ----------
+        route : str
+            route relative to the root address, e.g. /burst/setup or /feature/{feature}.
+            The server's routes are fetched once per process and shared, see
+            golab_common.endpoints
+
+        """
+        return endpoints.supports(self.addr, route)
 
     # generics
     def features(self):
         """Dictionary mapping feature names to strings representing their types."""
-        resp = requests.get(self.addr + "/feature")
+        resp = transport.get(self.addr + "/feature", root=self.addr)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     def set_feature(self, feature, value):
         """Set the value of a feature on the camera.
@@ -182,7 +200,9 @@ class Camera:
         """
         url = f'{self.addr}/feature/{feature}'
         payload = {'value': value}
-        resp = requests.post(url, json=payload)
+        if _changes_shape(feature):
+            self._frame_shape = None
+        resp = transport.post(url, json=payload, route='/feature/{feature}', root=self.addr)
         raise_err(resp)
         return
 
@@ -200,12 +220,10 @@ class Camera:
             varies with the feature, see the values in the self.features dict
         """
         url = f'{self.addr}/feature/{feature}'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/feature/{feature}', root=self.addr)
         raise_err(resp)
-        d = resp.json()
-        keys = list(d.keys())
-        k = keys[0]
-        return d[k]
+        # the value is held under a key naming its type, e.g. {"int": 3}
+        return next(iter(codec.decode(resp).values()))
 
     def get_feature_info(self, feature):
         """Get the type and allowable range for a feature on the camera.
@@ -224,9 +242,102 @@ class Camera:
 
         """
         url = f'{self.addr}/feature/{feature}/options'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/feature/{feature}/options', root=self.addr)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
+
+    def _read_settings(self, features, workers):
+        """Values of the writable features among features, and the set of those found read-only."""
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(workers, thread_name_prefix='camera-settings') as pool:
+            infos = {name: pool.submit(self.get_feature_info, name) for name in features}
+            values = {name: pool.submit(self.get_feature, name) for name in features}
+
+        out, read_only = {}, set()
+        for name, fut in values.items():
+            info = infos[name].result() if infos[name].exception() is None else None
+            if not _writable(name, info):
+                read_only.add(name)
+            elif fut.exception() is None:
+                out[name] = fut.result()
+            else:
+                logging.warning(f'{self.addr}: could not read feature {name}: {fut.exception()}')
+        return out, read_only
+
+    def snapshot_settings(self, features=None, workers=8):
+        """Read the value of every writable feature, several at a time.
+
+        Features are writable if their options (get_feature_info) say so;
+        if the server does not, those in andor.READ_ONLY_FEATURES are not.
+
+        Parameters
+        ----------
+        features : iterable of str, optional
+            features to read, by default every feature in self.features.
+            Command and read-only features are skipped, as are features the
+            camera refuses to read (logged as a warning)
+        workers : int
+            number of requests in flight at once.  Keep at or below the pool
+            size of golab_common.transport
+
+        Returns
+        -------
+        dict
+            feature name => value.  See andor.disk.settings_cards to store it
+            in a FITS header
+
+        """
+        if features is None:
+            features = {k: v for k, v in self.features().items() if v != 'command'}
+        return self._read_settings(features, workers)[0]
+
+    def restore_settings(self, snapshot, workers=8):
+        """Set the camera's features to a snapshot_settings, writing only those which differ.
+
+        Features whose limits depend on others (andor.RESTORE_ORDER: the
+        shape, then readout, exposure time and frame rate) are written one at
+        a time in the order SDK3 requires, then the rest several at a time.
+        Read-only features in the snapshot are skipped.  Every feature is
+        tried even if some fail.
+
+        Parameters
+        ----------
+        snapshot : dict
+            feature name => value
+        workers : int
+            see snapshot_settings
+
+        Returns
+        -------
+        list of str
+            the features that were written
+
+        Raises
+        ------
+        RestoreError
+            if any feature could not be written, holding each one's error
+            and the features that were
+
+        """
+        current, read_only = self._read_settings(snapshot, workers)
+        changed = [k for k, v in snapshot.items() if k not in read_only and (k not in current or current[k] != v)]
+        ordered, rest = _restore_plan(changed)
+        errors = {}
+        for k in ordered:
+            try:
+                self.set_feature(k, snapshot[k])
+            except Exception as e:
+                errors[k] = e
+
+        if rest:
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(workers, thread_name_prefix='camera-settings') as pool:
+                futs = {k: pool.submit(self.set_feature, k, snapshot[k]) for k in rest}
+            errors.update((k, fut.exception()) for k, fut in futs.items() if fut.exception() is not None)
+        written = [k for k in ordered + rest if k not in errors]
+        if errors:
+            raise RestoreError(errors, written)
+        return written
 
     def exposure_time(self, t=None):
         """Get or set the exposure time.  If t=None, gets.  If t!=None, sets.
@@ -246,16 +357,17 @@ class Camera:
         """
         url = f'{self.addr}/exposure-time'
         if t is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            tsec = resp.json()['f64']
+            tsec = codec.unwrap(resp, 'f64')
             if self.time_convention == 'float':
                 return tsec
             else:
+                from astropy import units as u
                 return tsec * u.s
         else:
             t = proces_exposure_time(t)
-            resp = requests.post(url, params={'exposureTime': t})
+            resp = transport.post(url, params={'exposureTime': t}, root=self.addr)
             raise_err(resp)
             return
 
@@ -276,11 +388,12 @@ class Camera:
         """
         url = f'{self.addr}/aoi'
         if dict_ is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()
+            return codec.decode(resp)
         else:
-            resp = requests.post(url, json=dict_)
+            self._frame_shape = None
+            resp = transport.post(url, json=dict_, root=self.addr)
             raise_err(resp)
 
     def binning(self, fctr=None):
@@ -299,13 +412,14 @@ class Camera:
         """
         url = f'{self.addr}/binning'
         if fctr is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['h']  # keys are h,v but we are explicitly symmetric
+            return codec.unwrap(resp, 'h')  # keys are h,v but we are explicitly symmetric
 
         else:
+            self._frame_shape = None
             payload = {'h': fctr, 'v': fctr}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, root=self.addr)
             raise_err(resp)
 
     # thermal
@@ -324,11 +438,11 @@ class Camera:
         """
         url = f'{self.addr}/fan'
         if on is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
-            resp = requests.post(url, json={'bool': on})
+            resp = transport.post(url, json={'bool': on}, root=self.addr)
             raise_err(resp)
             return
 
@@ -348,19 +462,19 @@ class Camera:
         # the body of this is identical to self.fan() but with a different URL
         url = f'{self.addr}/sensor-cooling'
         if on is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
-            resp = requests.post(url, json={'bool': on})
+            resp = transport.post(url, json={'bool': on}, root=self.addr)
             raise_err(resp)
             return
 
     def temperature(self):
         """Current sensor temperature in Celcius."""
-        resp = requests.get(self.addr + "/temperature")
+        resp = transport.get(self.addr + "/temperature", root=self.addr)
         raise_err(resp)
-        return resp.json()['f64']
+        return codec.unwrap(resp, 'f64')
 
     def temperature_setpt(self, valueS=None):
         """Get (valueS=None) or set the current temperature setpoint.
@@ -385,29 +499,29 @@ class Camera:
         # the body of this is identical to self.fan() but with a different URL and typecode for json
         url = f'{self.addr}/temperature-setpoint'
         if valueS is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
-            resp = requests.post(url, json={'str': valueS})
+            resp = transport.post(url, json={'str': valueS}, root=self.addr)
             raise_err(resp)
             return
 
     def temperature_setpt_options(self):
         """Currently allowed temperature setpoint options."""
-        resp = requests.get(self.addr + '/temperature-setpoint-options')
+        resp = transport.get(self.addr + '/temperature-setpoint-options', root=self.addr)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     def cooling_status(self):
         """Current cooling status."""
-        resp = requests.get(self.addr + "/temperature-status")
+        resp = transport.get(self.addr + "/temperature-status", root=self.addr)
         raise_err(resp)
-        return resp.json()['str']
+        return codec.unwrap(resp, 'str')
 
     # imaging
 
-    def snap(self, exposure_time=None, fmt='fits', ret='array'):
+    def snap(self, exposure_time=None, fmt='fits', ret='array', ring=None):
         """Take an image and return something that depends on the arguments.
 
         Parameters
@@ -415,21 +529,29 @@ class Camera:
         exposure_time : str, numbers.Number, or astropy.units.Quantity
             something process_exposure_time can turn into the format expected
             by the server.  See help(andor.process_exposure_time).
-        fmt : str, {'fits', 'jpg', 'png'}, optional
+        fmt : str, {'fits', 'raw', 'jpg', 'png'}, optional
             the format to retrieve the image as.
-            If fits, the ret parameter is used, otherwise it is ignored.
+            If fits or raw, the ret parameter is used, otherwise it is ignored.
             Fit images are captured with 16-bit precision, other options are 8-bit.
+            raw is headerless little-endian uint16 of shape frame_shape(),
+            the fastest to decode; the array returned is a read-only view of
+            the response
         ret : str, {'array', 'hdu', 'file'}, optional
-            Only used if fmt='fits'.
+            Only used if fmt='fits' or 'raw'.  raw has no hdu, ValueError
+            is raised for it.
             If array, returns a numpy array
             If hdu, returns an astropy.io.fits.HDU object.  The user is
             responsible for closing it when finished.
+        ring : andor.ring.FrameRing, optional
+            Only used if ret='array'.  If given, the image is
+            decoded into a free slot of the ring, see Camera.frame_ring
 
         Returns
         -------
-        numpy.ndarray or astropy.io.fits.HDU
+        numpy.ndarray, astropy.io.fits.HDU, or andor.ring.Slot
             either an array holding the image data as uint8 or uint16,
             or an HDU object. Users must close the HDU object.
+            If ring is given, the slot holding the image, to be released
 
         """
         if exposure_time is None:
@@ -439,24 +561,33 @@ class Camera:
         exposure_time = proces_exposure_time(exposure_time)
 
         fmt = fmt.lower()
+        if fmt == 'raw' and ret == 'hdu':
+            raise ValueError("fmt='raw' has no hdu, use ret='array' or 'file'")
         params = {'exposureTime': exposure_time, 'fmt': fmt}
-        resp = requests.get(self.addr + "/image", params=params)
+        resp = transport.get(self.addr + "/image", params=params, root=self.addr)
         raise_err(resp)
         if fmt == 'fits':
             if ret == 'file':
                 return resp.content
-
-            hdu = fits.open(BytesIO(resp.content))
             if ret == 'array':
-                ary = hdu[0].data
-                hdu.close()
-                return ary
-            else:
-                return hdu
+                return _decode_fits(resp.content, ring=ring)
+
+            from astropy.io import fits
+            return fits.open(BytesIO(resp.content))
+        elif fmt == 'raw':
+            if ret == 'file':
+                return resp.content
+            shape = self.frame_shape()
+            if len(resp.content) != 2 * shape[0] * shape[1]:
+                # the AOI was changed some other way, e.g. by another client
+                shape = self.frame_shape(refresh=True)
+            return _decode_raw(resp.content, shape, ring)
         else:
+            from imageio import imread  # non-fits formats are optional
             return imread(resp.content, format=fmt)
 
-    def burst(self, frames, fps, serverSpool=0, downloads='each'):
+    def burst(self, frames, fps, serverSpool=0, downloads='each', prefetch=0, out=None, ring=None,
+              decode_pool=None):
         """Take a burst of images, returned as a generator of 2D arrays.
 
         Parameters
@@ -469,22 +600,42 @@ class Camera:
             size of the spool (in frames) to use on the server to buffer,
             if the client can't keep up.  If Zero, the spool size is set to
             frames*fps, which may cause out of memory errors.
-        downloads : str, optional, {'each', 'all'}
+        downloads : str, optional, {'each', 'all', 'stream'}
             flag for controlling how images are downlinked from the camera server.
             each downloads each frame one at a time.
             all downloads the entire burst in one transfer
-            The former allows concurrency between capture and processing, at the
+            stream downloads the entire burst in as few transfers as possible,
+            but yields each frame as soon as it has arrived
+            The first allows concurrency between capture and processing, at the
             cost of higher total transfer latency (n images x round trip added
-            to capture time).  The latter has lower total latency at the expense
-            of no concurrency.  'each' is suited to large sequences that would
-            exceed 2GB of data, a limit imposed by the cFITSIO for the client.
-
+            to capture time).  all has lower total latency at the expense
+            of no concurrency.  all and stream decode the response as it
+            arrives, straight into one array, so neither is limited to 2GB;
+            see andor.stream
+        prefetch : int, optional
+            only used if downloads == each.  If nonzero, the number of frames
+            downloaded and decoded at once on background threads, ahead of the
+            consumer; frames still arrive in order.  See andor.prefetch
+        out : numpy.ndarray, optional
+            only used if downloads is all or stream.  uint16 array of shape
+            (frames, height, width) to write the burst into, e.g. an np.memmap
+            for bursts that do not fit in memory
+        ring : andor.ring.FrameRing, optional
+            only used if downloads == each.  If given, frames are decoded into
+            its slots and yielded as andor.ring.Slot objects, which must be
+            released for the burst to go on.  See Camera.frame_ring
+        decode_pool : andor.procpool.DecodePool, optional
+            only used if downloads == each, instead of prefetch and ring.  If
+            given, frames are decoded on its worker processes and yielded as
+            andor.ring.Slot objects in shared memory, which must be released
 
         Returns
         -------
         generator
             if downloads == each, a generator yielding {frames} 2D ndarrays.
             if downloads == all, a generator yielding one 3D ndarray
+            if downloads == stream, a generator yielding {frames} 2D ndarrays,
+            views into one 3D array (out, if given)
 
             An exception may be raised while iterating it if one is encountered
             on the server.
@@ -496,19 +647,193 @@ class Camera:
             'frames': frames,
             'spool': serverSpool
         }
-        resp = requests.post(f'{self.addr}/burst/setup', json=payload)
+        resp = transport.post(f'{self.addr}/burst/setup', json=payload, root=self.addr)
         raise_err(resp)
         if downloads == 'each':
+            if decode_pool is not None:
+                yield from decode_pool.map(self._burst_bodies(frames))
+                return
+
+            from .decode import FrameDecoder
+            dec = FrameDecoder()  # every frame has the same header, parse it once
+            if prefetch:
+                from .prefetch import FramePrefetcher
+                yield from FramePrefetcher(f'{self.addr}/burst/frame', frames, prefetch, decoder=dec, ring=ring)
+                return
+
             for _ in range(frames):
-                resp = requests.get(f'{self.addr}/burst/frame')
+                resp = transport.get(f'{self.addr}/burst/frame', root=self.addr)
                 raise_err(resp)
-                hdu = fits.open(BytesIO(resp.content))
-                yield hdu[0].data
+                yield _decode_fits(resp.content, dec, ring)
         else:
-            resp = requests.get(f'{self.addr}/burst/all-frames')
-            raise_err(resp)
-            hdu = fits.open(BytesIO(resp.content))
-            yield hdu[0].data
+            from .stream import BurstStream
+            s = BurstStream(f'{self.addr}/burst/all-frames', frames, out)
+            if downloads == 'stream':
+                yield from s
+            else:
+                yield s.read()
+
+    def _burst_bodies(self, frames):
+        """Yield the raw response stream of each frame of a burst, to be read before the next."""
+        for _ in range(frames):
+            with transport.get(f'{self.addr}/burst/frame', stream=True, root=self.addr) as resp:
+                raise_err(resp)
+                yield resp.raw
+
+    def frame_shape(self, refresh=False):
+        """(height, width) of the frames the camera returns, from its AOI (in sensor pixels) and binning.
+
+        The result is cached until the AOI or binning is changed through this
+        object, or refresh is True.
+        """
+        if self._frame_shape is None or refresh:
+            aoi = self.aoi()
+            b = self.binning()
+            self._frame_shape = aoi['height'] // b, aoi['width'] // b
+        return self._frame_shape
+
+    def frame_ring(self, slots=8):
+        """A new andor.ring.FrameRing of slots frames of frame_shape(), for snap and burst."""
+        from .ring import FrameRing
+        return FrameRing(self.frame_shape(), slots)
+
+    def burst_to_disk(self, path, frames, fps, serverSpool=0, prefetch=4, header=None):
+        """Take a burst of images and write them to a cube on disk as they arrive.
+
+        Frames are downloaded as with burst(downloads='each', prefetch=prefetch)
+        and written by an andor.disk.BurstWriter, see there for the index of
+        frames written kept next to the file.
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            file to write, FITS unless it ends with .npy
+        frames : int
+            number of frames to take in the sequence
+        fps : float
+            framerate to use.  Ensure it is supported by the camera
+        serverSpool : int
+            see burst
+        prefetch : int
+            see burst
+        header : dict, optional
+            extra KEY => value cards for the FITS header, e.g.
+            andor.disk.settings_cards(self.snapshot_settings())
+
+        Returns
+        -------
+        andor.disk.BurstWriter
+            the closed writer, its offsets hold the byte offset of each frame
+
+        """
+        from .disk import BurstWriter
+
+        it = self.burst(frames, fps, serverSpool, prefetch=prefetch)
+        first = next(it)
+        with BurstWriter(path, frames, first.shape, header=header) as w:
+            w.write(first)
+            for frame in it:
+                w.write(frame)
+        return w
+
+    def burst_stats(self, frames, fps, serverSpool=0, prefetch=4):
+        """Take a burst of images and reduce it to per-pixel statistics without keeping the frames.
+
+        Frames are downloaded as with burst(downloads='each', prefetch=prefetch)
+        and folded into an andor.reduce.FrameStats as they arrive.
+
+        Parameters
+        ----------
+        frames : int
+            number of frames to take in the sequence
+        fps : float
+            framerate to use.  Ensure it is supported by the camera
+        serverSpool : int
+            see burst
+        prefetch : int
+            see burst
+
+        Returns
+        -------
+        andor.reduce.FrameStats
+            the statistics; mean, sum, min and max are attributes, variance() and std() methods
+
+        """
+        from .reduce import FrameStats
+        return FrameStats().update(self.burst(frames, fps, serverSpool, prefetch=prefetch))
+
+    def burst_metrics(self, frames, fps, serverSpool=0, prefetch=4, quicklook=None):
+        """Take a burst of images and reduce each frame to quick-look metrics, without keeping the frames.
+
+        Parameters
+        ----------
+        frames : int
+            number of frames to take in the sequence
+        fps : float
+            framerate to use.  Ensure it is supported by the camera
+        serverSpool : int
+            see burst
+        prefetch : int
+            see burst
+        quicklook : andor.quicklook.QuickLook, optional
+            the metrics to compute, by default QuickLook()
+
+        Returns
+        -------
+        numpy.recarray
+            one record per frame: index, sum, peak, saturated, cy, cx and hist
+
+        """
+        if quicklook is None:
+            from .quicklook import QuickLook
+            quicklook = QuickLook()
+        return quicklook.run(self.burst(frames, fps, serverSpool, prefetch=prefetch))
+
+    def sweep(self, settings, repeat=1, out=None):
+        """Take repeat frames at each of a list of settings, overlapping transfers with the next step.
+
+        Parameters
+        ----------
+        settings : iterable of dict
+            one dict per step of name => value, e.g. {'exposure_time': 0.1, 'em_gain': 10}.
+            Names are setters in andor.sweep.SETTERS or writable features, see andor.sweep.sweep
+        repeat : int
+            frames to take at each step
+        out : numpy.ndarray, optional
+            uint16 array of shape (steps * repeat, height, width) to write into
+
+        Returns
+        -------
+        andor.sweep.SweepResult
+            cube, the frames, and table, a record array of the settings and
+            timing of each frame
+
+        """
+        from .sweep import sweep
+        return sweep(self, settings, repeat, out)
+
+    def live(self, exposure_time=None, fmt='fits', period=0.):
+        """Start snapping continuously on a background thread, keeping only the latest frame.
+
+        Parameters
+        ----------
+        exposure_time : str, numbers.Number, or astropy.units.Quantity, optional
+            see snap.  If None, left alone
+        fmt : str, {'fits', 'raw', 'jpg', 'png'}
+            see snap
+        period : float
+            least seconds between snaps, 0 to snap as fast as possible
+
+        Returns
+        -------
+        andor.live.LiveView
+            the running view; latest() returns the newest frame, fps and
+            decode_time the rates achieved.  Stop it with stop() or use it in
+            a with block
+
+        """
+        from .live import LiveView
+        return LiveView(self, exposure_time, fmt, period).start()
 
     # this is EMCCD stuff
     def em_gain(self, fctr=None):
@@ -527,11 +852,11 @@ class Camera:
         """
         url = f'{self.addr}/em-gain'
         if fctr is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
         else:
-            resp = requests.post(url, json={'int': fctr})
+            resp = transport.post(url, json={'int': fctr}, root=self.addr)
             raise_err(resp)
 
     def em_gain_mode(self, mode=None):
@@ -550,18 +875,18 @@ class Camera:
         """
         url = f'{self.addr}/em-gain-mode'
         if mode is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
-            resp = requests.post(url, json={'str': mode})
+            resp = transport.post(url, json={'str': mode}, root=self.addr)
             raise_err(resp)
 
     def em_gain_range(self):
         """Min and max values for EM gain in the current configuration."""
-        resp = requests.get(f'{self.addr}/em-gain-range')
+        resp = transport.get(f'{self.addr}/em-gain-range', root=self.addr)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     # this is shutter control
     def shutter(self, open_=None):
@@ -580,11 +905,11 @@ class Camera:
         """
         url = f'{self.addr}/shutter'
         if open_ is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
-            resp = requests.post(url, json={'bool': open_})
+            resp = transport.post(url, json={'bool': open_}, root=self.addr)
             raise_err(resp)
 
     def shutter_auto(self, automatic=None):
@@ -605,11 +930,11 @@ class Camera:
         """
         url = f'{self.addr}/shutter-auto'
         if automatic is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
-            resp = requests.post(url, json={'bool': automatic})
+            resp = transport.post(url, json={'bool': automatic}, root=self.addr)
             raise_err(resp)
 
     def shutter_speed(self, texpS=None):
@@ -628,11 +953,11 @@ class Camera:
         """
         url = f'{self.addr}/shutter-speed'
         if texpS is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
-            resp = requests.post(url, json={'f64': texpS})
+            resp = transport.post(url, json={'f64': texpS}, root=self.addr)
             raise_err(resp)
 
 
@@ -659,3 +984,389 @@ class EMCCD(Camera):
                 raise ValueError("it's forbidden to set the TEC cooler than -25C.")
 
         return super().temeprature_setpt(valueS)
+
+
+def _decode_fits(content, decoder=None, ring=None):
+    """Decode a FITS frame or cube; decoder is an andor.decode.FrameDecoder reused across a burst.
+
+    If ring (an andor.ring.FrameRing) is given, the frame is decoded into a
+    free slot and the andor.ring.Slot is returned.
+    """
+    from . import decode
+    if decoder is None:
+        decoder = decode.FrameDecoder()
+    if ring is not None:
+        slot = ring.acquire()
+        try:
+            decoder.decode(content, out=slot.array)
+        except BaseException:
+            slot.release()
+            raise
+        return slot
+
+    try:
+        return decoder.decode(content)
+    except decode.FITSFormatError:
+        # scaled or otherwise unusual data, not what go-hcit sends; astropy knows best
+        from astropy.io import fits
+        hdu = fits.open(BytesIO(content))
+        ary = hdu[0].data
+        hdu.close()
+        return ary
+
+
+# features that change the frame shape, in the order SDK3 wants them set:
+# binning limits the AOI, and the AOI's size limits where it can be placed
+SHAPE_FEATURES = ('AOIBinning', 'AOIHBin', 'AOIVBin', 'AOIWidth', 'AOIHeight', 'AOILeft', 'AOITop')
+
+
+def _changes_shape(feature):
+    """True if setting feature may change the shape of frames."""
+    return feature.startswith('AOI') or 'Binning' in feature
+
+
+# features whose limits depend on ones before them, written one at a time in
+# this order by restore_settings: the shape and readout bound the exposure
+# time, which bounds the frame rate
+RESTORE_ORDER = SHAPE_FEATURES + ('PixelReadoutRate', 'SimplePreAmpGainControl', 'PixelEncoding',
+                                  'ElectronicShutteringMode', 'TriggerMode', 'CycleMode', 'ExposureTime', 'FrameRate')
+
+# SDK3 features that are never writable, for servers whose feature options do not say
+READ_ONLY_FEATURES = frozenset((
+    'AOIStride', 'BufferOverflowEvent', 'BytesPerPixel', 'CameraAcquiring', 'CameraModel', 'CameraName',
+    'ControllerID', 'FirmwareVersion', 'ImageSizeBytes', 'InterfaceType', 'MaxInterfaceTransferRate',
+    'PixelHeight', 'PixelWidth', 'ReadoutTime', 'SensorHeight', 'SensorTemperature', 'SensorWidth',
+    'SerialNumber', 'TemperatureStatus', 'TimestampClock', 'TimestampClockFrequency',
+))
+
+
+class RestoreError(Exception):
+    """RestoreError is raised by restore_settings when features could not be written, after trying them all."""
+
+    def __init__(self, errors, written):
+        """Create a new RestoreError from feature name => exception and the names of features written."""
+        super().__init__('could not restore ' + '; '.join(f'{k}: {e}' for k, e in errors.items()))
+        self.errors = errors
+        self.written = written
+
+
+def _writable(feature, info):
+    """True if feature can be set, going by its options (None if they could not be read)."""
+    if info is not None and 'writable' in info:
+        return bool(info['writable'])
+    return feature not in READ_ONLY_FEATURES
+
+
+def _restore_plan(changed):
+    """Split changed features into those written one at a time, in order, and the rest."""
+    def rank(k):
+        # unlisted shape features go after the listed ones, before the readout
+        return (RESTORE_ORDER.index(k), 0) if k in RESTORE_ORDER else (len(SHAPE_FEATURES), -1)
+    ordered = sorted((k for k in changed if k in RESTORE_ORDER or _changes_shape(k)), key=rank)
+    return ordered, [k for k in changed if k not in ordered]
+
+
+def _decode_raw(content, shape, ring=None):
+    """View a fmt='raw' image, little-endian uint16, as an array of shape, or copy it into a slot of ring."""
+    import numpy as np
+    if len(content) != 2 * shape[0] * shape[1]:
+        raise ValueError(f'raw image is {len(content)} bytes, expected {shape[0]}x{shape[1]} uint16')
+    ary = np.frombuffer(content, dtype='<u2').reshape(shape)
+    if ring is None:
+        return ary
+    slot = ring.acquire()
+    np.copyto(slot.array, ary)
+    return slot
+
+
+class AsyncRecorder:
+    """Asyncio counterpart of Recorder."""
+
+    def __init__(self, addr):
+        """Create a new AsyncRecorder instance, see Recorder."""
+        self.addr = addr
+
+    async def _get_or_set(self, route, key, value):
+        url = f'{self.addr}/autowrite/{route}'
+        if value is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.unwrap(resp, key)
+        else:
+            resp = await aio.post(url, json={key: value})
+            raise_err(resp)
+
+    async def root(self, srvpath=None):
+        """Get (srvpath=None) or set the root folder to backup to."""
+        return await self._get_or_set('root', 'str', srvpath)
+
+    async def prefix(self, string=None):
+        """Get (string=None) or set the filename prefix to backup to."""
+        return await self._get_or_set('prefix', 'str', string)
+
+    async def enabled(self, boolean=None):
+        """Enable/Disable the recorder, or check if it is enabled."""
+        return await self._get_or_set('enabled', 'bool', boolean)
+
+
+class AsyncCamera:
+    """Asyncio counterpart of Camera.
+
+    FITS decoding is pushed to the loop's default executor so large frames
+    do not stall other coroutines.
+    """
+
+    cache_ttls = Camera.cache_ttls
+
+    def __init__(self, addr, time_convention='float'):
+        """Create a new AsyncCamera instance, see Camera."""
+        self.addr = niceaddr(addr)
+        self.time_convention = time_convention
+        self.recorder = AsyncRecorder(addr)
+        self._frame_shape = None
+
+    async def does_support(self, route):
+        """Return True if the server supports route, else False, see Camera.does_support."""
+        return await endpoints.asupports(self.addr, route)
+
+    async def _get(self, route, template=None):
+        resp = await aio.get(f'{self.addr}/{route}', route=template, root=self.addr)
+        raise_err(resp)
+        return codec.decode(resp)
+
+    async def _get_or_set(self, route, key, value):
+        url = f'{self.addr}/{route}'
+        if value is None:
+            resp = await aio.get(url, root=self.addr)
+            raise_err(resp)
+            return codec.unwrap(resp, key)
+        else:
+            resp = await aio.post(url, json={key: value}, root=self.addr)
+            raise_err(resp)
+
+    # generics
+    async def features(self):
+        """Dictionary mapping feature names to strings representing their types."""
+        return await self._get('feature')
+
+    async def set_feature(self, feature, value):
+        """Set the value of a feature on the camera, see Camera.set_feature."""
+        if _changes_shape(feature):
+            self._frame_shape = None
+        resp = await aio.post(f'{self.addr}/feature/{feature}', json={'value': value}, route='/feature/{feature}',
+                              root=self.addr)
+        raise_err(resp)
+
+    async def get_feature(self, feature):
+        """Get the value of a feature on the camera, see Camera.get_feature."""
+        d = await self._get(f'feature/{feature}', '/feature/{feature}')
+        return next(iter(d.values()))
+
+    async def get_feature_info(self, feature):
+        """Get the type and allowable range for a feature on the camera, see Camera.get_feature_info."""
+        return await self._get(f'feature/{feature}/options', '/feature/{feature}/options')
+
+    async def _read_settings(self, features):
+        """Values of the writable features among features, and those found read-only, see Camera._read_settings."""
+        names = list(features)
+        import asyncio
+        got = await asyncio.gather(*(self.get_feature_info(n) for n in names),
+                                   *(self.get_feature(n) for n in names), return_exceptions=True)
+        out, read_only = {}, set()
+        for name, info, v in zip(names, got[:len(names)], got[len(names):]):
+            if not _writable(name, None if isinstance(info, Exception) else info):
+                read_only.add(name)
+            elif isinstance(v, Exception):
+                logging.warning(f'{self.addr}: could not read feature {name}: {v}')
+            else:
+                out[name] = v
+        return out, read_only
+
+    async def snapshot_settings(self, features=None):
+        """Read the value of every writable feature, all at once, see Camera.snapshot_settings."""
+        if features is None:
+            features = {k: v for k, v in (await self.features()).items() if v != 'command'}
+        return (await self._read_settings(features))[0]
+
+    async def restore_settings(self, snapshot):
+        """Set the camera's features to a snapshot, writing only those which differ, see Camera.restore_settings."""
+        current, read_only = await self._read_settings(snapshot)
+        changed = [k for k, v in snapshot.items() if k not in read_only and (k not in current or current[k] != v)]
+        ordered, rest = _restore_plan(changed)
+        errors = {}
+        for k in ordered:
+            try:
+                await self.set_feature(k, snapshot[k])
+            except Exception as e:
+                errors[k] = e
+        import asyncio
+        results = await asyncio.gather(*(self.set_feature(k, snapshot[k]) for k in rest), return_exceptions=True)
+        errors.update((k, r) for k, r in zip(rest, results) if isinstance(r, Exception))
+        written = [k for k in ordered + rest if k not in errors]
+        if errors:
+            raise RestoreError(errors, written)
+        return written
+
+    async def exposure_time(self, t=None):
+        """Get or set the exposure time.  If t=None, gets.  If t!=None, sets, see Camera.exposure_time."""
+        url = f'{self.addr}/exposure-time'
+        if t is None:
+            resp = await aio.get(url, root=self.addr)
+            raise_err(resp)
+            tsec = codec.unwrap(resp, 'f64')
+            if self.time_convention == 'float':
+                return tsec
+            else:
+                from astropy import units as u
+                return tsec * u.s
+        else:
+            t = proces_exposure_time(t)
+            resp = await aio.post(url, params={'exposureTime': t}, root=self.addr)
+            raise_err(resp)
+
+    async def aoi(self, dict_=None):
+        """Get or set the area of interest (AoI), see Camera.aoi."""
+        if dict_ is None:
+            return await self._get('aoi')
+        self._frame_shape = None
+        resp = await aio.post(f'{self.addr}/aoi', json=dict_, root=self.addr)
+        raise_err(resp)
+
+    async def binning(self, fctr=None):
+        """Get or set the on-camera binning, symmetric in H and V."""
+        if fctr is None:
+            return (await self._get('binning'))['h']
+        self._frame_shape = None
+        resp = await aio.post(f'{self.addr}/binning', json={'h': fctr, 'v': fctr}, root=self.addr)
+        raise_err(resp)
+
+    # thermal
+    async def fan(self, on=None):
+        """Turn the fan on or off (on != None), or checks if it's on (true)."""
+        return await self._get_or_set('fan', 'bool', on)
+
+    async def sensor_cooling(self, on=None):
+        """Turns the TEC cooler on or off (on != None), or checks if it's on (true)."""
+        return await self._get_or_set('sensor-cooling', 'bool', on)
+
+    async def temperature(self):
+        """Current sensor temperature in Celcius."""
+        return (await self._get('temperature'))['f64']
+
+    async def temperature_setpt(self, valueS=None):
+        """Get (valueS=None) or set the current temperature setpoint, see Camera.temperature_setpt."""
+        return await self._get_or_set('temperature-setpoint', 'str', valueS)
+
+    async def temperature_setpt_options(self):
+        """Currently allowed temperature setpoint options."""
+        return await self._get('temperature-setpoint-options')
+
+    async def cooling_status(self):
+        """Current cooling status."""
+        return (await self._get('temperature-status'))['str']
+
+    async def frame_shape(self, refresh=False):
+        """(height, width) of the frames the camera returns, see Camera.frame_shape."""
+        if self._frame_shape is None or refresh:
+            aoi = await self.aoi()
+            b = await self.binning()
+            self._frame_shape = aoi['height'] // b, aoi['width'] // b
+        return self._frame_shape
+
+    # imaging
+    async def snap(self, exposure_time=None, fmt='fits', ret='array'):
+        """Take an image and return something that depends on the arguments, see Camera.snap."""
+        if exposure_time is None:
+            exposure_time = ""
+
+        exposure_time = proces_exposure_time(exposure_time)
+
+        fmt = fmt.lower()
+        if fmt == 'raw' and ret == 'hdu':
+            raise ValueError("fmt='raw' has no hdu, use ret='array' or 'file'")
+        params = {'exposureTime': exposure_time, 'fmt': fmt}
+        resp = await aio.get(self.addr + "/image", params=params, root=self.addr)
+        raise_err(resp)
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if fmt == 'fits':
+            if ret == 'file':
+                return resp.content
+            if ret == 'array':
+                return await loop.run_in_executor(None, _decode_fits, resp.content)
+
+            from astropy.io import fits
+            return fits.open(BytesIO(resp.content))
+        elif fmt == 'raw':
+            if ret == 'file':
+                return resp.content
+            shape = await self.frame_shape()
+            if len(resp.content) != 2 * shape[0] * shape[1]:
+                shape = await self.frame_shape(refresh=True)
+            return _decode_raw(resp.content, shape)
+        else:
+            from imageio import imread  # non-fits formats are optional
+            return await loop.run_in_executor(None, lambda: imread(resp.content, format=fmt))
+
+    async def burst(self, frames, fps, serverSpool=0, downloads='each'):
+        """Take a burst of images, returned as an async generator of 2D arrays, see Camera.burst."""
+        downloads = downloads.lower()
+        payload = {
+            'fps': fps,
+            'frames': frames,
+            'spool': serverSpool
+        }
+        resp = await aio.post(f'{self.addr}/burst/setup', json=payload, root=self.addr)
+        raise_err(resp)
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if downloads == 'each':
+            from .decode import FrameDecoder
+            dec = FrameDecoder()
+            for _ in range(frames):
+                resp = await aio.get(f'{self.addr}/burst/frame', root=self.addr)
+                raise_err(resp)
+                yield await loop.run_in_executor(None, _decode_fits, resp.content, dec)
+        else:
+            resp = await aio.get(f'{self.addr}/burst/all-frames', root=self.addr)
+            raise_err(resp)
+            yield await loop.run_in_executor(None, _decode_fits, resp.content)
+
+    # this is EMCCD stuff
+    async def em_gain(self, fctr=None):
+        """Get or set the EM gain.  Get if fctr=None, else Set."""
+        return await self._get_or_set('em-gain', 'int', fctr)
+
+    async def em_gain_mode(self, mode=None):
+        """Get or set the EM gain mode.  Get if mode=None, else Set."""
+        return await self._get_or_set('em-gain-mode', 'str', mode)
+
+    async def em_gain_range(self):
+        """Min and max values for EM gain in the current configuration."""
+        return await self._get('em-gain-range')
+
+    # this is shutter control
+    async def shutter(self, open_=None):
+        """Open or close the shutter.  Get if it is open or closed with open=None."""
+        return await self._get_or_set('shutter', 'bool', open_)
+
+    async def shutter_auto(self, automatic=None):
+        """Configure the camera for automatic (camera-determined) shutter control."""
+        return await self._get_or_set('shutter-auto', 'bool', automatic)
+
+    async def shutter_speed(self, texpS=None):
+        """Configure the shutter speed for the camera, seconds."""
+        return await self._get_or_set('shutter-speed', 'f64', texpS)
+
+
+class AsyncEMCCD(AsyncCamera):
+    """Subclass of AsyncCamera that forbids excessively cold temperatures."""
+
+    async def temperature_setpt(self, valueS=None):
+        """Get (valueS=None) or set the current temperature setpoint, see EMCCD.temperature_setpt."""
+        if valueS is not None:
+            f = float(valueS)
+            if f < -25:
+                raise ValueError("it's forbidden to set the TEC cooler than -25C.")
+
+        return await super().temperature_setpt(valueS)
@@ -0,0 +1,266 @@
+"""A library of master darks and flats, kept on disk and applied to frames.
+
+Darks depend on the exposure time, EM gain, binning, AOI and temperature
+setpoint the frames were taken with; flats on all of those but the
+exposure time.  A CalibrationLibrary stores one master frame per such key
+as a float32 .npy file in a directory, named after the key, so calibrations
+survive across sessions and can be shared between them.  Darks missing
+from the library are taken on demand, a burst with the shutter closed
+combined by its median.  Flats need a light source set up, so they are
+only taken when asked for with acquire_flat.
+
+Cameras without EM gain or a shutter are supported: their keys have an
+em_gain of None, and for their darks the sensor must be covered by hand
+before the library is used.
+
+    >>> lib = CalibrationLibrary('/data/calib')
+    >>> frame = lib.snap(cam)  # float32, dark subtracted and flat fielded
+    >>> for frame in lib.burst(cam, 1000, 100, prefetch=4):
+    ...     process(frame)  # reused buffer, copy to keep
+
+A Calibrator holds the master frames for one key and applies them to
+frames in place in a float32 buffer, the flat as a multiplication by its
+precomputed reciprocal.
+"""
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from golab_common import DoNotRepeat, is_quantity
+
+# what a master frame was taken with; aoi is (left, top, width, height), setpoint
+# a str, em_gain None for cameras without EM gain
+CalibrationKey = namedtuple('CalibrationKey', ['exposure', 'em_gain', 'binning', 'aoi', 'setpoint'])
+
+KINDS = ('dark', 'flat')
+
+
+def _optional(getter):
+    """getter(), or None if the camera does not have the feature it reads."""
+    try:
+        return getter()
+    except DoNotRepeat:  # the server or camera has no such route
+        return None
+
+
+def camera_key(cam):
+    """The CalibrationKey of the camera's current settings, read all at once."""
+    getters = (cam.exposure_time, partial(_optional, cam.em_gain), cam.binning, cam.aoi, cam.temperature_setpt)
+    with ThreadPoolExecutor(len(getters), thread_name_prefix='calib-key') as pool:
+        exposure, gain, binning, aoi, setpoint = [f.result() for f in [pool.submit(g) for g in getters]]
+    if is_quantity(exposure):
+        exposure = exposure.to('s').value
+    return CalibrationKey(float(exposure), None if gain is None else int(gain), int(binning),
+                          (aoi['left'], aoi['top'], aoi['width'], aoi['height']), str(setpoint))
+
+
+def filename(kind, key):
+    """Name of the file holding the master of kind ('dark' or 'flat') for key."""
+    if kind not in KINDS:
+        raise ValueError(f'kind must be one of {KINDS}, got {kind}')
+    left, top, width, height = key.aoi
+    name = f'{kind}'
+    if kind == 'dark':
+        name += f'_t{key.exposure:.6g}s'
+    if key.em_gain is not None:
+        name += f'_g{key.em_gain}'
+    return name + f'_b{key.binning}_aoi{left}-{top}-{width}x{height}_T{key.setpoint}.npy'
+
+
+class Calibrator:
+    """Calibrator applies a master dark and, optionally, flat to frames in a float32 buffer."""
+
+    def __init__(self, dark, flat=None):
+        """Create a new Calibrator.
+
+        Parameters
+        ----------
+        dark : numpy.ndarray
+            master dark, subtracted from every frame
+        flat : numpy.ndarray, optional
+            master flat normalized to a mean of 1, divided out of every frame.
+            Pixels where it is not positive are set to zero
+
+        """
+        self.dark = np.asarray(dark, dtype=np.float32)
+        self.flat = None if flat is None else np.asarray(flat, dtype=np.float32)
+        self._gain = None
+        if self.flat is not None:
+            if self.flat.shape != self.dark.shape:
+                raise ValueError(f'flat is {self.flat.shape}, dark {self.dark.shape}')
+            # multiplying is cheaper than dividing every frame
+            self._gain = np.zeros_like(self.flat)
+            np.divide(1, self.flat, out=self._gain, where=self.flat > 0)
+        self._scratch = None
+
+    def apply(self, frame, out=None):
+        """Calibrate a frame, or a cube of frames (e.g. from downloads='all'), into out, a float32 array of its shape.
+
+        By default out is a buffer owned by the Calibrator and reused by the
+        next call; copy the result to keep it.  out may be frame itself if
+        it is float32.  frame may also be an andor.ring.Slot, which is
+        released once calibrated.
+        """
+        if hasattr(frame, 'release'):
+            with frame as ary:
+                return self.apply(ary, out)
+        if frame.shape[-2:] != self.dark.shape or frame.ndim not in (2, 3):
+            raise ValueError(f'frame is {frame.shape}, calibrations are {self.dark.shape}')
+        if out is None:
+            if self._scratch is None or self._scratch.shape != frame.shape:
+                self._scratch = np.empty(frame.shape, dtype=np.float32)
+            out = self._scratch
+        np.subtract(frame, self.dark, out=out, dtype=np.float32)
+        if self._gain is not None:
+            out *= self._gain
+        return out
+
+    def map(self, frames):
+        """Yield each frame (or cube) of an iterable calibrated, in the reused buffer; ring Slots are released."""
+        for frame in frames:
+            yield self.apply(frame)
+
+
+class CalibrationLibrary:
+    """CalibrationLibrary keeps master darks and flats in a directory, taking darks as they are needed."""
+
+    def __init__(self, root, frames=16, fps=None):
+        """Create a new CalibrationLibrary, creating root if needed.
+
+        Parameters
+        ----------
+        root : str or os.PathLike
+            directory holding the master frames
+        frames : int
+            number of frames median combined into a master
+        fps : float, optional
+            frame rate of the bursts taken for masters, by default as fast as
+            the exposure time allows, at most 100
+
+        """
+        self.root = os.fspath(root)
+        os.makedirs(self.root, exist_ok=True)
+        self.frames = frames
+        self.fps = fps
+        self._loaded = {}  # path => master, so each file is read once
+
+    def path(self, kind, key):
+        """Path of the master of kind for key."""
+        return os.path.join(self.root, filename(kind, key))
+
+    def load(self, kind, key):
+        """The master of kind for key, or None if the library has none."""
+        path = self.path(kind, key)
+        if path not in self._loaded:
+            if not os.path.exists(path):
+                return None
+            self._loaded[path] = np.load(path)
+        return self._loaded[path]
+
+    def save(self, kind, key, master):
+        """Store a master of kind for key, replacing any already stored."""
+        path = self.path(kind, key)
+        master = np.asarray(master, dtype=np.float32)
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'wb') as f:
+            np.save(f, master)
+        os.replace(tmp, path)  # readers in other sessions never see half a file
+        self._loaded[path] = master
+
+    def _median(self, cam, key):
+        fps = self.fps or min(100., 1 / max(key.exposure, 1e-3))
+        cube, = cam.burst(self.frames, fps, downloads='all')
+        return np.median(cube, axis=0).astype(np.float32)
+
+    def acquire_dark(self, cam, key=None):
+        """Take, store and return a master dark for the camera's current settings, closing the shutter meanwhile.
+
+        A camera without a shutter is taken as it is: cover its sensor first.
+        """
+        key = key or camera_key(cam)
+        was_open = _optional(cam.shutter)
+        if was_open is None:
+            logging.warning(f'{cam.addr} has no shutter, taking a dark assuming its sensor is covered')
+        elif was_open:
+            cam.shutter(False)
+        try:
+            dark = self._median(cam, key)
+        finally:
+            if was_open:
+                cam.shutter(True)
+        self.save('dark', key, dark)
+        return dark
+
+    def acquire_flat(self, cam, key=None):
+        """Take, store and return a master flat; the camera must be looking at a flat field.
+
+        The median of the burst has the dark for the same settings (taken if
+        needed) subtracted and is normalized to a mean of 1.
+        """
+        key = key or camera_key(cam)
+        dark = self.load('dark', key)
+        if dark is None:
+            dark = self.acquire_dark(cam, key)
+        flat = self._median(cam, key)
+        flat -= dark
+        level = flat.mean()
+        if not level > 0:
+            raise ValueError(f'flat field is no brighter than the dark, mean {level} counts above it')
+        flat /= level
+        self.save('flat', key, flat)
+        return flat
+
+    def calibrator(self, cam, key=None, acquire=True):
+        """A Calibrator for the camera's current settings.
+
+        Parameters
+        ----------
+        cam : andor.Camera
+            the camera
+        key : CalibrationKey, optional
+            settings to look up, by default read from cam
+        acquire : bool
+            take the dark if the library does not have it, else raise LookupError.
+            Missing flats are never taken; frames are only dark subtracted
+
+        """
+        key = key or camera_key(cam)
+        dark = self.load('dark', key)
+        if dark is None:
+            if not acquire:
+                raise LookupError(f'no dark in {self.root} for {key}')
+            dark = self.acquire_dark(cam, key)
+        flat = self.load('flat', key)
+        if flat is None:
+            logging.info(f'no flat in {self.root} for {key}, frames will only be dark subtracted')
+        return Calibrator(dark, flat)
+
+    def snap(self, cam, **kwargs):
+        """Take an image with cam.snap(**kwargs) and return it calibrated, as a new float32 array.
+
+        With ring=, the slot the image was decoded into is released once
+        calibrated.  fmt and ret must leave snap returning pixels.
+        """
+        if kwargs.get('ret', 'array') != 'array':
+            raise ValueError(f"only ret='array' frames can be calibrated, got ret={kwargs['ret']!r}")
+        t = kwargs.pop('exposure_time', None)
+        if t is not None:
+            cam.exposure_time(t)  # before the lookup, which depends on it
+        cal = self.calibrator(cam)
+        frame = cam.snap(**kwargs)
+        shape = getattr(frame, 'array', frame).shape
+        return cal.apply(frame, out=np.empty(shape, dtype=np.float32))
+
+    def burst(self, cam, frames, fps, **kwargs):
+        """Take a burst with cam.burst(frames, fps, **kwargs), yielding each frame calibrated.
+
+        Frames are yielded in one reused float32 buffer, see Calibrator.apply;
+        with downloads='all' the single cube is, calibrated frame by frame.
+        Slots from ring= are released once calibrated.
+        """
+        cal = self.calibrator(cam)
+        yield from cal.map(cam.burst(frames, fps, **kwargs))
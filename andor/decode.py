@@ -0,0 +1,228 @@
+"""Fast decoding of the FITS frames served by go-hcit's andor server.
+
+The server sends a single primary HDU: a header of 80 character cards padded
+to 2880 byte blocks, then big-endian pixels.  16 bit frames are stored the
+FITS way for unsigned data, BITPIX=16 with BZERO=32768.
+
+FrameDecoder reads such a file into a native-endian ndarray in one pass over
+the pixels, without building an HDU list or promoting uint16 to a wider type.
+It remembers the last header it parsed, so the frames of a burst, which all
+carry the same header, are only parsed once.
+
+    >>> dec = FrameDecoder()
+    >>> ary = dec.decode(resp.content)  # uint16, shape (height, width)
+
+Files this module does not understand raise FITSFormatError; anything with
+BSCALE != 1 or unusual keywords should go through astropy instead.
+"""
+import numpy as np
+
+BLOCK = 2880
+CARD = 80
+
+# BITPIX => numpy dtype of the data as stored
+BITPIX_DTYPES = {
+    8: np.dtype('u1'),
+    16: np.dtype('>i2'),
+    32: np.dtype('>i4'),
+    64: np.dtype('>i8'),
+    -32: np.dtype('>f4'),
+    -64: np.dtype('>f8'),
+}
+
+# BITPIX => (BZERO marking the data as unsigned, unsigned big-endian dtype)
+UNSIGNED = {
+    16: (32768, np.dtype('>u2')),
+    32: (2147483648, np.dtype('>u4')),
+    64: (9223372036854775808, np.dtype('>u8')),
+}
+
+
+class FITSFormatError(ValueError):
+    """FITSFormatError is raised for buffers that are not FITS files this module can decode."""
+
+
+class Header:
+    """Header holds what is needed to read the data of a primary HDU."""
+
+    __slots__ = ('cards', 'size', 'bitpix', 'shape', 'bzero', 'dtype', 'flip')
+
+    def __init__(self, cards, size):
+        """Create a new Header from a dict of its cards and its size in bytes, padding included.
+
+        Raises FITSFormatError if BITPIX, NAXIS or the scaling is not supported.
+        """
+        self.cards = cards
+        self.size = size
+        try:
+            self.bitpix = int(cards['BITPIX'])
+            naxis = int(cards['NAXIS'])
+            # FITS lists the fastest varying axis first, numpy the slowest
+            self.shape = tuple(int(cards[f'NAXIS{i}']) for i in range(naxis, 0, -1))
+            bzero = cards.get('BZERO', '0')
+            bscale = cards.get('BSCALE', '1')
+        except (KeyError, ValueError) as e:
+            raise FITSFormatError(f'malformed FITS header: {e}')
+
+        if self.bitpix not in BITPIX_DTYPES:
+            raise FITSFormatError(f'invalid BITPIX {self.bitpix}')
+        if naxis not in (2, 3) or min(self.shape) < 1:
+            raise FITSFormatError(f'expected a 2D frame or 3D cube, got shape {self.shape}')
+        if float(bscale) != 1:
+            raise FITSFormatError(f'BSCALE={bscale} is not supported')
+
+        self.bzero = int(float(bzero))
+        self.dtype = BITPIX_DTYPES[self.bitpix]
+        self.flip = False  # flip the sign bit to apply BZERO
+        if self.bzero != 0:
+            unsigned = UNSIGNED.get(self.bitpix)
+            if unsigned is None or unsigned[0] != self.bzero:
+                raise FITSFormatError(f'BZERO={bzero} with BITPIX={self.bitpix} is not supported')
+            self.dtype = unsigned[1]
+            self.flip = True
+
+    @property
+    def nbytes(self):
+        """Size of the data, not counting padding."""
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+    @property
+    def native_dtype(self):
+        """dtype the data is decoded to."""
+        return self.dtype.newbyteorder('=')
+
+    def convert(self, src, out):
+        """Decode raw data, without the header, from the buffer src into the native array out.
+
+        src may hold any whole number of out's elements, e.g. one frame of a cube.
+        """
+        view = np.frombuffer(src, dtype=self.dtype, count=out.size).reshape(out.shape)
+        if self.flip:
+            # for BITPIX=16, v + 32768 in uint16 is v with its sign bit flipped;
+            # the byteswap happens in the same pass
+            np.bitwise_xor(view, self.dtype.type(1 << (8 * self.dtype.itemsize - 1)), out=out)
+        else:
+            np.copyto(out, view)
+        return out
+
+
+def parse_header(buf):
+    """Parse the primary header at the start of buf.
+
+    Returns
+    -------
+    Header
+        the header
+
+    Raises
+    ------
+    FITSFormatError
+        buf does not begin with a supported FITS header
+
+    """
+    mv = memoryview(buf)
+    if bytes(mv[:9]) != b'SIMPLE  =':
+        raise FITSFormatError('not a FITS file, SIMPLE is not the first card')
+
+    cards = {}
+    for start in range(0, len(mv) - CARD + 1, CARD):
+        card = bytes(mv[start:start + CARD]).decode('ascii', errors='replace')
+        key = card[:8].rstrip()
+        if key == 'END':
+            size = -(-(start + CARD) // BLOCK) * BLOCK
+            return Header(cards, size)
+        if card[8:10] == '= ':
+            value = card[10:].split('/', 1)[0].strip()
+            cards[key] = value.strip("'").strip()
+    raise FITSFormatError('FITS header has no END card')
+
+
+def read_header(read):
+    """Read and parse a primary header from a stream, leaving it at the start of the data.
+
+    Parameters
+    ----------
+    read : callable
+        read(n) returns the next n bytes of the stream, fewer only at its end
+
+    Returns
+    -------
+    Header
+        the header
+
+    """
+    head = b''
+    while True:
+        block = read(BLOCK)
+        if len(block) < BLOCK:
+            raise FITSFormatError('stream ended inside the FITS header')
+        head += block
+        if any(block[i:i + 8].rstrip() == b'END' for i in range(0, BLOCK, CARD)):
+            return parse_header(head)
+
+
+class FrameDecoder:
+    """FrameDecoder turns FITS buffers into arrays, caching the header across calls."""
+
+    def __init__(self):
+        """Create a new FrameDecoder.  One may be shared by threads."""
+        # (bytes of the last header parsed, its Header), replaced as a whole so
+        # threads sharing the decoder never see the bytes of one with the other
+        self._last = (None, None)
+
+    @property
+    def header(self):
+        """The Header last parsed, None before the first."""
+        return self._last[1]
+
+    def parse(self, buf):
+        """The Header of buf, reusing the last one if buf starts with the same bytes."""
+        raw, h = self._last
+        if raw is not None and len(buf) >= len(raw) and memoryview(buf)[:len(raw)] == raw:
+            return h
+
+        h = parse_header(buf)
+        self._last = (bytes(memoryview(buf)[:h.size]), h)
+        return h
+
+    def decode(self, buf, out=None, native=True):
+        """Decode the data of the FITS file in buf.
+
+        Parameters
+        ----------
+        buf : bytes-like
+            the whole file
+        out : numpy.ndarray, optional
+            array to decode into, must have the header's shape and native dtype.
+            Lets callers reuse buffers across frames
+        native : bool
+            if False and the data needs no scaling, return a read-only view of
+            buf in the file's big-endian byte order instead of converting it.
+            numpy handles either order transparently; converting once costs a
+            pass over the data but speeds up everything done with it later
+
+        Returns
+        -------
+        numpy.ndarray
+            the pixels, e.g. uint16 of shape (height, width) for a frame or
+            (frames, height, width) for a burst
+
+        """
+        h = self.parse(buf)
+        if len(buf) < h.size + h.nbytes:
+            raise FITSFormatError(f'FITS data truncated, expected {h.size + h.nbytes} bytes, got {len(buf)}')
+
+        data = memoryview(buf)[h.size:h.size + h.nbytes]
+        if out is None:
+            if not native and not h.flip:
+                return np.frombuffer(data, dtype=h.dtype).reshape(h.shape)
+            out = np.empty(h.shape, dtype=h.native_dtype)
+        elif out.shape != h.shape or out.dtype != h.native_dtype:
+            raise ValueError(f'out must be {h.native_dtype} of shape {h.shape}, is {out.dtype} of {out.shape}')
+
+        return h.convert(data, out)
+
+
+def decode(buf, out=None):
+    """Decode one FITS file, see FrameDecoder.decode.  Use a FrameDecoder for bursts."""
+    return FrameDecoder().decode(buf, out)
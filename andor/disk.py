@@ -0,0 +1,240 @@
+"""Writing bursts straight to an on-disk cube.
+
+BurstWriter preallocates a FITS or .npy file the size of the whole burst and
+memory maps it.  Frames handed to write are queued and copied into the map
+by a background thread, so disk I/O never holds up the download loop.
+Every flush_every frames, or every second, the map is flushed and the
+frames' byte offsets are appended to an index file next to the cube
+(path + '.index', one "frame offset unix_time" line per frame).  If the
+process dies, the index says which frames made it to disk; the cube is
+readable either way.
+
+    >>> with BurstWriter('run42.fits', 10_000, (2048, 2048)) as w:
+    ...     for frame in cam.burst(10_000, 100, prefetch=4):
+    ...         w.write(frame)
+"""
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+import numpy as np
+
+from .decode import BLOCK, CARD
+
+FORMATS = ('fits', 'npy')
+
+# most seconds a written frame waits to be flushed, even if no more frames come
+FLUSH_INTERVAL = 1.
+
+_STOP = object()
+
+
+def _card(key, value, comment=''):
+    if isinstance(value, str):
+        # strings start right after the indicator, numbers and bools end in column 30
+        card = f"{key:<8}= '{value.replace(chr(39), chr(39) * 2):<8}'"
+    else:
+        v = ('T' if value else 'F') if isinstance(value, bool) else str(value)
+        card = f'{key:<8}= {v:>20}'
+    if comment:
+        card += f' / {comment}'
+    if len(card) > CARD:
+        raise ValueError(f'FITS card for {key} is longer than {CARD} characters')
+    return card.ljust(CARD)
+
+
+def fits_header(shape, cards=None):
+    """A primary header for uint16 data of shape (numpy order), padded to whole blocks.
+
+    cards is an optional dict of extra KEY => value (bool, int, float or str),
+    KEY at most 8 characters.
+    """
+    out = [_card('SIMPLE', True), _card('BITPIX', 16), _card('NAXIS', len(shape))]
+    for i, n in enumerate(reversed(shape)):
+        out.append(_card(f'NAXIS{i + 1}', n))
+    out += [_card('BZERO', 32768), _card('BSCALE', 1)]
+    for k, v in (cards or {}).items():
+        out.append(_card(k.upper(), v))
+    out.append('END'.ljust(CARD))
+    head = ''.join(out)
+    return head.ljust(-(-len(head) // BLOCK) * BLOCK).encode('ascii')
+
+
+def settings_cards(settings, key='CAMSET'):
+    """Camera settings, e.g. from Camera.snapshot_settings, as FITS cards for header=.
+
+    Feature names are too long for FITS keywords, so the settings are stored
+    as compact JSON split over string cards KEY00, KEY01, ...  key is at most
+    6 characters; read_settings_cards reverses this.
+    """
+    if len(key) > 6:
+        raise ValueError(f'settings key {key} is longer than 6 characters')
+    doc = json.dumps(settings, separators=(',', ':'), sort_keys=True)
+    cards = {}
+    while doc:
+        # a card fits 68 characters of string, quotes doubled
+        n, width = 0, 0
+        while n < len(doc) and width + 1 + (doc[n] == "'") <= 68:
+            width += 1 + (doc[n] == "'")
+            n += 1
+        if doc[n - 1] == ' ':
+            # FITS drops trailing spaces; spaces in compact JSON are all inside
+            # strings, where this one can be escaped instead
+            doc = doc[:n - 1] + '\\u0020' + doc[n:]
+            continue
+        if len(cards) == 100:
+            raise ValueError('settings do not fit in 100 cards')
+        cards[f'{key}{len(cards):02d}'] = doc[:n]
+        doc = doc[n:]
+    return cards
+
+
+def read_settings_cards(header, key='CAMSET'):
+    """The settings stored by settings_cards in header, a dict-like of FITS cards (e.g. astropy's Header)."""
+    parts = []
+    while f'{key}{len(parts):02d}' in header:
+        parts.append(header[f'{key}{len(parts):02d}'])
+    return json.loads(''.join(parts)) if parts else {}
+
+
+class BurstWriter:
+    """BurstWriter writes frames into a memory mapped cube on disk from a background thread."""
+
+    def __init__(self, path, frames, shape, fmt=None, header=None, queue_size=64, flush_every=64):
+        """Create a new BurstWriter, creating the file at path.
+
+        Parameters
+        ----------
+        path : str or os.PathLike
+            file to write.  Overwritten if it exists
+        frames : int
+            number of frames in the cube
+        shape : tuple of int
+            (height, width) of a frame
+        fmt : str, optional, {'fits', 'npy'}
+            file format, by default from the extension of path
+        header : dict, optional
+            extra KEY => value cards for the FITS header
+        queue_size : int
+            frames that may wait to be written before write blocks
+        flush_every : int
+            frames between flushes of the cube and index to disk
+
+        """
+        self.path = os.fspath(path)
+        if fmt is None:
+            fmt = 'npy' if self.path.endswith('.npy') else 'fits'
+        if fmt not in FORMATS:
+            raise ValueError(f'fmt must be one of {FORMATS}, got {fmt}')
+        self.fmt = fmt
+        self.frames = frames
+        self.shape = tuple(shape)
+        self.flush_every = flush_every
+        self.offsets = []  # byte offset in the file of each frame flushed to disk
+        self.received = 0
+        self._error = None
+
+        cube = (frames, *self.shape)
+        if fmt == 'npy':
+            self._map = np.lib.format.open_memmap(self.path, mode='w+', dtype=np.uint16, shape=cube)
+            self.data_offset = self._map.offset
+        else:
+            head = fits_header(cube, header)
+            nbytes = int(np.prod(cube)) * 2
+            with open(self.path, 'wb') as f:
+                f.write(head)
+                f.truncate(len(head) + nbytes + (-nbytes % BLOCK))
+            # stored as BZERO-shifted big-endian ints, see write
+            self._map = np.memmap(self.path, dtype='>u2', mode='r+', offset=len(head), shape=cube)
+            self.data_offset = len(head)
+        self.frame_bytes = int(np.prod(self.shape)) * 2
+
+        self._index = open(self.path + '.index', 'w')
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._run, name='burst-writer', daemon=True)
+        self._thread.start()
+
+    def write(self, frame):
+        """Queue a (height, width) uint16 frame to be written after the previous ones.
+
+        The frame must not be modified until it has been written; frames from
+        Camera.burst are fresh arrays and need no copy.  Blocks only if
+        queue_size frames are already waiting.
+        """
+        if self._error is not None:
+            raise self._error
+        if self.received >= self.frames:
+            raise IndexError(f'burst file holds {self.frames} frames, all written')
+        if frame.shape != self.shape:
+            raise ValueError(f'frame is {frame.shape}, expected {self.shape}')
+        self._queue.put((self.received, frame, time.time()))
+        self.received += 1
+
+    def _run(self):
+        done = []  # (index, time) copied but not yet flushed
+        last = time.monotonic()
+        while True:
+            try:
+                # wake up at least every FLUSH_INTERVAL, so frames are flushed even if the producer stalls
+                item = self._queue.get(timeout=FLUSH_INTERVAL)
+            except queue.Empty:
+                item = None
+            if item is not None and item is not _STOP and self._error is None:
+                i, frame, t = item
+                try:
+                    if self.fmt == 'fits':
+                        # uint16 + BZERO offset is a flip of the sign bit, as in andor.decode
+                        np.bitwise_xor(frame, np.uint16(0x8000), out=self._map[i])
+                    else:
+                        self._map[i] = frame
+                    done.append((i, t))
+                except Exception as e:
+                    logging.error(f'burst writer for {self.path} failed: {e}')
+                    self._error = e
+
+            if done and (item is _STOP or len(done) >= self.flush_every
+                         or time.monotonic() - last >= FLUSH_INTERVAL):
+                self._flush(done)
+                done = []
+                last = time.monotonic()
+            if item is _STOP:
+                return
+
+    def _flush(self, done):
+        self._map.flush()
+        for i, t in done:
+            off = self.data_offset + i * self.frame_bytes
+            self.offsets.append(off)
+            self._index.write(f'{i} {off} {t:.6f}\n')
+        self._index.flush()
+
+    def close(self):
+        """Write everything queued, flush and close the files, and raise any error the writer hit."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            self._index.close()
+            self._map.flush()
+            del self._map
+        if self._error is not None:
+            raise self._error
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_index(path):
+    """Read the index of the cube at path, a list of (frame, offset, unix time) for frames on disk."""
+    out = []
+    with open(os.fspath(path) + '.index') as f:
+        for line in f:
+            i, off, t = line.split()
+            out.append((int(i), int(off), float(t)))
+    return out
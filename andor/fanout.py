@@ -0,0 +1,279 @@
+"""Sharing frames with other processes on this machine through shared memory.
+
+A FramePublisher owns a named multiprocessing.shared_memory block holding a
+ring of frame slots, each with a small header: the frame's index, unix
+timestamp, shape and dtype.  Any number of FrameSubscribers, in other
+processes, attach to it by name and read frames without copying them or
+talking to the camera server.
+
+    >>> # acquisition process
+    >>> with FramePublisher('andor-cam1', (2048, 2048), slots=32) as pub:
+    ...     pub.publish_all(cam.burst(100_000, 100, prefetch=4))
+
+    >>> # viewer process
+    >>> sub = FrameSubscriber('andor-cam1')
+    >>> for frame in sub.follow():
+    ...     show(frame.array)
+
+The publisher never waits for subscribers: a subscriber that falls more
+than slots frames behind skips ahead (follow counts the frames missed).
+Each slot carries a sequence number, odd while it is being written, so
+readers can tell when a frame changed under them; read copies and checks
+it, read(copy=False) lends out the slot itself and valid() tells whether it
+still holds that frame.
+"""
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+MAGIC = 0x414E444F52465230  # 'ANDORFR0'
+
+ALIGN = 64
+
+# the block starts with one of these
+RING = np.dtype([('magic', '<u8'), ('slots', '<u8'), ('capacity', '<u8'), ('latest', '<i8')])
+
+# followed by one of these per slot, then the slots' data, each capacity bytes
+SLOT = np.dtype([('seq', '<u8'), ('index', '<i8'), ('time', '<f8'),
+                 ('height', '<u4'), ('width', '<u4'), ('dtype', 'S8')])
+
+# index counts from 0; time is unix time
+Frame = namedtuple('Frame', ['index', 'time', 'array'])
+
+
+class FrameOverwritten(LookupError):
+    """FrameOverwritten is raised for frames no longer held by the ring."""
+
+
+def _aligned(n):
+    return -(-n // ALIGN) * ALIGN
+
+
+_created = set()  # names of the blocks FramePublishers in this process created, and own
+
+
+def _attach(name, creators_tracker=False):
+    """Attach to an existing block without letting this process's resource tracker unlink it on exit.
+
+    creators_tracker is True in processes reporting to the resource tracker
+    of the block's creator, e.g. workers multiprocessing started from it:
+    there attaching registers nothing the creator has not, and taking it
+    back would drop the creator's own registration.  Also used by
+    andor.procpool.
+    """
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name=name, track=False)
+    # before 3.13 attaching registers the block as if this process owned it; take
+    # just this registration back, unless it is this process's own block
+    shm = shared_memory.SharedMemory(name=name)
+    if not creators_tracker and shm.name not in _created:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    return shm
+
+
+class _Ring:
+    """Views of the parts of a block; shared by publisher and subscriber."""
+
+    def __init__(self, shm):
+        self.shm = shm
+        self.ring = np.ndarray((), dtype=RING, buffer=shm.buf)
+        if self.ring['magic'] != MAGIC:
+            raise ValueError(f'shared memory {shm.name} does not hold a frame ring')
+        self.slots = int(self.ring['slots'])
+        self.capacity = int(self.ring['capacity'])
+        head = _aligned(RING.itemsize)
+        self.headers = np.ndarray((self.slots,), dtype=SLOT, buffer=shm.buf, offset=head)
+        self.data_offset = _aligned(head + self.slots * SLOT.itemsize)
+
+    def array(self, slot):
+        """The frame in slot, as described by its header."""
+        h = self.headers[slot]
+        return np.ndarray((int(h['height']), int(h['width'])), dtype=np.dtype(h['dtype'].decode()),
+                          buffer=self.shm.buf, offset=self.data_offset + slot * self.capacity)
+
+    def close(self):
+        self.ring = self.headers = None
+        try:
+            self.shm.close()
+        except BufferError:
+            pass  # a frame read with copy=False is still referenced; the mapping goes when it does
+
+
+class FramePublisher:
+    """FramePublisher writes frames into a named shared memory ring for FrameSubscribers to read."""
+
+    def __init__(self, name, shape, slots=16, dtype=np.uint16):
+        """Create a new FramePublisher, creating the shared memory block.
+
+        Parameters
+        ----------
+        name : str
+            name of the block, which subscribers attach by.  Must not exist
+        shape : tuple of int
+            (height, width) of the largest frame to publish
+        slots : int
+            number of frames held
+        dtype : numpy.dtype
+            type of the largest pixel to publish
+
+        """
+        if slots < 1:
+            raise ValueError('a frame ring needs at least one slot')
+        capacity = _aligned(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        head = _aligned(_aligned(RING.itemsize) + slots * SLOT.itemsize)
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=head + slots * capacity)
+        ring = np.ndarray((), dtype=RING, buffer=self.shm.buf)
+        ring[()] = (MAGIC, slots, capacity, -1)
+        del ring
+        self.name = self.shm.name
+        _created.add(self.name)
+        self._ring = _Ring(self.shm)
+        self.count = 0  # frames published
+
+    def publish(self, frame, index=None, timestamp=None):
+        """Copy a 2D frame into the next slot and return its index.
+
+        frame may also be an andor.ring.Slot, which is released once copied.
+        index defaults to one more than the last; timestamp to now.
+        """
+        if hasattr(frame, 'release'):
+            with frame as ary:
+                return self.publish(ary, index, timestamp)
+        frame = np.asarray(frame)
+        if frame.ndim != 2 or frame.nbytes > self._ring.capacity:
+            raise ValueError(f'frame of {frame.dtype} {frame.shape} does not fit a slot of '
+                             f'{self._ring.capacity} bytes')
+        r = self._ring
+        if index is None:
+            index = int(r.ring['latest']) + 1
+        slot = index % r.slots
+        h = r.headers[slot:slot + 1]  # a view, so the fields are written in place
+        h['seq'] += 1  # odd: being written
+        h['index'], h['time'] = index, time.time() if timestamp is None else timestamp
+        h['height'], h['width'], h['dtype'] = *frame.shape, frame.dtype.str
+        np.copyto(r.array(slot), frame)
+        h['seq'] += 1
+        r.ring['latest'] = index
+        self.count += 1
+        return index
+
+    def publish_all(self, frames):
+        """Publish every frame of an iterable, e.g. the generator returned by Camera.burst.  Returns the count."""
+        n = 0
+        for frame in frames:
+            self.publish(frame)
+            n += 1
+        return n
+
+    def close(self):
+        """Remove the block.  Subscribers attached keep their mapping until they close."""
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+            self.shm.unlink()
+            _created.discard(self.name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameSubscriber:
+    """FrameSubscriber reads frames from a FramePublisher's ring, in this or another process."""
+
+    def __init__(self, name):
+        """Create a new FrameSubscriber, attaching to the block called name."""
+        self.shm = _attach(name)
+        self._ring = _Ring(self.shm)
+        self.missed = 0  # frames follow skipped because they were overwritten
+
+    @property
+    def latest(self):
+        """Index of the newest frame published, -1 before the first."""
+        return int(self._ring.ring['latest'])
+
+    def read(self, index=None, copy=True):
+        """The frame of a given index, by default the newest, as a Frame.
+
+        If copy is False, array is the slot itself: no copy is made, but the
+        publisher may overwrite it at any time, see valid.
+
+        Raises
+        ------
+        FrameOverwritten
+            the frame is no longer in the ring
+        LookupError
+            the frame has not been published yet
+
+        """
+        r = self._ring
+        latest = self.latest
+        if index is None:
+            index = latest
+        if index < 0 or index > latest:
+            raise LookupError(f'frame {index} has not been published, the latest is {latest}')
+        slot = index % r.slots
+        seq = int(r.headers['seq'][slot])
+        if seq % 2 or int(r.headers['index'][slot]) != index:
+            raise FrameOverwritten(f'frame {index} was overwritten, the latest is {latest}')
+        frame = Frame(index, float(r.headers['time'][slot]), r.array(slot))
+        if not copy:
+            return frame
+        frame = frame._replace(array=frame.array.copy())
+        if int(r.headers['seq'][slot]) != seq:
+            raise FrameOverwritten(f'frame {index} was overwritten while being read')
+        return frame
+
+    def valid(self, frame):
+        """True if the slot a Frame read with copy=False still holds that frame."""
+        slot = frame.index % self._ring.slots
+        h = self._ring.headers
+        return int(h['seq'][slot]) % 2 == 0 and int(h['index'][slot]) == frame.index
+
+    def wait(self, after=-1, timeout=None, poll=0.001):
+        """Wait for a frame with an index above after and return the latest index.
+
+        Raises TimeoutError after timeout seconds, None waits forever.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.latest <= after:
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f'no frame after {after} within {timeout} s')
+            time.sleep(poll)
+        return self.latest
+
+    def follow(self, start=None, copy=True, timeout=None, poll=0.001):
+        """Yield every frame from start (by default the next one published) as it is published.
+
+        Frames overwritten before they could be read are skipped and counted
+        in missed.  Stops with TimeoutError if no frame comes for timeout seconds.
+        """
+        index = self.latest + 1 if start is None else start
+        while True:
+            self.wait(index - 1, timeout, poll)
+            oldest = self.latest - self._ring.slots + 1
+            if index < oldest:
+                self.missed += oldest - index
+                index = oldest
+            try:
+                yield self.read(index, copy)
+            except FrameOverwritten:
+                self.missed += 1
+            index += 1
+
+    def close(self):
+        """Detach from the block."""
+        if self._ring is not None:
+            self._ring.close()
+            self._ring = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
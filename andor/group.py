@@ -0,0 +1,115 @@
+"""Acquiring from several cameras at once.
+
+Snapping cameras one after another serializes their exposures and
+transfers, and smears the time between channels by a whole snap per
+camera.  CameraGroup issues the same call to every camera on its own
+thread, so the requests go out together, and returns the results aligned,
+along with when each camera's request started and finished.
+
+    >>> group = CameraGroup([andor.Camera(a) for a in addrs])
+    >>> shot = group.snap()
+    >>> shot.frames[0], shot.finish[1] - shot.start[1]
+    >>> for shot in group.burst(1000, 100, prefetch=4):
+    ...     process(*shot.frames)  # frame k of every camera
+"""
+import time
+from collections import namedtuple
+
+# frames, start and finish hold one entry per camera, in the group's order;
+# start and finish are unix times
+Shot = namedtuple('Shot', ['index', 'frames', 'start', 'finish'])
+
+
+def _timed(fn, *args, **kwargs):
+    start = time.time()
+    out = fn(*args, **kwargs)
+    return out, start, time.time()
+
+
+class CameraGroup:
+    """CameraGroup snaps or bursts several cameras concurrently, keeping their frames aligned."""
+
+    def __init__(self, cameras):
+        """Create a new CameraGroup.
+
+        Parameters
+        ----------
+        cameras : iterable of andor.Camera
+            the cameras, in the order their frames are returned
+
+        """
+        self.cameras = list(cameras)
+        if not self.cameras:
+            raise ValueError('a CameraGroup needs at least one camera')
+
+    def __len__(self):
+        return len(self.cameras)
+
+    def _all(self, pool, fn, index, args):
+        """Call fn(cam_or_gen, ...) for every camera on pool and gather a Shot."""
+        futs = [pool.submit(_timed, fn, a) for a in args]
+        # wait for every camera before raising, so none is left mid-request
+        results = [(f.result(), None) if f.exception() is None else (None, f.exception()) for f in futs]
+        for _, err in results:
+            if err is not None:
+                raise err
+        frames, start, finish = zip(*(r for r, _ in results))
+        return Shot(index, list(frames), list(start), list(finish))
+
+    def snap(self, exposure_time=None, fmt='fits', ret='array'):
+        """Take one image with every camera at once.
+
+        Parameters are those of andor.Camera.snap and apply to every camera.
+
+        Returns
+        -------
+        Shot
+            with index 0, the cameras' frames and the unix times at which
+            each camera's request was sent and its frame decoded
+
+        """
+        from concurrent.futures import ThreadPoolExecutor  # not at import, andor loads this module
+        with ThreadPoolExecutor(len(self.cameras), thread_name_prefix='group-snap') as pool:
+            return self._all(pool, lambda cam: cam.snap(exposure_time, fmt, ret), 0, self.cameras)
+
+    def burst(self, frames, fps, serverSpool=0, **kwargs):
+        """Take a burst with every camera at once, yielding the frames of each index together.
+
+        The bursts are set up concurrently, then frame k is fetched from
+        every camera at once before frame k + 1 is; use prefetch to keep
+        each camera downloading ahead.
+
+        Parameters
+        ----------
+        frames : int
+            number of frames to take in the sequence
+        fps : float
+            framerate to use.  Ensure it is supported by every camera
+        serverSpool : int
+            see andor.Camera.burst
+        kwargs
+            passed to every camera's burst, e.g. prefetch.  downloads='all'
+            yields a single Shot holding each camera's cube
+
+        Returns
+        -------
+        generator
+            yielding a Shot per frame, whose start and finish bracket the
+            wait for that camera's frame
+
+        """
+        gens = [cam.burst(frames, fps, serverSpool, **kwargs) for cam in self.cameras]
+        from concurrent.futures import ThreadPoolExecutor
+        try:
+            with ThreadPoolExecutor(len(self.cameras), thread_name_prefix='group-burst') as pool:
+                index = 0
+                while True:
+                    try:
+                        shot = self._all(pool, next, index, gens)
+                    except StopIteration:
+                        return
+                    yield shot
+                    index += 1
+        finally:
+            for gen in gens:
+                gen.close()
@@ -0,0 +1,187 @@
+"""Live view: the most recent frame, snapped continuously in the background.
+
+Calling snap from a GUI thread freezes the GUI for the exposure, transfer
+and decode of every frame.  A LiveView snaps in a loop on its own thread
+and decodes into the back half of a double buffer, then swaps it to the
+front.  Consumers read whatever frame is newest; frames nobody looked at
+before the next one arrived are dropped (and counted), so a slow consumer
+never builds a backlog.
+
+    >>> with cam.live(exposure_time=0.01) as live:
+    ...     while gui_open():
+    ...         frame = live.latest()  # a copy, safe to keep
+    ...         show(frame.array, f'{live.fps:.1f} fps, decode {live.decode_time * 1e3:.1f} ms')
+
+For fits frames the two buffers are allocated once and reused; view() lends
+out the front buffer without copying it.
+"""
+import logging
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+from golab_common import raise_err, transport
+
+from . import _decode_raw, proces_exposure_time
+from .decode import FrameDecoder
+
+# index counts frames from 1; time is the unix time the snap was answered
+LiveFrame = namedtuple('LiveFrame', ['index', 'time', 'array'])
+
+# weight of the newest sample in the running averages of fps and decode time
+SMOOTHING = 0.2
+
+# seconds to wait after a failed snap before trying again
+RETRY_INTERVAL = 0.5
+
+
+class LiveView:
+    """LiveView snaps a camera continuously on a background thread and keeps the latest frame."""
+
+    def __init__(self, cam, exposure_time=None, fmt='fits', period=0.):
+        """Create a new LiveView; start it with start() or a with block.
+
+        Parameters
+        ----------
+        cam : andor.Camera
+            the camera
+        exposure_time : str, numbers.Number, or astropy.units.Quantity, optional
+            exposure time for every snap, see Camera.snap.  If None, left alone
+        fmt : str, {'fits', 'raw', 'jpg', 'png'}
+            format to snap in, see Camera.snap.  jpg and png are decoded by
+            imageio into a new array every frame
+        period : float
+            least seconds between the starts of two snaps, 0 to snap as fast as possible
+
+        """
+        self.cam = cam
+        self.fmt = fmt.lower()
+        self.period = period
+        self._params = {'exposureTime': '' if exposure_time is None else proces_exposure_time(exposure_time),
+                        'fmt': self.fmt}
+        self._decoder = FrameDecoder()
+        self._buffers = [None, None]
+        self._front = 0
+        self._cv = threading.Condition()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.index = 0  # of the front frame, 0 before the first
+        self.time = None
+        self.fps = 0.
+        self.decode_time = 0.  # seconds, averaged
+        self.dropped = 0  # frames replaced before anyone read them
+        self.errors = 0
+        self.last_error = None
+        self._read = 0  # index of the last frame handed out
+
+    def start(self):
+        """Start snapping on a background thread and return self."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='andor-live', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop snapping, waiting for the snap in flight to finish."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _decode(self, content, back):
+        """Decode one frame, into back if it is a reusable buffer of the right shape."""
+        if self.fmt == 'fits':
+            h = self._decoder.parse(content)
+            if back is None or back.shape != h.shape or back.dtype != h.native_dtype:
+                back = np.empty(h.shape, dtype=h.native_dtype)
+            return self._decoder.decode(content, out=back)
+        if self.fmt == 'raw':
+            shape = self.cam.frame_shape()
+            if len(content) != 2 * shape[0] * shape[1]:
+                shape = self.cam.frame_shape(refresh=True)
+            return _decode_raw(content, shape)
+        from imageio import imread  # non-fits formats are optional
+        return imread(content, format=self.fmt)
+
+    def _run(self):
+        last = None
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                resp = transport.get(f'{self.cam.addr}/image', params=self._params)
+                raise_err(resp)
+                t = time.time()
+                t0 = time.perf_counter()
+                ary = self._decode(resp.content, self._buffers[1 - self._front])
+                dt = time.perf_counter() - t0
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                logging.info(f'live view of {self.cam.addr} failed: {e}')
+                self._stop.wait(RETRY_INTERVAL)
+                continue
+
+            with self._cv:
+                # waits for anyone in view() to be done with the front buffer
+                self._buffers[1 - self._front] = ary
+                self._front = 1 - self._front
+                if self.index and self._read < self.index:
+                    self.dropped += 1
+                self.index += 1
+                self.time = t
+                now = time.monotonic()
+                if last is not None:
+                    self.fps += SMOOTHING * (1 / max(now - last, 1e-9) - self.fps)
+                    self.decode_time += SMOOTHING * (dt - self.decode_time)
+                else:
+                    self.decode_time = dt
+                last = now
+                self._cv.notify_all()
+
+            if self.period:
+                self._stop.wait(self.period - (time.monotonic() - start))
+
+    def _wait(self, after, timeout):
+        """Wait, holding the lock, for a frame newer than after."""
+        after = 0 if after is None else after
+        if not self._cv.wait_for(lambda: self.index > after, timeout):
+            raise TimeoutError(f'no frame newer than {after} within {timeout} s; last error: {self.last_error}')
+        self._read = self.index
+        return LiveFrame(self.index, self.time, self._buffers[self._front])
+
+    def latest(self, after=None, timeout=None):
+        """A copy of the newest frame, as a LiveFrame.
+
+        Parameters
+        ----------
+        after : int, optional
+            wait for a frame with a higher index than this, e.g. the index of
+            the last frame shown.  By default only waits for the first frame
+        timeout : float, optional
+            seconds to wait, forever if None.  TimeoutError is raised after
+
+        """
+        with self._cv:
+            f = self._wait(after, timeout)
+            return f._replace(array=f.array.copy())
+
+    @contextmanager
+    def view(self, after=None, timeout=None):
+        """Lend out the newest frame without copying it, see latest.
+
+        The array is only valid inside the with block, which holds up the
+        swap of the next frame to the front; keep it short.
+        """
+        with self._cv:
+            yield self._wait(after, timeout)
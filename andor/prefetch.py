@@ -0,0 +1,130 @@
+"""Pipelined download of burst frames.
+
+/burst/frame hands out the next frame of the burst, whatever request asks
+for it, so the order frames come back in is the order the server answers.
+FramePrefetcher keeps several requests in flight on separate connections
+but only lets a request be sent once the previous one has been answered,
+i.e. its response headers have arrived and the server has committed to that
+frame.  Reading the body, which is nearly all of the time for a large frame,
+and decoding it then overlap with the next requests and with whatever the
+consumer does with earlier frames.
+
+    >>> for frame in cam.burst(1000, 100, prefetch=4):
+    ...     process(frame)
+"""
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from golab_common import raise_err, transport
+
+from .decode import FrameDecoder
+
+
+class FramePrefetcher:
+    """FramePrefetcher downloads and decodes a burst's frames ahead of the consumer, in order."""
+
+    def __init__(self, url, frames, depth=4, queue=None, decoder=None, ring=None):
+        """Create a new FramePrefetcher.
+
+        Parameters
+        ----------
+        url : str
+            full URL of the /burst/frame route
+        frames : int
+            number of frames to download
+        depth : int
+            number of frames being downloaded or decoded at once
+        queue : int, optional
+            number of decoded frames held waiting for the consumer, defaults to depth
+        decoder : andor.decode.FrameDecoder, optional
+            decoder to use, so its header cache can be shared
+        ring : andor.ring.FrameRing, optional
+            if given, frames are decoded into its slots and yielded as Slots.
+            Slots are taken in frame order, when a frame's request is sent
+
+        """
+        if depth < 1:
+            raise ValueError('depth must be at least 1')
+        self.url = url
+        self.frames = frames
+        self.depth = depth
+        self.queue = depth if queue is None else queue
+        self.decoder = decoder or FrameDecoder()
+        self.ring = ring
+        self._turn = 0  # index of the frame whose request may be sent next
+        self._cv = threading.Condition()
+        self._closed = False
+
+    def _acquire(self):
+        """A free slot of the ring, or None if the prefetcher was closed while waiting for one."""
+        while not self._closed:
+            try:
+                return self.ring.acquire(timeout=0.1)
+            except TimeoutError:
+                pass
+        return None
+
+    def _fetch(self, k):
+        with self._cv:
+            self._cv.wait_for(lambda: self._turn == k or self._closed)
+        slot = None
+        try:
+            if self._closed:
+                return None
+            if self.ring is not None:
+                slot = self._acquire()
+                if slot is None:
+                    return None
+            # stream=True returns once the headers are in; the frame is ours
+            resp = transport.get(self.url, stream=True)
+        except BaseException:
+            if slot is not None:
+                slot.release()
+            raise
+        finally:
+            with self._cv:
+                self._turn += 1
+                self._cv.notify_all()
+
+        try:
+            with resp:
+                raise_err(resp)
+                content = resp.content
+            if slot is None:
+                return self.decoder.decode(content)
+            self.decoder.decode(content, out=slot.array)
+            return slot
+        except BaseException:
+            if slot is not None:
+                slot.release()
+            raise
+
+    def __iter__(self):
+        """Yield the frames in order, raising any error at the frame it occurred for."""
+        pending = deque()
+        submitted = 0
+        try:
+            with ThreadPoolExecutor(self.depth, thread_name_prefix='burst-prefetch') as pool:
+                try:
+                    for _ in range(self.frames):
+                        while submitted < self.frames and len(pending) < self.depth + self.queue:
+                            pending.append(pool.submit(self._fetch, submitted))
+                            submitted += 1
+                        yield pending.popleft().result()
+                finally:
+                    self.close()
+                    for fut in pending:
+                        fut.cancel()
+        finally:
+            # frames downloaded for a consumer that went away give their slots back
+            if self.ring is not None:
+                for fut in pending:
+                    if not fut.cancelled() and fut.exception() is None and fut.result() is not None:
+                        fut.result().release()
+
+    def close(self):
+        """Stop sending requests; ones already sent are finished."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
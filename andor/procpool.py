@@ -0,0 +1,179 @@
+"""Decoding FITS frames on a pool of processes.
+
+Decoding a frame is a byteswap and a sign flip over every pixel; at high
+frame rates one core doing that for a whole burst is the bottleneck.
+DecodePool spreads the work over worker processes without pickling any
+pixels: the FITS data of each frame is read into a slot of a shared memory
+input block (straight off the socket when given a response stream), a worker
+converts it into a slot of a shared memory output FrameRing, and the pool
+yields the output Slots in the order the frames went in.
+
+    >>> with DecodePool(procs=8) as pool:
+    ...     for slot in cam.burst(10_000, 500, decode_pool=pool):
+    ...         with slot as frame:
+    ...             process(frame)
+
+Slots must be released for the burst to go on, see andor.ring.  The
+frames of one pool must all have the same shape.
+"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+import numpy as np
+
+from .decode import FITSFormatError, FrameDecoder, read_header
+from .fanout import _attach as _attach_block
+from .ring import FrameRing
+from .stream import _read_exactly, _readinto
+
+# shared memory blocks attached by this worker process, by name
+_attached = {}
+
+
+def _attach(name):
+    shm = _attached.get(name)
+    if shm is None:
+        # the pool, whose resource tracker workers report to, owns the block and unlinks it
+        shm = _attached[name] = _attach_block(name, creators_tracker=True)
+    return shm
+
+
+def _convert(src, src_off, header, dst, dst_off):
+    """Convert the data at src_off in block src into the frame at dst_off in block dst; run on a worker."""
+    out = np.ndarray(header.shape, dtype=header.native_dtype, buffer=_attach(dst).buf, offset=dst_off)
+    header.convert(_attach(src).buf[src_off:src_off + header.nbytes], out)
+
+
+class DecodePool:
+    """DecodePool decodes FITS frames on worker processes through shared memory, keeping their order."""
+
+    def __init__(self, procs=None, slots=None, hold=2, mp_context=None):
+        """Create a new DecodePool.  Shared memory is allocated when the first frame arrives.
+
+        Parameters
+        ----------
+        procs : int, optional
+            number of worker processes, by default one per core
+        slots : int, optional
+            number of frames being decoded at once, by default 2 * procs
+        hold : int
+            number of decoded frames the consumer may hold on to at once
+            without stalling the pool
+        mp_context : multiprocessing context, optional
+            how to start the workers, see concurrent.futures.ProcessPoolExecutor
+
+        """
+        self.procs = procs or os.cpu_count()
+        self.slots = slots or 2 * self.procs
+        self.hold = hold
+        self.header = None
+        self.ring = None  # output Slots, over shared memory
+        # started before the workers are, so they all report to it rather than start their own
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(self.procs, mp_context=mp_context)
+        self._decoder = FrameDecoder()
+        self._src = None
+        self._dst = None
+        self._free = deque(range(self.slots))  # input slots not in use
+
+    def _setup(self, h):
+        if self.header is not None:
+            if h.shape != self.header.shape or h.dtype != self.header.dtype:
+                raise ValueError(f'frames of a DecodePool must all be alike, got {h.dtype} {h.shape} '
+                                 f'after {self.header.dtype} {self.header.shape}')
+            return
+        n = self.slots + self.hold
+        self._src = shared_memory.SharedMemory(create=True, size=self.slots * h.nbytes)
+        self._dst = shared_memory.SharedMemory(create=True, size=n * h.nbytes)
+        self.ring = FrameRing(h.shape, n, h.native_dtype, buffer=self._dst.buf)
+        self.header = h
+
+    def _read(self, src, idx):
+        """Put the data of the FITS file src into input slot idx, returning its Header."""
+        if hasattr(src, 'readinto'):
+            h = read_header(lambda n: _read_exactly(src, n))
+            self._setup(h)
+            if _readinto(src, self._src.buf[idx * h.nbytes:(idx + 1) * h.nbytes]) < h.nbytes:
+                raise FITSFormatError('FITS data truncated')
+            src.read()  # the padding, so the connection can be reused
+        else:
+            h = self._decoder.parse(src)
+            if len(src) < h.size + h.nbytes:
+                raise FITSFormatError(f'FITS data truncated, expected {h.size + h.nbytes} bytes, got {len(src)}')
+            self._setup(h)
+            self._src.buf[idx * h.nbytes:(idx + 1) * h.nbytes] = memoryview(src)[h.size:h.size + h.nbytes]
+        return h
+
+    def _finish(self, item):
+        fut, idx, slot = item
+        try:
+            fut.result()
+        except BaseException:
+            slot.release()
+            raise
+        finally:
+            self._free.append(idx)
+        return slot
+
+    def map(self, sources):
+        """Decode FITS files, yielding an andor.ring.Slot holding each, in order.
+
+        Parameters
+        ----------
+        sources : iterable
+            bytes-like FITS files, or file-like objects with readinto, e.g.
+            the raw stream of a response, which are read before the next
+            source is taken
+
+        """
+        pending = deque()  # (future, input slot, output Slot)
+        try:
+            for src in sources:
+                if not self._free:
+                    yield self._finish(pending.popleft())
+                idx = self._free.popleft()
+                try:
+                    h = self._read(src, idx)
+                    while self.ring.free == 0 and pending:
+                        yield self._finish(pending.popleft())
+                    slot = self.ring.acquire()
+                except BaseException:
+                    self._free.append(idx)
+                    raise
+                fut = self._pool.submit(_convert, self._src.name, idx * h.nbytes, h,
+                                        self._dst.name, slot.index * h.nbytes)
+                pending.append((fut, idx, slot))
+            while pending:
+                yield self._finish(pending.popleft())
+        finally:
+            # frames decoded for a consumer that went away give their slots back
+            for fut, idx, slot in pending:
+                fut.exception()
+                slot.release()
+                self._free.append(idx)
+
+    def close(self):
+        """Stop the workers and free the shared memory.  Slots must not be used afterwards."""
+        self._pool.shutdown()
+        if self.ring is not None:
+            # slots and ring refer to each other; drop the views now rather than at the next gc
+            for slot in self.ring.slots:
+                slot.array = None
+            self.ring._block = None
+            self.ring = None
+        for shm in (self._src, self._dst):
+            if shm is not None:
+                try:
+                    shm.close()
+                except BufferError:
+                    pass  # a frame is still referenced; the memory goes when it does
+                shm.unlink()
+        self._src = self._dst = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,126 @@
+"""Per-frame quick-look metrics: sum, peak, saturation, centroid and a histogram.
+
+For monitoring runs that only need a few numbers per frame, QuickLook
+reduces each frame to one record of a structured array, computed on a
+thread pool while the next frames download, so the frames themselves can
+be dropped (or kept, with_frames=True).
+
+    >>> ql = QuickLook(bins=32)
+    >>> table = ql.run(cam.burst(10_000, 100, prefetch=4))
+    >>> table['peak'].max(), table['cx'].std()
+
+Integer frames of at most 16 bits are reduced through a single bincount of
+their pixel values, from which the sum, peak, saturated count and histogram
+all follow without another pass over the pixels; only the centroid needs
+row and column sums.
+"""
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+class QuickLook:
+    """QuickLook computes a record of metrics per frame on a pool of worker threads."""
+
+    def __init__(self, bins=64, value_range=(0, 65536), saturation=65535, workers=2):
+        """Create a new QuickLook.
+
+        Parameters
+        ----------
+        bins : int
+            number of equal histogram bins over value_range
+        value_range : tuple of int
+            lowest and highest pixel values covered by the histogram; bins
+            are half open but for the last, as in numpy.histogram
+        saturation : int or float
+            pixels at or above this value count as saturated
+        workers : int
+            number of frames reduced at once
+
+        """
+        lo, hi = value_range
+        if not 0 < bins <= hi - lo:
+            raise ValueError(f'bins must be between 1 and {hi - lo} for value_range {value_range}')
+        self.bins = bins
+        self.value_range = (lo, hi)
+        self.saturation = saturation
+        self.workers = workers
+        self.edges = np.linspace(lo, hi, bins + 1)
+        # the first integer in each bin, relative to lo, for the bincount path
+        self._starts = (np.ceil(self.edges[:-1]) - lo).astype(np.intp)
+        self.dtype = np.dtype([
+            ('index', '<i8'),
+            ('sum', '<f8'),
+            ('peak', '<f8'),
+            ('saturated', '<i8'),
+            ('cy', '<f8'),
+            ('cx', '<f8'),
+            ('hist', '<i8', (bins,)),
+        ])
+
+    def compute(self, frame, index=0, out=None):
+        """The metrics of one 2D frame, as a record of self.dtype.
+
+        cy and cx are the intensity-weighted row and column, NaN for a
+        frame summing to zero.  out, a record to fill, may be given instead.
+        """
+        if out is None:
+            out = np.zeros((), dtype=self.dtype)
+        frame = np.asarray(frame)
+        out['index'] = index
+        lo, hi = self.value_range
+        if frame.dtype.kind in 'ub' and frame.dtype.itemsize <= 2:
+            counts = np.bincount(frame.ravel(), minlength=max(hi + 1, int(self.saturation) + 1))
+            values = np.arange(len(counts), dtype=np.float64)
+            total = counts @ values
+            out['peak'] = np.flatnonzero(counts)[-1]
+            out['saturated'] = counts[int(np.ceil(self.saturation)):].sum()
+            # the last bin includes hi, as in numpy.histogram
+            window = counts[max(lo, 0):hi + 1]
+            if lo < 0:  # no pixel of an unsigned frame is below 0
+                window = np.concatenate((np.zeros(-lo, counts.dtype), window))
+            out['hist'] = np.add.reduceat(window, self._starts)
+        else:
+            total = frame.sum(dtype=np.float64)
+            out['peak'] = frame.max()
+            out['saturated'] = np.count_nonzero(frame >= self.saturation)
+            out['hist'] = np.histogram(frame, self.edges)[0]
+        out['sum'] = total
+
+        rows = frame.sum(axis=1, dtype=np.float64)
+        cols = frame.sum(axis=0, dtype=np.float64)
+        if total:
+            out['cy'] = rows @ np.arange(len(rows)) / total
+            out['cx'] = cols @ np.arange(len(cols)) / total
+        else:
+            out['cy'] = out['cx'] = np.nan
+        return out
+
+    def _compute(self, frame, index, keep):
+        # ring Slots are released once reduced, unless the consumer is given them too
+        if hasattr(frame, 'release') and not keep:
+            with frame as ary:
+                return self.compute(ary, index)
+        return self.compute(getattr(frame, 'array', frame), index)
+
+    def map(self, frames, with_frames=False):
+        """Yield the metrics of each frame of an iterable, in order, computed on the worker threads.
+
+        If with_frames, yield (frame, record) pairs instead.  Otherwise frames
+        which are andor.ring.Slots are released once reduced.
+        """
+        pending = deque()
+        with ThreadPoolExecutor(self.workers, thread_name_prefix='quicklook') as pool:
+            for i, frame in enumerate(frames):
+                pending.append((frame, pool.submit(self._compute, frame, i, with_frames)))
+                if len(pending) > self.workers:
+                    frame, fut = pending.popleft()
+                    yield (frame, fut.result()) if with_frames else fut.result()
+            while pending:
+                frame, fut = pending.popleft()
+                yield (frame, fut.result()) if with_frames else fut.result()
+
+    def run(self, frames):
+        """The metrics of every frame of an iterable, as a record array of self.dtype."""
+        return np.rec.array(np.array(list(self.map(frames)), dtype=self.dtype))
@@ -0,0 +1,138 @@
+"""Streaming per-pixel statistics of a burst.
+
+Stacking a burst into a cube only to take cube.mean(axis=0) holds every
+frame in memory at once.  FrameStats instead folds frames in one at a time
+into a handful of frame-sized float64 accumulators: the running mean and sum
+of squared deviations (Welford's method, which does not lose precision the
+way sum(x**2) - sum(x)**2 / n does), the co-added sum, and the minimum and
+maximum.  Memory use is independent of the number of frames.
+
+    >>> stats = FrameStats()
+    >>> stats.update(cam.burst(10_000, 100, prefetch=4))
+    >>> stats.mean, stats.std(), stats.max
+
+Accumulators of separate FrameStats, e.g. filled on different threads or
+from different bursts, can be combined with merge.
+"""
+import numpy as np
+
+
+class FrameStats:
+    """FrameStats accumulates the per-pixel count, mean, variance, sum, min and max of frames."""
+
+    def __init__(self, shape=None):
+        """Create a new FrameStats.
+
+        Parameters
+        ----------
+        shape : tuple of int, optional
+            (height, width) of a frame; taken from the first frame if not given
+
+        """
+        self.count = 0
+        self.shape = None if shape is None else tuple(shape)
+        self.mean = None
+        self.sum = None
+        self.min = None
+        self.max = None
+        self._m2 = None  # sum of squared deviations from the mean
+        self._delta = None  # scratch, so add allocates nothing
+        self._tmp = None
+
+    def _alloc(self, frame):
+        if self.shape is None:
+            self.shape = frame.shape
+        elif frame.shape != self.shape:
+            raise ValueError(f'frame is {frame.shape}, expected {self.shape}')
+        if self.mean is None:
+            self.mean, self.sum, self._m2, self._delta, self._tmp = (
+                np.zeros(self.shape, dtype=np.float64) for _ in range(5))
+            self.min = frame.copy()
+            self.max = frame.copy()
+
+    def add(self, frame):
+        """Fold one (height, width) frame into the statistics.
+
+        frame may also be a (frames, height, width) cube, as from
+        Camera.burst(downloads='all'), or an andor.ring.Slot, which is
+        released once it has been read.
+        """
+        if hasattr(frame, 'release'):
+            with frame as ary:
+                return self.add(ary)
+        frame = np.asarray(frame)
+        if frame.ndim == 3:
+            for f in frame:
+                self.add(f)
+            return
+        self._alloc(frame)
+
+        self.count += 1
+        d, tmp = self._delta, self._tmp
+        np.subtract(frame, self.mean, out=d)
+        np.multiply(d, 1 / self.count, out=tmp)
+        self.mean += tmp
+        # M2 += (x - old mean) * (x - new mean)
+        np.subtract(frame, self.mean, out=tmp)
+        tmp *= d
+        self._m2 += tmp
+        self.sum += frame
+        np.minimum(self.min, frame, out=self.min)
+        np.maximum(self.max, frame, out=self.max)
+
+    def update(self, frames):
+        """Fold in every frame of an iterable, e.g. the generator returned by Camera.burst.  Returns self."""
+        for frame in frames:
+            self.add(frame)
+        return self
+
+    def merge(self, other):
+        """Fold the frames accumulated by another FrameStats into this one.  Returns self."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.shape = other.shape
+            self.mean, self.sum, self._m2 = other.mean.copy(), other.sum.copy(), other._m2.copy()
+            self._delta, self._tmp = np.zeros_like(self.mean), np.zeros_like(self.mean)
+            self.min, self.max = other.min.copy(), other.max.copy()
+            self.count = other.count
+            return self
+        if other.shape != self.shape:
+            raise ValueError(f'cannot merge statistics of {other.shape} frames into {self.shape}')
+
+        # Chan et al.'s pairwise update
+        na, nb = self.count, other.count
+        n = na + nb
+        d = np.subtract(other.mean, self.mean, out=self._delta)
+        np.multiply(d, nb / n, out=self._tmp)
+        self.mean += self._tmp
+        d *= d
+        d *= na * nb / n
+        self._m2 += other._m2
+        self._m2 += d
+        self.sum += other.sum
+        np.minimum(self.min, other.min, out=self.min)
+        np.maximum(self.max, other.max, out=self.max)
+        self.count = n
+        return self
+
+    def variance(self, ddof=0):
+        """Per-pixel variance, with n - ddof in the denominator as in numpy.var."""
+        if self.count - ddof <= 0:
+            raise ValueError(f'variance of {self.count} frames with ddof={ddof} is undefined')
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof=0):
+        """Per-pixel standard deviation, see variance."""
+        return np.sqrt(self.variance(ddof))
+
+    def products(self, ddof=0):
+        """The reduced products as a dict: count, mean, var, sum, min and max."""
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'var': self.variance(ddof),
+            'sum': self.sum,
+            'min': self.min,
+            'max': self.max,
+        }
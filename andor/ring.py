@@ -0,0 +1,102 @@
+"""A fixed pool of preallocated frame buffers for continuous acquisition.
+
+Allocating a fresh multi-megabyte array for every frame of an hours long
+acquisition fragments memory and keeps the garbage collector busy.  A
+FrameRing allocates its slots once; snap and burst decode into a free slot
+and hand it out, and the slot goes back to the pool when the consumer
+releases it, explicitly or by leaving a with block.
+
+    >>> ring = cam.frame_ring(slots=8)
+    >>> for slot in cam.burst(100_000, 100, ring=ring):
+    ...     with slot as frame:  # frame is slot.array
+    ...         process(frame)
+
+If every slot is held, acquiring the next one blocks until a slot is
+released, which throttles the download to the consumer.
+"""
+import threading
+from collections import deque
+
+import numpy as np
+
+
+class Slot:
+    """Slot is one buffer of a FrameRing, on loan to the consumer until released."""
+
+    __slots__ = ('ring', 'index', 'array', 'held')
+
+    def __init__(self, ring, index, array):
+        """Create a new Slot; done by FrameRing."""
+        self.ring = ring
+        self.index = index
+        self.array = array
+        self.held = False
+
+    def release(self):
+        """Return the slot to its ring.  The array must not be used afterwards."""
+        self.ring._release(self)
+
+    def __enter__(self):
+        return self.array
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class FrameRing:
+    """FrameRing is a fixed pool of preallocated frame buffers handed out as Slots."""
+
+    def __init__(self, shape, slots=8, dtype=np.uint16, buffer=None):
+        """Create a new FrameRing.
+
+        Parameters
+        ----------
+        shape : tuple of int
+            (height, width) of a frame
+        slots : int
+            number of buffers
+        dtype : numpy.dtype
+            type of the buffers
+        buffer : buffer, optional
+            memory to lay the slots out in, e.g. the buf of a
+            multiprocessing.shared_memory.SharedMemory.  Allocated if not given
+
+        """
+        if slots < 1:
+            raise ValueError('a FrameRing needs at least one slot')
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        # one block, so the slots are contiguous and allocated exactly once
+        if buffer is None:
+            self._block = np.zeros((slots, *self.shape), dtype=self.dtype)
+        else:
+            self._block = np.ndarray((slots, *self.shape), dtype=self.dtype, buffer=buffer)
+        self.slots = [Slot(self, i, self._block[i]) for i in range(slots)]
+        self._free = deque(self.slots)
+        self._cv = threading.Condition()
+
+    def acquire(self, timeout=None):
+        """Take a free slot, waiting up to timeout seconds (None = forever) for one to be released."""
+        with self._cv:
+            if not self._cv.wait_for(lambda: self._free, timeout):
+                raise TimeoutError(f'no free slot in {len(self.slots)} within {timeout} s; '
+                                   'are slots being released?')
+            slot = self._free.popleft()
+            slot.held = True
+            return slot
+
+    def _release(self, slot):
+        with self._cv:
+            if not slot.held:
+                raise ValueError(f'slot {slot.index} released twice')
+            slot.held = False
+            self._free.append(slot)
+            self._cv.notify()
+
+    @property
+    def free(self):
+        """Number of slots not held by anyone."""
+        return len(self._free)
+
+    def __len__(self):
+        return len(self.slots)
@@ -0,0 +1,127 @@
+"""Streaming download of a whole burst into one preallocated cube.
+
+/burst/all-frames returns every frame left in the burst as one FITS cube.
+Reading the body into memory and decoding it costs three copies of the
+cube at once and, past 2 GB, trips limits in cFITSIO.  BurstStream instead
+reads the response a frame at a time straight off the socket, converts each
+frame into its slot of the output array, and can hand each frame out as soon
+as it has arrived.  The output can be an np.memmap, in which case the burst
+never has to fit in memory at all.
+
+Large bursts are fetched in several requests of at most chunk_bytes each,
+by passing frames=N to /burst/all-frames.  A server which ignores that sends
+everything at once, which is handled the same way.
+
+    >>> s = BurstStream(f'{cam.addr}/burst/all-frames', 5000)
+    >>> for frame in s:  # each as it arrives
+    ...     process(frame)
+    >>> s.out.shape
+    (5000, 2048, 2048)
+"""
+import numpy as np
+
+from golab_common import raise_err, transport
+
+from .decode import FITSFormatError, read_header
+
+DEFAULT_CHUNK_BYTES = 1 << 30
+
+
+def _read_exactly(raw, n):
+    """Read n bytes from the file-like raw, fewer only at its end."""
+    buf = bytearray(n)
+    got = _readinto(raw, memoryview(buf))
+    return bytes(buf[:got])
+
+
+def _readinto(raw, mv):
+    """Fill the memoryview mv from raw, returning the number of bytes read."""
+    got = 0
+    while got < len(mv):
+        n = raw.readinto(mv[got:])
+        if not n:
+            break
+        got += n
+    return got
+
+
+class BurstStream:
+    """BurstStream downloads the frames of a burst into one array, frame by frame."""
+
+    def __init__(self, url, frames, out=None, chunk_bytes=DEFAULT_CHUNK_BYTES):
+        """Create a new BurstStream.
+
+        Parameters
+        ----------
+        url : str
+            full URL of the /burst/all-frames route
+        frames : int
+            number of frames in the burst
+        out : numpy.ndarray, optional
+            array of shape (frames, height, width) and the frames' native dtype
+            (uint16) to write into, e.g. an np.memmap or one reused across
+            bursts.  Allocated when the first frame arrives if not given
+        chunk_bytes : int
+            largest response to ask the server for, bytes
+
+        """
+        self.url = url
+        self.frames = frames
+        self.out = out
+        self.chunk_bytes = chunk_bytes
+        self.received = 0
+
+    def _alloc(self, h):
+        shape = (self.frames, *h.shape[-2:])
+        if self.out is None:
+            self.out = np.empty(shape, dtype=h.native_dtype)
+        elif self.out.shape != shape or self.out.dtype != h.native_dtype:
+            raise ValueError(f'out must be {h.native_dtype} of shape {shape}, '
+                             f'is {self.out.dtype} of {self.out.shape}')
+
+    def _request(self, n):
+        """Stream one response of up to n frames into out, yielding the index of each frame."""
+        resp = transport.get(self.url, params={'frames': n}, stream=True)
+        with resp:
+            raise_err(resp)
+            raw = resp.raw
+            h = read_header(lambda k: _read_exactly(raw, k))
+            count = h.shape[0] if len(h.shape) == 3 else 1
+            if self.received + count > self.frames:
+                raise FITSFormatError(f'server sent {self.received + count} frames, expected {self.frames}')
+            self._alloc(h)
+
+            frame_bytes = h.nbytes // count
+            scratch = bytearray(frame_bytes)
+            mv = memoryview(scratch)
+            for _ in range(count):
+                if _readinto(raw, mv) < frame_bytes:
+                    raise FITSFormatError(f'burst response ended after {self.received} frames')
+                h.convert(scratch, self.out[self.received])
+                self.received += 1
+                yield self.received - 1
+            raw.read()  # the padding after the last frame, so the connection can be reused
+
+    def __iter__(self):
+        """Yield each frame, a view into out, once it has fully arrived."""
+        for i in self.indices():
+            yield self.out[i]
+
+    def indices(self):
+        """Yield the index of each frame in out once it has fully arrived."""
+        # unless out gives it away, one frame first to learn the frame size,
+        # then chunks as large as allowed
+        per_request = 1 if self.out is None else max(1, self.chunk_bytes // self.out[0].nbytes)
+        while self.received < self.frames:
+            before = self.received
+            yield from self._request(min(per_request, self.frames - self.received))
+            if self.received == before:
+                raise FITSFormatError(f'server sent no frames after {before} of {self.frames}')
+            frame_bytes = self.out[0].nbytes
+            per_request = max(1, self.chunk_bytes // frame_bytes)
+
+    def read(self):
+        """Download the rest of the burst and return out."""
+        for _ in self.indices():
+            pass
+        return self.out
@@ -0,0 +1,139 @@
+"""Acquiring frames over a list of camera settings, e.g. an exposure ladder.
+
+A set, snap, decode loop leaves the camera idle while each frame is
+downloaded and decoded.  sweep sends the snap for a step as soon as that
+step's settings are applied, and once the server answers, which it does
+after the exposure, hands the body to a worker to download and decode
+straight into a preallocated cube.  The next step's settings are then
+applied while the previous frame is still on its way.  Settings which did
+not change since the last step are not written again, and exposure times
+travel with the snap request instead of in a request of their own.
+
+    >>> ladder = [{'exposure_time': t} for t in np.geomspace(1e-3, 1, 20)]
+    >>> result = sweep(cam, ladder, repeat=2)  # pairs, for a photon transfer curve
+    >>> result.cube.shape, result.table['exposure_time']
+"""
+import time
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from golab_common import raise_err, transport
+
+from . import _changes_shape, _writable, proces_exposure_time
+from .decode import FrameDecoder
+
+# cube is (frames, height, width) uint16; table a numpy record array with a
+# row per frame: step, every setting, and the unix times the snap was sent
+# (start) and answered (finish)
+SweepResult = namedtuple('SweepResult', ['cube', 'table'])
+
+_UNSET = object()
+
+# Camera and EMCCD methods a sweep may set through; other names must be writable features
+SETTERS = frozenset(('exposure_time', 'em_gain', 'em_gain_mode', 'fan', 'sensor_cooling', 'shutter', 'shutter_auto',
+                     'shutter_speed', 'temperature_setpt'))
+
+
+def _check(cam, names):
+    """Raise ValueError unless every name is a setter in SETTERS or a writable feature of cam."""
+    others = [k for k in names if k not in SETTERS]
+    if not others:
+        return
+    features = cam.features()
+    for k in others:
+        if _changes_shape(k):
+            raise ValueError(f'sweep settings may not change the frame shape, got {k}')
+        if k not in features or features[k] == 'command' or not _writable(k, cam.get_feature_info(k)):
+            raise ValueError(f'{k} is neither a setter in andor.sweep.SETTERS nor a writable feature')
+
+
+def _apply(cam, key, value):
+    """Apply one setting, through the Camera method of that name if it is in SETTERS, else as a feature."""
+    if key in SETTERS:
+        getattr(cam, key)(value)
+    else:
+        cam.set_feature(key, value)
+
+
+def _fetch(resp, decoder, out):
+    with resp:
+        raise_err(resp)
+        decoder.decode(resp.content, out=out)
+
+
+def sweep(cam, settings, repeat=1, out=None, workers=2):
+    """Take repeat frames at each of a list of settings.
+
+    Parameters
+    ----------
+    cam : andor.Camera
+        the camera
+    settings : iterable of dict
+        one dict per step of name => value, applied in order.  Names are
+        setters of cam in SETTERS (exposure_time, em_gain, shutter, ...) or
+        else writable features for set_feature; anything else is a
+        ValueError.  A setting keeps its value in later steps that do not
+        name it.  Settings may not change the frame shape
+    repeat : int
+        frames to take at each step
+    out : numpy.ndarray, optional
+        uint16 array of shape (steps * repeat, height, width) to write into
+    workers : int
+        number of frames being downloaded and decoded at once, which is
+        also the most responses held open
+
+    Returns
+    -------
+    SweepResult
+        the cube of frames and the table of settings
+
+    """
+    settings = [dict(s) for s in settings]
+    _check(cam, {k for s in settings for k in s})
+    n = len(settings) * repeat
+    shape = (n, *cam.frame_shape())
+    if out is None:
+        out = np.empty(shape, dtype=np.uint16)
+    elif out.shape != shape or out.dtype != np.uint16:
+        raise ValueError(f'out must be uint16 of shape {shape}, is {out.dtype} of {out.shape}')
+
+    decoder = FrameDecoder()  # shared by the workers, its header cache is thread safe
+    start, finish = np.empty(n), np.empty(n)
+    state, rows = {}, []
+    pending = deque()
+    with ThreadPoolExecutor(workers, thread_name_prefix='sweep-decode') as pool:
+        i = 0
+        for step, s in enumerate(settings):
+            exposure = ''  # not given, do not update
+            for k, v in s.items():
+                if state.get(k, _UNSET) == v:
+                    continue
+                if k == 'exposure_time':
+                    exposure = proces_exposure_time(v)
+                else:
+                    _apply(cam, k, v)
+            state.update(s)
+
+            for _ in range(repeat):
+                # each open response holds a pooled connection and a frame on the server
+                while len(pending) >= workers:
+                    pending.popleft().result()
+                start[i] = time.time()
+                # stream=True returns once the headers are in, i.e. once the frame is taken
+                resp = transport.get(f'{cam.addr}/image', params={'exposureTime': exposure, 'fmt': 'fits'},
+                                     stream=True)
+                finish[i] = time.time()
+                exposure = ''
+                pending.append(pool.submit(_fetch, resp, decoder, out[i]))
+                rows.append((step, dict(state)))
+                i += 1
+        for fut in pending:
+            fut.result()
+
+    names = list(state)
+    cols = [np.array([r[0] for r in rows])]
+    cols += [np.array([r[1].get(k) for r in rows]) for k in names]
+    table = np.rec.fromarrays(cols + [start, finish], names=['step', *names, 'start', 'finish'])
+    return SweepResult(out, table)
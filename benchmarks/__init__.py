@@ -0,0 +1 @@
+"""Benchmarks for the clients, run against an in-process stand-in server.  See benchmarks.run."""
@@ -0,0 +1,258 @@
+"""Run client workloads against a FakeServer and report throughput and latency.
+
+    python -m benchmarks.run                       # every workload
+    python -m benchmarks.run camera.burst axis.pos --latency 0.002 --jitter 0.0005 --frame 2048x2048
+
+Each workload reports calls/sec, p50 and p99 latency per call, and MB/s
+received (taken from golab_common.metrics).
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+import andor
+import cryocon
+import daq
+import fluke
+import motion
+import nkt
+import thermocube
+import thorlabs
+import tmc
+from golab_common import aio, metrics
+
+from .server import FakeServer
+
+WORKLOADS = {}
+
+
+def workload(name):
+    """Register a workload function under name.
+
+    A workload is called as f(srv, n) and returns an iterable of per-call
+    latencies in seconds, or a (latencies, calls) tuple if one timed
+    operation covers several calls.
+    """
+    def decorator(func):
+        WORKLOADS[name] = func
+        return func
+    return decorator
+
+
+def timed(func, n):
+    """Call func n times, returning the latency of each call."""
+    out = []
+    for _ in range(n):
+        start = time.perf_counter()
+        func()
+        out.append(time.perf_counter() - start)
+    return out
+
+
+@workload('axis.pos')
+def axis_pos(srv, n):
+    ax = motion.Axis(srv.addr('motion'), 'X')
+    return timed(ax.pos, n)
+
+
+@workload('axis.wait_inpos')
+def axis_wait_inpos(srv, n):
+    ax = motion.Axis(srv.addr('motion'), 'X')
+
+    def move():
+        ax.move_rel(1)
+        ax.wait_inpos(min_interval=0.001)
+    return timed(move, max(n // 10, 1))
+
+
+@workload('controller.pos.async')
+def controller_pos_async(srv, n):
+    ctl = motion.AsyncController(srv.addr('motion'))
+
+    async def run():
+        lat = []
+
+        async def one(ax):
+            start = time.perf_counter()
+            await ax.pos()
+            lat.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(ax) for _ in range(n) for ax in (ctl.x, ctl.y, ctl.z)))
+        await aio.close_all()
+        return lat
+
+    return asyncio.run(run())
+
+
+@workload('camera.snap')
+def camera_snap(srv, n):
+    cam = andor.Camera(srv.addr('camera'))
+    return timed(cam.snap, max(n // 10, 1))
+
+
+@workload('camera.snap.raw')
+def camera_snap_raw(srv, n):
+    cam = andor.Camera(srv.addr('camera'))
+    return timed(lambda: cam.snap(fmt='raw'), max(n // 10, 1))
+
+
+@workload('camera.decode.fits')
+def camera_decode_fits(srv, n):
+    """Client-side decode alone, FITS; compare with camera.decode.raw."""
+    from andor.decode import FrameDecoder
+    content = andor.Camera(srv.addr('camera')).snap(ret='file')
+    dec = FrameDecoder()
+    return timed(lambda: dec.decode(content), n)
+
+
+@workload('camera.decode.raw')
+def camera_decode_raw(srv, n):
+    """Client-side decode alone, fmt=raw."""
+    from andor import _decode_raw
+    cam = andor.Camera(srv.addr('camera'))
+    content = cam.snap(fmt='raw', ret='file')
+    return timed(lambda: _decode_raw(content, cam.frame_shape()), n)
+
+
+@workload('camera.burst')
+def camera_burst(srv, n):
+    cam = andor.Camera(srv.addr('camera'))
+    frames = max(n // 10, 1)
+    lat = []
+    start = time.perf_counter()
+    for _ in cam.burst(frames, 100):
+        now = time.perf_counter()
+        lat.append(now - start)
+        start = now
+    return lat
+
+
+@workload('camera.burst.prefetch')
+def camera_burst_prefetch(srv, n):
+    cam = andor.Camera(srv.addr('camera'))
+    frames = max(n // 10, 1)
+    lat = []
+    start = time.perf_counter()
+    for _ in cam.burst(frames, 100, prefetch=4):
+        now = time.perf_counter()
+        lat.append(now - start)
+        start = now
+    return lat
+
+
+@workload('camera.burst.all')
+def camera_burst_all(srv, n):
+    cam = andor.Camera(srv.addr('camera'))
+    frames = max(n // 10, 1)
+
+    def burst():
+        for _ in cam.burst(frames, 100, downloads='all'):
+            pass
+    return timed(burst, 1), frames
+
+
+@workload('camera.sweep')
+def camera_sweep(srv, n):
+    cam = andor.EMCCD(srv.addr('camera'))
+    steps = [{'em_gain': g} for g in range(1, max(n // 10, 1) + 1)]
+    return timed(lambda: cam.sweep(steps), 1), len(steps)
+
+
+@workload('scope.acq_waveform')
+def scope_acq_waveform(srv, n):
+    scope = tmc.Oscilloscope(srv.addr('scope'))
+    return timed(scope.acq_waveform, max(n // 10, 1))
+
+
+@workload('daq.record')
+def daq_record(srv, n):
+    d = tmc.DAQ(srv.addr('daq'))
+    return timed(d.record, max(n // 10, 1))
+
+
+@workload('dac.output')
+def dac_output(srv, n):
+    dac = daq.DAC(srv.addr('dac'))
+    return timed(lambda: dac.output(1, 1.5), n)
+
+
+@workload('telemetry')
+def telemetry(srv, n):
+    """One serial pass over the slow-changing sensors, like a telemetry loop."""
+    cc = cryocon.TemperatureMonitor(srv.addr('cryocon'))
+    dewk = fluke.DewK(srv.addr('dewk'))
+    chiller = thermocube.Chiller(srv.addr('chiller'))
+    laser = nkt.SuperK(srv.addr('nkt'))
+    itc = thorlabs.ITC4000(srv.addr('itc'))
+    cam = andor.Camera(srv.addr('camera'))
+
+    def cycle():
+        cc.read()
+        dewk.reading()
+        chiller.temperature
+        laser.status_main()
+        itc.current()
+        cam.temperature()
+    return timed(cycle, max(n // 6, 1)), 6
+
+
+def percentile(data, q):
+    """q-th percentile of data, q in [0,100]."""
+    data = sorted(data)
+    k = min(len(data) - 1, max(0, round(q / 100 * len(data)) - 1))
+    return data[k]
+
+
+def run(name, srv, n):
+    """Run one workload, returning a dict of results."""
+    metrics.registry.reset()
+    start = time.perf_counter()
+    out = WORKLOADS[name](srv, n)
+    wall = time.perf_counter() - start
+    if isinstance(out, tuple):
+        lat, per = out
+    else:
+        lat, per = out, 1
+    received = sum(st.bytes_received for st in metrics.registry.stats().values())
+    return {
+        'workload': name,
+        'calls': len(lat) * per,
+        'calls_per_s': len(lat) * per / wall,
+        'p50_ms': percentile(lat, 50) * 1e3,
+        'p99_ms': percentile(lat, 99) * 1e3,
+        'mean_ms': statistics.fmean(lat) * 1e3,
+        'MB_per_s': received / wall / 1e6,
+    }
+
+
+def main(argv=None):
+    """Entry point for python -m benchmarks.run."""
+    p = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument('workloads', nargs='*', help=f'subset of {", ".join(WORKLOADS)}')
+    p.add_argument('-n', type=int, default=500, help='calls per workload (heavy workloads use n/10)')
+    p.add_argument('--latency', type=float, default=0., help='server-side latency per request, seconds')
+    p.add_argument('--jitter', type=float, default=0., help='+/- jitter on the latency, seconds')
+    p.add_argument('--frame', default='1024x1024', help='camera frame size, HxW')
+    p.add_argument('--samples', type=int, default=10_000, help='rows in scope/DAQ waveforms')
+    p.add_argument('--move-time', type=float, default=0.01, help='seconds an axis takes to settle')
+    args = p.parse_args(argv)
+
+    names = args.workloads or list(WORKLOADS)
+    unknown = set(names) - set(WORKLOADS)
+    if unknown:
+        p.error(f'unknown workloads {sorted(unknown)}')
+
+    h, w = (int(v) for v in args.frame.lower().split('x'))
+    fmt = '{workload:<22} {calls:>7} {calls_per_s:>10.1f} {p50_ms:>9.3f} {p99_ms:>9.3f} {MB_per_s:>9.1f}'
+    print(f'{"workload":<22} {"calls":>7} {"calls/s":>10} {"p50 ms":>9} {"p99 ms":>9} {"MB/s":>9}')
+    with FakeServer(latency=args.latency, jitter=args.jitter, frame_shape=(h, w),
+                    waveform_samples=args.samples, move_time=args.move_time) as srv:
+        for name in names:
+            print(fmt.format(**run(name, srv, args.n)))
+            sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
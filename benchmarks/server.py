@@ -0,0 +1,501 @@
+"""In-process stand-in for go-hcit servers.
+
+FakeServer speaks enough of the go-hcit HTTP API for every client in this
+repository to run against it, with configurable latency, jitter and payload
+sizes.  Each device is mounted under its own stem, so one server can stand in
+for a whole bench:
+
+    >>> srv = FakeServer(latency=0.002, frame_shape=(2048, 2048)).start()
+    >>> cam = andor.Camera(srv.addr('camera'))
+    >>> ax = motion.Axis(srv.addr('motion'), 'X')
+    >>> srv.stop()
+"""
+import json
+import random
+import re
+import socket
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import numpy as np
+
+FITS_BLOCK = 2880
+
+AXIS_ROUTES = (
+    '/axis/{axis}/home',
+    '/axis/{axis}/stop',
+    '/axis/{axis}/enabled',
+    '/axis/{axis}/initialize',
+    '/axis/{axis}/homed',
+    '/axis/{axis}/pos',
+    '/axis/{axis}/limits',
+    '/axis/{axis}/velocity',
+    '/axis/{axis}/synchronous',
+    '/axis/{axis}/inposition',
+)
+
+CAMERA_FEATURES = {
+    'AOIHeight': 'int',
+    'AOIWidth': 'int',
+    'ExposureTime': 'float',
+    'FrameRate': 'float',
+    'PixelEncoding': 'enum',
+    'SensorCooling': 'bool',
+    'SerialNumber': 'str',
+    'SensorTemperature': 'float',
+    'TimestampClock': 'int',
+}
+
+# features refused by POST; SensorTemperature and TimestampClock change on every read
+READ_ONLY_CAMERA_FEATURES = {'SerialNumber', 'SensorTemperature', 'TimestampClock'}
+
+
+def fits_bytes(data):
+    """Encode a uint16 array as a minimal FITS file the way go-hcit does (BITPIX=16, BZERO=32768)."""
+    cards = [
+        'SIMPLE  =                    T',
+        'BITPIX  =                   16',
+        f'NAXIS   = {data.ndim:>20}',
+    ]
+    for i, n in enumerate(reversed(data.shape)):
+        cards.append(f'{"NAXIS" + str(i + 1):<8}= {n:>20}')
+    cards += [
+        'BZERO   =                32768',
+        'BSCALE  =                    1',
+        'END',
+    ]
+    header = ''.join(c.ljust(80) for c in cards)
+    header = header.ljust(-(-len(header) // FITS_BLOCK) * FITS_BLOCK).encode('ascii')
+    body = (data.astype(np.int32) - 32768).astype('>i2').tobytes()
+    return header + body + b'\x00' * (-len(body) % FITS_BLOCK)
+
+
+def csv_bytes(columns, samples):
+    """A CSV waveform with a header row, like go-hcit's scope and DAQ routes."""
+    t = np.arange(samples) * 1e-6
+    cols = [t] + [np.sin(2 * np.pi * (k + 1) * 1e3 * t) for k in range(columns)]
+    header = ','.join(['time'] + [f'ch{k + 1}' for k in range(columns)])
+    rows = '\n'.join(','.join(f'{v:.6g}' for v in row) for row in zip(*cols))
+    return (header + '\n' + rows + '\n').encode('ascii')
+
+
+class Device:
+    """Device is the state and routes of one instrument on a FakeServer."""
+
+    def __init__(self, values, endpoints=()):
+        """Create a new Device.
+
+        Parameters
+        ----------
+        values : dict
+            route => JSON document returned by GET and updated by POST
+        endpoints : iterable of str
+            route templates reported by /endpoints
+
+        """
+        self.values = values
+        self.endpoints = list(endpoints) or sorted(values)
+        self.lock = threading.Lock()
+
+    def handle(self, server, method, path, query, body):
+        """Return (status, content type, body bytes) for a request, or None if unrouted."""
+        with self.lock:
+            if path == '/endpoints' and method == 'GET':
+                return 200, 'application/json', json.dumps(self.endpoints).encode()
+
+            if path not in self.values:
+                return None
+
+            if method == 'GET':
+                return 200, 'application/json', json.dumps(self.values[path]).encode()
+
+            doc = json.loads(body) if body else None
+            if isinstance(doc, dict) and isinstance(self.values[path], dict):
+                self.values[path].update(doc)
+            elif doc is not None:
+                self.values[path] = doc
+            return 200, 'application/json', b''
+
+
+class Camera(Device):
+    """Camera fakes an andor SDK3 camera, producing synthetic FITS frames."""
+
+    def __init__(self, shape):
+        """Create a new fake Camera with frames of shape (height, width)."""
+        h, w = shape
+        values = {
+            '/exposure-time': {'f64': 0.001},
+            '/aoi': {'left': 1, 'top': 1, 'width': w, 'height': h},
+            '/binning': {'h': 1, 'v': 1},
+            '/fan': {'bool': True},
+            '/sensor-cooling': {'bool': True},
+            '/temperature': {'f64': -30.0},
+            '/temperature-setpoint': {'str': '-30.00'},
+            '/temperature-setpoint-options': ['0.00', '-10.00', '-20.00', '-30.00'],
+            '/temperature-status': {'str': 'Stabilised'},
+            '/em-gain': {'int': 1},
+            '/em-gain-mode': {'str': 'Advanced'},
+            '/em-gain-range': {'min': 1, 'max': 1000},
+            '/shutter': {'bool': True},
+            '/shutter-auto': {'bool': False},
+            '/shutter-speed': {'f64': 0.01},
+            '/autowrite/root': {'str': '/data'},
+            '/autowrite/prefix': {'str': 'img'},
+            '/autowrite/enabled': {'bool': False},
+            '/feature': dict(CAMERA_FEATURES),
+        }
+        for name, typ in CAMERA_FEATURES.items():
+            values[f'/feature/{name}'] = {typ: {'int': 0, 'float': 0.0, 'bool': False}.get(typ, '')}
+            values[f'/feature/{name}/options'] = {'type': typ, 'min': 0, 'max': 65535,
+                                                  'writable': name not in READ_ONLY_CAMERA_FEATURES}
+
+        endpoints = sorted(set(values) - {f'/feature/{n}' for n in CAMERA_FEATURES}
+                           - {f'/feature/{n}/options' for n in CAMERA_FEATURES})
+        endpoints += ['/feature/{feature}', '/feature/{feature}/options', '/image',
+                      '/burst/setup', '/burst/frame', '/burst/all-frames']
+        super().__init__(values, endpoints)
+        self.shape = shape
+        self.burst_remaining = 0
+        self.burst_frames = 0
+        self._frame = None
+        self._raw = None
+        self.feature_writes = []  # names of features POSTed, in order
+        self.reads = 0  # of read-only features
+
+    def frame(self):
+        """The FITS encoded frame served by /image and /burst/frame, generated once."""
+        if self._frame is None:
+            rng = np.random.default_rng(0)
+            self._frame = fits_bytes(rng.integers(0, 4096, size=self.shape, dtype=np.uint16))
+        return self._frame
+
+    def raw_frame(self):
+        """frame() as headerless little-endian uint16, for fmt=raw."""
+        if self._raw is None:
+            pixels = np.frombuffer(self.frame(), '>u2', self.shape[0] * self.shape[1], FITS_BLOCK)
+            self._raw = (pixels ^ 0x8000).astype('<u2').tobytes()
+        return self._raw
+
+    def burst_frame(self, k):
+        """frame() with k added to its first pixel, so the order of burst frames can be checked."""
+        f = self.frame()
+        first = struct.unpack_from('>h', f, FITS_BLOCK)[0] + 32768
+        return f[:FITS_BLOCK] + struct.pack('>h', (first + k) % 65536 - 32768) + f[FITS_BLOCK + 2:]
+
+    def handle(self, server, method, path, query, body):
+        """See Device.handle."""
+        if path == '/image':
+            if query.get('fmt', ['fits'])[0] == 'raw':
+                return 200, 'application/octet-stream', self.raw_frame()
+            return 200, 'image/fits', self.frame()
+        name = path[len('/feature/'):] if path.startswith('/feature/') else None
+        if name in READ_ONLY_CAMERA_FEATURES:
+            if method == 'POST':
+                return 500, 'text/plain', f'{name} is read-only'.encode()
+            with self.lock:
+                self.reads += 1
+                value = -30 + 0.01 * self.reads if name == 'SensorTemperature' else self.reads
+                if name == 'SerialNumber':
+                    value = 'X-0001'
+            return 200, 'application/json', json.dumps({CAMERA_FEATURES[name]: value}).encode()
+        if method == 'POST' and name in CAMERA_FEATURES:
+            # features hold their value under their type, {"int": 3}, but are set as {"value": 3}
+            with self.lock:
+                self.values[path] = {CAMERA_FEATURES[name]: json.loads(body)['value']}
+                self.feature_writes.append(name)
+            return 200, 'application/json', b''
+        if path == '/burst/setup':
+            doc = json.loads(body)
+            with self.lock:
+                self.burst_frames = self.burst_remaining = int(doc['frames'])
+            return 200, 'application/json', b''
+        if path == '/burst/frame':
+            with self.lock:
+                if self.burst_remaining <= 0:
+                    return 500, 'text/plain', b'no burst in progress'
+                k = self.burst_frames - self.burst_remaining
+                self.burst_remaining -= 1
+            return 200, 'image/fits', self.burst_frame(k)
+        if path == '/burst/all-frames':
+            with self.lock:
+                n = self.burst_remaining
+                if 'frames' in query:
+                    n = min(n, int(query['frames'][0]))
+                k = self.burst_frames - self.burst_remaining
+                self.burst_remaining -= n
+            frame = np.random.default_rng(0).integers(0, 4096, size=self.shape, dtype=np.uint16)
+            cube = np.repeat(frame[np.newaxis], n, axis=0)
+            cube[:, 0, 0] += np.arange(k, k + n, dtype=np.uint16)  # same stamps as burst_frame
+            return 200, 'image/fits', fits_bytes(cube)
+        return super().handle(server, method, path, query, body)
+
+
+class Motion(Device):
+    """Motion fakes a motion controller whose axes take move_time seconds to settle."""
+
+    def __init__(self, axes=('X', 'Y', 'Z'), move_time=0.):
+        """Create a new fake motion controller."""
+        values = {'/raw': {'str': ''}}
+        for ax in axes:
+            values.update({
+                f'/axis/{ax}/enabled': {'bool': True},
+                f'/axis/{ax}/homed': {'bool': True},
+                f'/axis/{ax}/pos': {'f64': 0.},
+                f'/axis/{ax}/limits': {'min': -25., 'max': 25.},
+                f'/axis/{ax}/velocity': {'f64': 10.},
+                f'/axis/{ax}/synchronous': {'bool': False},
+                f'/axis/{ax}/home': {},
+                f'/axis/{ax}/stop': {},
+                f'/axis/{ax}/initialize': {},
+            })
+        super().__init__(values, AXIS_ROUTES + ('/raw',))
+        self.move_time = move_time
+        self.settled_at = {ax: 0. for ax in axes}
+
+    def handle(self, server, method, path, query, body):
+        """See Device.handle."""
+        m = re.fullmatch(r'/axis/(\w+)/(pos|inposition)', path)
+        if m:
+            ax, route = m.groups()
+            if route == 'inposition':
+                inpos = time.monotonic() >= self.settled_at[ax]
+                return 200, 'application/json', json.dumps({'bool': inpos}).encode()
+            if method == 'POST':
+                doc = json.loads(body)
+                with self.lock:
+                    if query.get('relative', ['false'])[0].lower() == 'true':
+                        self.values[path]['f64'] += doc['f64']
+                    else:
+                        self.values[path]['f64'] = doc['f64']
+                    self.settled_at[ax] = time.monotonic() + self.move_time
+                return 200, 'application/json', b''
+        return super().handle(server, method, path, query, body)
+
+
+class Waveforms(Device):
+    """Waveforms fakes a device with CSV waveform routes (oscilloscope, DAQ)."""
+
+    def __init__(self, values, routes, columns, samples):
+        """Create a new fake device whose routes return CSV waveforms."""
+        super().__init__(values, list(values) + list(routes))
+        self.routes = routes
+        self.columns = columns
+        self.samples = samples
+        self._csv = None
+
+    def handle(self, server, method, path, query, body):
+        """See Device.handle."""
+        if path in self.routes:
+            if self._csv is None:
+                self._csv = csv_bytes(self.columns, self.samples)
+            return 200, 'text/csv', self._csv
+        return super().handle(server, method, path, query, body)
+
+
+class Cryocon(Device):
+    """Cryocon fakes a Cryocon temperature monitor."""
+
+    def __init__(self):
+        """Create a new fake Cryocon monitor."""
+        values = {f'/read/{ch}': {'f64': 20. + i} for i, ch in enumerate('ABCD')}
+        values['/read'] = [20., 21., -274., -274.]
+        super().__init__(values, ['/read', '/read/{ch}', '/version'])
+
+    def handle(self, server, method, path, query, body):
+        """See Device.handle."""
+        if path == '/version':
+            return 200, 'text/plain', b'Cryocon Model 18i v1.0'
+        return super().handle(server, method, path, query, body)
+
+
+def default_devices(frame_shape=(1024, 1024), waveform_samples=10_000, move_time=0.):
+    """A stem => Device mapping with one of every instrument the clients support."""
+    return {
+        'camera': Camera(frame_shape),
+        'motion': Motion(move_time=move_time),
+        'fg': Device({
+            '/function': {'str': 'sine'},
+            '/voltage': {'f64': 1.},
+            '/frequency': {'f64': 1e3},
+            '/offset': {'f64': 0.},
+            '/output': {'bool': False},
+            '/waveform': {},
+            '/raw': {'str': ''},
+        }),
+        'scope': Waveforms({
+            '/scale': {'f64': 1.},
+            '/timebase': {'f64': 1e-3},
+            '/bit-depth': {'int': 8},
+            '/sample-rate': {'int': 1_000_000},
+            '/acq-length': {'int': waveform_samples},
+            '/acq-mode': {'str': 'RTIME'},
+            '/raw': {'str': ''},
+        }, ['/acq-waveform'], columns=4, samples=waveform_samples),
+        'daq': Waveforms({
+            '/channel-label': {},
+            '/sample-rate': {'f64': 1000.},
+            '/recording-channel': {'int': 101},
+            '/recording-length': {'int': waveform_samples},
+            '/raw': {'str': '+0,"No error"'},
+        }, ['/record'], columns=1, samples=waveform_samples),
+        'dac': Device({
+            '/output': 0.,
+            '/output-multi': [0., 0., 0.],
+            '/output-dn-16': 32768,
+            '/output-multi-dn-16': [32768, 32768, 32768],
+            '/range': {'str': '-10,10'},
+            '/simultaneous': {'bool': False},
+            '/operating-mode': {'str': 'single'},
+            '/trigger-mode': {'str': 'software'},
+            '/timer-period': {'uint': 32000},
+            '/playback/start': {},
+            '/playback/stop': {},
+            '/load-waveform': {},
+        }),
+        'cryocon': Cryocon(),
+        'nkt': Device({
+            '/wvl/center-bandwidth': {'center': 550., 'bandwidth': 100.},
+            '/wvl/short': {'f64': 500.},
+            '/wvl/long': {'f64': 600.},
+            '/emission': {'bool': False},
+            '/nd': {'f64': 0.},
+            '/power': {'f64': 50.},
+            '/main-module-status': {'emission': False, 'interlock': True},
+            '/varia-status': {'shutterOpen': True},
+            '/emission-runtime': {'f64': 3600.},
+        }),
+        'chiller': Device({
+            '/temperature': {'f64': 20.},
+            '/temperature-setpoint': {'f64': 20.},
+            '/faults': {'tankLevelLow': False, 'fanFail': False},
+        }),
+        'dewk': Device({
+            '/read': {'T': 21.5, 'H': 35.},
+        }),
+        'itc': Device({
+            '/current': {'f64': 10.},
+            '/emission': {'bool': False},
+        }),
+    }
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # the default of 5 drops SYNs when many async clients connect at once
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        # headers and body are small separate writes; without this Nagle and
+        # delayed ACKs add ~40 ms to every keep-alive round trip
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _dispatch(self, method):
+        fake = self.server.fake
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length', 0))
+        body = self.rfile.read(length) if length else b''
+        fake.delay()
+
+        stem, _, rest = parts.path.lstrip('/').partition('/')
+        dev = fake.devices.get(stem)
+        if dev is None and '' in fake.devices:  # a device on the bare host
+            dev, rest = fake.devices[''], parts.path.lstrip('/')
+        out = None
+        if dev is not None:
+            out = dev.handle(fake, method, '/' + rest, parse_qs(parts.query), body)
+        if out is None:
+            out = 404, 'text/plain', b'not found'
+
+        status, ctype, payload = out
+        head = (f'HTTP/1.1 {status} {self.responses.get(status, ("",))[0]}\r\n'
+                f'Content-Type: {ctype}\r\n'
+                f'Content-Length: {len(payload)}\r\n\r\n').encode('latin-1')
+        self.wfile.write(head)
+        self.wfile.write(payload)
+
+    def do_GET(self):  # NOQA
+        self._dispatch('GET')
+
+    def do_POST(self):  # NOQA
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeServer:
+    """FakeServer serves a set of fake devices on a background thread."""
+
+    def __init__(self, latency=0., jitter=0., frame_shape=(1024, 1024), waveform_samples=10_000, move_time=0.,
+                 devices=None, host='127.0.0.1', port=0):
+        """Create a new FakeServer.
+
+        Parameters
+        ----------
+        latency : float
+            mean server-side delay added to every request, seconds
+        jitter : float
+            each delay is drawn uniformly from latency +/- jitter, seconds
+        frame_shape : tuple of int
+            (height, width) of camera frames
+        waveform_samples : int
+            number of rows in scope and DAQ CSV waveforms
+        move_time : float
+            seconds a motion axis reports not-in-position after a move
+        devices : dict, optional
+            stem => Device, overriding default_devices()
+        host : str
+            interface to listen on
+        port : int
+            port to listen on; 0 picks a free one
+
+        """
+        self.latency = latency
+        self.jitter = jitter
+        if devices is None:
+            devices = default_devices(frame_shape, waveform_samples, move_time)
+        self.devices = devices
+        self._httpd = _HTTPServer((host, port), _Handler)
+        self._httpd.fake = self
+        self._thread = None
+
+    def delay(self):
+        """Sleep for one request's worth of simulated latency."""
+        d = self.latency
+        if self.jitter:
+            d += random.uniform(-self.jitter, self.jitter)
+        if d > 0:
+            time.sleep(d)
+
+    @property
+    def port(self):
+        """Port the server is listening on."""
+        return self._httpd.server_address[1]
+
+    def addr(self, stem):
+        """Address to give a client for the device mounted at stem."""
+        return f'{self._httpd.server_address[0]}:{self.port}/{stem}'
+
+    def start(self):
+        """Start serving on a daemon thread and return self."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the listening socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
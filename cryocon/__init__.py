@@ -1,7 +1,5 @@
 """cryocon expresses reading of Cryocon Model 12~18i+ monitors over HTTP."""
-import requests
-
-from golab_common import raise_err
+from golab_common import raise_err, niceaddr, codec, transport, aio
 from golab_common.retry import retry
 
 ABS_ZERO = -273.15
@@ -10,6 +8,9 @@ ABS_ZERO = -273.15
 class TemperatureMonitor:
     """Client class for talking to a temperature monitor through a server."""
 
+    # TTLs, seconds, for golab_common.cache.enable
+    cache_ttls = {'/version': 3600}
+
     def __init__(self, addr):
         """Create a new TemperatureMonitor instance.
 
@@ -31,7 +32,7 @@ class TemperatureMonitor:
     @retry(max_retries=2, interval=1)
     def version(self):
         """The model name and firmware version."""
-        resp = requests.get(self.addr + "/version")
+        resp = transport.get(self.addr + "/version")
         raise_err(resp)
         return str(resp.content).rstrip()
 
@@ -52,15 +53,50 @@ class TemperatureMonitor:
         """
         ch = ch.upper()
         if ch == 'ALL':
-            resp = requests.get(self.addr + "/read")
+            resp = transport.get(self.addr + "/read")
             raise_err(resp)
-            ret = resp.json()  # ret is a list or something
+            ret = codec.decode(resp)  # ret is a list or something
             # NaN can't be JSON'd and is encoded as -274
             return [f if f < ABS_ZERO else float('nan') for f in ret]
         else:
-            resp = requests.get(f'{self.addr}/read/{ch}')
+            resp = transport.get(f'{self.addr}/read/{ch}', route='/read/{ch}')
+            raise_err(resp)
+            ret = codec.unwrap(resp, 'f64')
+            if ret < ABS_ZERO:
+                ret = float('nan')
+
+            return ret
+
+
+class AsyncTemperatureMonitor:
+    """Asyncio counterpart of TemperatureMonitor."""
+
+    cache_ttls = TemperatureMonitor.cache_ttls
+
+    def __init__(self, addr):
+        """Create a new AsyncTemperatureMonitor instance, see TemperatureMonitor."""
+        self.addr = niceaddr(addr)
+
+    @retry(max_retries=2, interval=1)
+    async def version(self):
+        """The model name and firmware version."""
+        resp = await aio.get(self.addr + "/version")
+        raise_err(resp)
+        return str(resp.content).rstrip()
+
+    @retry(max_retries=2, interval=1)
+    async def read(self, ch='all'):
+        """Read some or all of the channels, see TemperatureMonitor.read."""
+        ch = ch.upper()
+        if ch == 'ALL':
+            resp = await aio.get(self.addr + "/read")
+            raise_err(resp)
+            ret = codec.decode(resp)
+            return [f if f < ABS_ZERO else float('nan') for f in ret]
+        else:
+            resp = await aio.get(f'{self.addr}/read/{ch}', route='/read/{ch}')
             raise_err(resp)
-            ret = resp.json()['f64']
+            ret = codec.unwrap(resp, 'f64')
             if ret < ABS_ZERO:
                 ret = float('nan')
 
@@ -1,2 +1,2 @@
 """DAQ provides interfaces to DAC/ADC hardware."""
-from daq.dac import DAC
+from daq.dac import DAC, AsyncDAC
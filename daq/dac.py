@@ -1,9 +1,7 @@
 """DAC is the arm of DAQ that deals with D to A."""
 import warnings
 
-import requests
-
-from golab_common import niceaddr, raise_err
+from golab_common import niceaddr, raise_err, codec, transport, aio
 
 
 class DAC:
@@ -50,11 +48,11 @@ class DAC:
             channels = list(channels)
 
         if voltages is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()
+            return codec.decode(resp)
         else:
-            resp = requests.post(url, json={
+            resp = transport.post(url, json={
                 'channel': channels,
                 'voltage': voltages})
             raise_err(resp)
@@ -89,11 +87,11 @@ class DAC:
             channels = list(channels)
 
         if dns is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()
+            return codec.decode(resp)
         else:
-            resp = requests.post(url, json={
+            resp = transport.post(url, json={
                 'channel': channels,
                 'dn': dns})
             raise_err(resp)
@@ -119,11 +117,11 @@ class DAC:
         """
         url = f'{self.addr}/range'
         if range_ is None:
-            resp = requests.get(url, json={'channel': channel})
+            resp = transport.get(url, json={'channel': channel})
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
-            resp = requests.post(url, json={'channel': channel, 'range': range_})
+            resp = transport.post(url, json={'channel': channel, 'range': range_})
             raise_err(resp)
 
     def simultaneous(self, channel, boolean=None):
@@ -157,11 +155,11 @@ class DAC:
         """
         url = f'{self.addr}/simultaneous'
         if boolean is None:
-            resp = requests.get(url, json={'channel': channel})
+            resp = transport.get(url, json={'channel': channel})
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
-            resp = requests.post(url, json={'channel': channel, 'simultaneous': boolean})
+            resp = transport.post(url, json={'channel': channel, 'simultaneous': boolean})
             raise_err(resp)
 
     def operating_mode(self, channel, mode=None):
@@ -182,11 +180,11 @@ class DAC:
         """
         url = f'{self.addr}/operating-mode'
         if mode is None:
-            resp = requests.get(url, json={'channel': channel})
+            resp = transport.get(url, json={'channel': channel})
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
-            resp = requests.post(url, json={'channel': channel, 'operatingMode': mode})
+            resp = transport.post(url, json={'channel': channel, 'operatingMode': mode})
             raise_err(resp)
 
     def trigger_mode(self, channel, mode=None):
@@ -207,24 +205,24 @@ class DAC:
         """
         url = f'{self.addr}/trigger-mode'
         if mode is None:
-            resp = requests.get(url, json={'channel': channel})
+            resp = transport.get(url, json={'channel': channel})
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
         else:
-            resp = requests.post(url, json={'channel': channel, 'triggerMode': mode})
+            resp = transport.post(url, json={'channel': channel, 'triggerMode': mode})
             raise_err(resp)
 
     def start(self):
         """Start playback."""
         url = f'{self.addr}/playback/start'
-        resp = requests.post(url)
+        resp = transport.post(url)
         raise_err(resp)
         return
 
     def stop(self):
         """Stop playback."""
         url = f'{self.addr}/playback/stop'
-        resp = requests.post(url)
+        resp = transport.post(url)
         raise_err(resp)
         return
 
@@ -246,11 +244,11 @@ class DAC:
         """
         url = f'{self.addr}/timer-period'
         if nanoseconds is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['uint']
+            return codec.unwrap(resp, 'uint')
         else:
-            resp = requests.post(url, json={'uint': nanoseconds})
+            resp = transport.post(url, json={'uint': nanoseconds})
             raise_err(resp)
 
     def timer_period_s(self, seconds=None):
@@ -284,5 +282,116 @@ class DAC:
 
         url = f'{self.addr}/load-waveform'
         payload = {'filename': filename}
-        resp = requests.post(url, json=payload)
+        resp = transport.post(url, json=payload)
+        raise_err(resp)
+
+
+class AsyncDAC:
+    """Asyncio counterpart of DAC."""
+
+    def __init__(self, addr):
+        """Create a new AsyncDAC instance, see DAC."""
+        self.addr = niceaddr(addr)
+
+    async def output(self, channels, voltages=None):
+        """Read the ideal output of a channel, or write voltages to a channel, see DAC.output."""
+        if isinstance(channels, int):
+            url = f'{self.addr}/output'
+        else:
+            url = f'{self.addr}/output-multi'
+            if voltages is not None:
+                voltages = list(voltages)
+            channels = list(channels)
+
+        if voltages is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.decode(resp)
+        else:
+            resp = await aio.post(url, json={
+                'channel': channels,
+                'voltage': voltages})
+            raise_err(resp)
+
+    async def output_dn(self, channels, dns=None):
+        """Read the ideal output of a channel, or write 16-bit DN to a channel, see DAC.output_dn."""
+        if isinstance(channels, int):
+            url = f'{self.addr}/output-dn-16'
+        else:
+            url = f'{self.addr}/output-multi-dn-16'
+            if dns is not None:
+                dns = list(dns)
+            channels = list(channels)
+
+        if dns is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.decode(resp)
+        else:
+            resp = await aio.post(url, json={
+                'channel': channels,
+                'dn': dns})
+            raise_err(resp)
+
+    async def _channel_setting(self, route, key, typ, channel, value):
+        url = f'{self.addr}/{route}'
+        if value is None:
+            resp = await aio.get(url, json={'channel': channel})
+            raise_err(resp)
+            return codec.unwrap(resp, typ)
+        else:
+            resp = await aio.post(url, json={'channel': channel, key: value})
+            raise_err(resp)
+
+    async def range(self, channel, range_=None):
+        """Configure the output range of a channel, see DAC.range."""
+        return await self._channel_setting('range', 'range', 'str', channel, range_)
+
+    async def simultaneous(self, channel, boolean=None):
+        """Configure a channel for simultaneous triggering (True), see DAC.simultaneous."""
+        return await self._channel_setting('simultaneous', 'simultaneous', 'bool', channel, boolean)
+
+    async def operating_mode(self, channel, mode=None):
+        """Configure the operating mode of a channel, see DAC.operating_mode."""
+        return await self._channel_setting('operating-mode', 'operatingMode', 'str', channel, mode)
+
+    async def trigger_mode(self, channel, mode=None):
+        """Configure the triggering mode of a channel, see DAC.trigger_mode."""
+        return await self._channel_setting('trigger-mode', 'triggerMode', 'str', channel, mode)
+
+    async def start(self):
+        """Start playback."""
+        resp = await aio.post(f'{self.addr}/playback/start')
+        raise_err(resp)
+
+    async def stop(self):
+        """Stop playback."""
+        resp = await aio.post(f'{self.addr}/playback/stop')
+        raise_err(resp)
+
+    async def timer_period_ns(self, nanoseconds=None):
+        """Configure the on-board timer period, which is global to the DAC, see DAC.timer_period_ns."""
+        url = f'{self.addr}/timer-period'
+        if nanoseconds is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.unwrap(resp, 'uint')
+        else:
+            resp = await aio.post(url, json={'uint': nanoseconds})
+            raise_err(resp)
+
+    async def timer_period_s(self, seconds=None):
+        """Timer_period_ns, except the argument is in seconds."""
+        if seconds is None:
+            return await self.timer_period_ns(None) / 1e9
+        else:
+            return await self.timer_period_ns(seconds*1e9)
+
+    async def load_waveform(self, filename, period_ns):
+        """Load a waveform; compatible with Acromag AP235 and dacsrv only, see DAC.load_waveform."""
+        if not isinstance(period_ns, int):
+            warnings.warn(f'{period_ns=} was not an int, casting...')
+            period_ns = int(period_ns)
+
+        resp = await aio.post(f'{self.addr}/load-waveform', json={'filename': filename})
         raise_err(resp)
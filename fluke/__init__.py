@@ -1,9 +1,7 @@
 """Fluke provides tools for accessing Fluke hardware thanks to a go-hcit middleman."""
-import requests
-
 from golab_common.retry import retry
 
-from golab_common import raise_err, niceaddr
+from golab_common import raise_err, niceaddr, codec, transport, aio
 
 
 class DewK:
@@ -25,6 +23,22 @@ class DewK:
     def reading(self):
         """Instantaneous Temp/Humidity reading."""
         url = f'{self.addr}/read'
-        resp = requests.get(url)
+        resp = transport.get(url)
+        raise_err(resp)
+        return codec.decode(resp)
+
+
+class AsyncDewK:
+    """Asyncio counterpart of DewK."""
+
+    def __init__(self, addr):
+        """Create a new AsyncDewK instance, see DewK."""
+        self.addr = niceaddr(addr)
+
+    @retry(max_retries=2, interval=1)
+    async def reading(self):
+        """Instantaneous Temp/Humidity reading."""
+        url = f'{self.addr}/read'
+        resp = await aio.get(url)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
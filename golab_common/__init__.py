@@ -1,4 +1,6 @@
 """Common functions and macros."""
+import sys
+
 from .retry import DoNotRepeat
 
 
@@ -23,6 +25,15 @@ def raise_err(resp):
         raise Exception(resp.text)
 
 
+def is_quantity(obj):
+    """True if obj is an astropy.units.Quantity.
+
+    Does not import astropy; if it has not been imported, nothing can be a Quantity.
+    """
+    u = sys.modules.get('astropy.units')
+    return u is not None and isinstance(obj, u.Quantity)
+
+
 def niceaddr(addr):
     """Ensure addr begins with http://."""
     if not addr.startswith('http://'):
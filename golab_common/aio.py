@@ -0,0 +1,205 @@
+"""Asyncio HTTP transport shared by the Async* clients.
+
+The async counterpart of golab_common.transport.  Every event loop gets one
+aiohttp.ClientSession whose connector pools kept-alive connections per
+server, so any number of Async* clients can have requests in flight on a
+single thread.  The session is closed when its loop shuts down (as
+asyncio.run does before closing it) or by close_all.  aiohttp is an
+optional dependency, only needed (and only imported) once an async client
+makes a request; asyncio, and the concurrent.futures it pulls in, once
+one is awaited.
+"""
+import time
+from urllib.parse import urlsplit
+
+from . import cache, codec, endpoints
+from .retry import breaker
+from .metrics import registry, route_label
+
+DEFAULT_POOL_SIZE = 100
+DEFAULT_CONNECT_TIMEOUT = 3.05
+
+_sessions = {}  # loop => (ClientSession, its _closer)
+_pool_size = DEFAULT_POOL_SIZE
+_connect_timeout = DEFAULT_CONNECT_TIMEOUT
+
+
+class Response:
+    """A fully read HTTP response.
+
+    Mirrors the parts of requests.Response the clients use (status_code,
+    content, text, json) so raise_err and friends work unchanged.
+    """
+
+    __slots__ = ('status_code', 'content', 'headers')
+
+    def __init__(self, status_code, content, headers):
+        """Create a new Response."""
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    @property
+    def text(self):
+        """Body decoded as UTF-8."""
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        """Body decoded as JSON."""
+        return codec.loads(self.content)
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+    """Configure the transport.
+
+    Only affects sessions created afterwards; call close_all first to apply
+    it to a loop that already made requests.
+
+    Parameters
+    ----------
+    pool_size : int
+        maximum number of concurrent connections per server
+    connect_timeout : float
+        seconds to wait for a TCP connection before declaring the server
+        unreachable
+
+    """
+    global _pool_size, _connect_timeout
+    _pool_size = int(pool_size)
+    _connect_timeout = connect_timeout
+
+
+def session():
+    """Return the shared aiohttp.ClientSession for the running loop."""
+    try:
+        import aiohttp
+    except ImportError:
+        raise ImportError('aiohttp is required for the async clients')
+    import asyncio
+
+    loop = asyncio.get_running_loop()
+    entry = _sessions.get(loop)
+    if entry is not None and not entry[0].closed:
+        return entry[0]
+    # the session references its loop, so entries only go when removed; drop those of
+    # loops closed without shutting down (their sessions can no longer be closed)
+    for old in [old for old in _sessions if old.is_closed()]:
+        del _sessions[old]
+    connector = aiohttp.TCPConnector(limit=0, limit_per_host=_pool_size)
+    timeout = aiohttp.ClientTimeout(total=None, sock_connect=_connect_timeout)
+    s = aiohttp.ClientSession(connector=connector, timeout=timeout)
+    closer = _closer(loop, s)
+    try:
+        # run it to its yield, which registers it with the loop
+        closer.asend(None).send(None)
+    except StopIteration:
+        pass
+    _sessions[loop] = (s, closer)
+    return s
+
+
+async def _closer(loop, s):
+    # an async generator left suspended: the loop finalizes the ones still running
+    # when it shuts down, which closes the session and forgets it
+    try:
+        yield
+    finally:
+        if _sessions.get(loop, (None,))[0] is s:
+            del _sessions[loop]
+        await s.close()
+
+
+async def close_all():
+    """Close the running loop's session, dropping its connections."""
+    import asyncio
+    entry = _sessions.get(asyncio.get_running_loop())
+    if entry is not None:
+        await entry[1].aclose()
+
+
+def _stringify(params):
+    # aiohttp only accepts str/int/float query values, requests also does bools
+    if params is None:
+        return None
+    return {k: str(v) if isinstance(v, bool) else v for k, v in params.items()}
+
+
+async def request(method, url, params=None, data=None, json=None, route=None, root=None):
+    """Perform an HTTP request on the running loop's shared session.
+
+    Parameters
+    ----------
+    method : str
+        HTTP verb, e.g. 'GET'
+    url : str
+        full URL, including the http:// prefix
+    params : dict, optional
+        query parameters
+    data : bytes, optional
+        raw request body
+    json : object, optional
+        request body, encoded by golab_common.codec
+    route : str, optional
+        route template relative to the client's root, e.g. /axis/{axis}/pos,
+        used to label metrics and look up cache TTLs.  Only needed if the path
+        has variables in it
+    root : str, optional
+        root address of the client making the request.  Requests are only
+        checked against a server's routes (see golab_common.endpoints) when
+        it is given
+
+    Returns
+    -------
+    Response
+        the response, with its body fully read
+
+    Raises
+    ------
+    golab_common.retry.CircuitOpen
+        the server has been unreachable recently, the request was not sent
+    golab_common.retry.DoNotRepeat
+        the routes of root are known (see golab_common.endpoints) and do not
+        include this one, the request was not sent
+
+    """
+    hit, pending = cache.read(method, url, route, params, cacheable=data is None and json is None)
+    if hit is not None:
+        return hit
+    endpoints.check(url, route, root)
+
+    parts = urlsplit(url)
+    host = f'{parts.scheme}://{parts.netloc}'
+    breaker.check(host)
+    s = session()
+    import asyncio  # both already loaded by session()
+    import aiohttp
+    headers = None
+    if json is not None:
+        data = codec.encode(json)
+        headers = {'Content-Type': 'application/json'}
+    start = time.perf_counter()
+    try:
+        async with s.request(method, url, params=_stringify(params), data=data, headers=headers) as r:
+            content = await r.read()
+            sent = r.request_info.headers.get('Content-Length', 0)
+    except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+        breaker.failure(host)
+        registry.record(host, route_label(parts.path, route), method, 'error', time.perf_counter() - start)
+        raise
+
+    breaker.success(host)
+    registry.record(host, route_label(parts.path, route), method, r.status, time.perf_counter() - start,
+                    int(sent), len(content))
+    resp = Response(r.status, content, r.headers)
+    cache.write(pending, resp)
+    return resp
+
+
+async def get(url, params=None, **kwargs):
+    """GET url over the shared async transport, see request."""
+    return await request('GET', url, params=params, **kwargs)
+
+
+async def post(url, data=None, json=None, **kwargs):
+    """POST to url over the shared async transport, see request."""
+    return await request('POST', url, data=data, json=json, **kwargs)
@@ -0,0 +1,196 @@
+"""Opt-in read-through cache for getters whose values rarely change.
+
+Caching is enabled per client; GETs to routes with a TTL are then answered
+from memory until the TTL lapses, and any POST made through the same root
+address (i.e. any setter on that client) drops everything cached for it.
+
+    >>> cam = andor.Camera('localhost:8000')
+    >>> cache.enable(cam)  # uses Camera.cache_ttls
+    >>> cam.features()  # network
+    >>> cam.features()  # dictionary lookup
+    >>> cam.set_feature('AOIWidth', 512)  # invalidates
+"""
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAXSIZE = 256
+
+_caches = {}  # root address => TTLCache
+_lock = threading.Lock()  # guards _caches, which clients on other threads enable and disable
+
+
+class TTLCache:
+    """TTLCache is a size-bounded LRU of responses with a TTL per route template."""
+
+    def __init__(self, ttls, maxsize=DEFAULT_MAXSIZE):
+        """Create a new TTLCache.
+
+        Parameters
+        ----------
+        ttls : dict
+            route template relative to the client root (e.g. /axis/{axis}/limits)
+            => seconds a response stays fresh.  Routes not present are never cached
+        maxsize : int
+            maximum number of responses held; the least recently used is
+            evicted first
+
+        """
+        self.ttls = dict(ttls)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key => (expiry, response)
+
+    def get(self, key):
+        """Return the fresh response stored under key, or None."""
+        with self._lock:
+            ent = self._entries.get(key)
+            if ent is not None:
+                if ent[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return ent[1]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, ttl, resp):
+        """Store resp under key for ttl seconds."""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, resp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached response."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def enable(client, ttls=None, maxsize=DEFAULT_MAXSIZE):
+    """Enable caching for a client.
+
+    Parameters
+    ----------
+    client : `Any`
+        any object with an "addr" attribute holding the full HTTP address of
+        its root, e.g. andor.Camera or motion.Axis
+    ttls : dict, optional
+        route template => TTL in seconds, merged over the client class's
+        cache_ttls attribute
+    maxsize : int
+        maximum number of responses held
+
+    Returns
+    -------
+    TTLCache
+        the cache, shared by every client with the same root address
+
+    """
+    merged = dict(getattr(client, 'cache_ttls', {}))
+    if ttls is not None:
+        merged.update(ttls)
+
+    with _lock:
+        c = _caches.get(client.addr)
+        if c is None:
+            c = TTLCache(merged, maxsize)
+            _caches[client.addr] = c
+        else:
+            c.ttls.update(merged)
+            c.maxsize = maxsize
+    return c
+
+
+def disable(client):
+    """Disable caching for client's root address."""
+    with _lock:
+        _caches.pop(client.addr, None)
+
+
+def lookup(url, route=None):
+    """Find the cache covering url, that of the longest root it is under.
+
+    Returns
+    -------
+    TTLCache or None
+        the cache, or None if url is not under a cached root
+    str
+        the route template relative to the root, used for TTL lookup
+
+    """
+    with _lock:
+        caches = list(_caches.items())
+    # roots nest, e.g. a device's under its host's; the innermost one is the client's
+    under = [(root, c) for root, c in caches if url.startswith(root) and url[len(root):len(root) + 1] in ('/', '')]
+    if not under:
+        return None, route
+    root, c = max(under, key=lambda rc: len(rc[0]))
+    if route is None:
+        route = url[len(root):].split('?', 1)[0] or '/'
+    return c, route
+
+
+def key(url, params):
+    """Cache key for a GET of url with query params."""
+    if not params:
+        return url
+    return url, tuple(sorted((k, str(v)) for k, v in params.items()))
+
+
+def read(method, url, route=None, params=None, cacheable=True):
+    """Consult the caches before a request is sent; used by the transports.
+
+    A non-GET request clears the cache covering url.
+
+    Parameters
+    ----------
+    method : str
+        HTTP verb
+    url : str
+        full URL
+    route : str, optional
+        route template relative to the client root
+    params : dict, optional
+        query parameters
+    cacheable : bool
+        False if the request has a body or is streamed and must not be served from cache
+
+    Returns
+    -------
+    response or None
+        a cached response to return instead of sending the request
+    tuple or None
+        if not None, pass to write along with the response to the request
+
+    """
+    if not _caches:
+        return None, None
+
+    c, route = lookup(url, route)
+    if c is None:
+        return None, None
+
+    if method != 'GET':
+        c.clear()
+        return None, None
+
+    ttl = c.ttls.get(route)
+    if ttl is None or not cacheable:
+        return None, None
+
+    k = key(url, params)
+    return c.get(k), (c, k, ttl)
+
+
+def write(pending, resp):
+    """Store resp if it succeeded, pending is the second return of read."""
+    if pending is not None and resp.status_code == 200:
+        c, k, ttl = pending
+        c.put(k, ttl, resp)
@@ -0,0 +1,122 @@
+"""JSON encoding and decoding of request and response bodies.
+
+go-hcit wraps scalars in a one-key envelope named for their type, e.g.
+{"f64": 1.5}, {"bool": true} or {"str": "sine"}.  The transports encode
+json= payloads through this module, and clients unwrap envelopes with
+unwrap(resp, key) instead of resp.json()[key].
+
+orjson is used if it is installed, else the standard library json module,
+with a shortcut that reads numeric and boolean envelopes without a full
+parse.  Either can be forced with use('orjson') or use('json').
+
+Payloads that never change can be encoded once with const and passed as
+json=; the transports send them as they are.
+
+    >>> codec.unwrap(resp, 'f64')
+    1.5
+    >>> transport.post(url, json=codec.TRUE)
+"""
+import json as _json
+import re
+
+BACKENDS = ('orjson', 'json')
+
+# scalars the envelope shortcut can read without a parser
+_ENVELOPE = re.compile(rb'\s*\{\s*"(\w+)"\s*:\s*([-+.\w]+)\s*\}\s*')
+_LITERALS = {b'true': True, b'false': False, b'null': None}
+
+backend = None
+dumps = None
+loads = None
+
+
+class Encoded(bytes):
+    """Encoded is a JSON document that has already been serialized, see const."""
+
+    __slots__ = ()
+
+
+def _std_dumps(obj):
+    return _json.dumps(obj, separators=(',', ':')).encode()
+
+
+def _std_loads(b):
+    return _json.loads(b)
+
+
+def use(name=None):
+    """Select the JSON library, 'orjson' or 'json'.  None picks the fastest installed."""
+    global backend, dumps, loads
+    if name is None:
+        try:
+            return use('orjson')
+        except ImportError:
+            return use('json')
+
+    if name == 'orjson':
+        import orjson
+
+        opts = orjson.OPT_SERIALIZE_NUMPY
+
+        def dumps(obj):  # noqa: F811
+            try:
+                return orjson.dumps(obj, option=opts)
+            except TypeError:  # e.g. subclasses orjson refuses
+                return _std_dumps(obj)
+
+        loads = orjson.loads
+    elif name == 'json':
+        dumps = _std_dumps
+        loads = _std_loads
+    else:
+        raise ValueError(f'unknown JSON backend {name}, must be one of {BACKENDS}')
+
+    backend = name
+
+
+def encode(obj):
+    """JSON bytes for obj, passing through documents encoded by const."""
+    if isinstance(obj, Encoded):
+        return obj
+    return dumps(obj)
+
+
+def const(obj):
+    """Encode obj once for repeated use as a json= payload."""
+    return Encoded(dumps(obj))
+
+
+def decode(resp):
+    """The JSON document in the body of resp (or bytes)."""
+    content = getattr(resp, 'content', resp)
+    if isinstance(content, Encoded):
+        content = bytes(content)  # orjson only takes exact bytes
+    return loads(content)
+
+
+def unwrap(resp, key):
+    """The value stored under key in the envelope in the body of resp (or bytes).
+
+    Raises KeyError if the body does not hold key, like resp.json()[key].
+    """
+    content = getattr(resp, 'content', resp)
+    if backend == 'json':
+        m = _ENVELOPE.fullmatch(content)
+        if m is not None and m[1].decode() == key:
+            tok = m[2]
+            if tok in _LITERALS:
+                return _LITERALS[tok]
+            try:
+                return int(tok)
+            except ValueError:
+                try:
+                    return float(tok)
+                except ValueError:
+                    pass  # not a JSON number after all, let the parser complain
+    return loads(content)[key]
+
+
+use()
+
+TRUE = const({'bool': True})
+FALSE = const({'bool': False})
@@ -0,0 +1,170 @@
+"""Process-wide registry of the routes each go-hcit server supports.
+
+go-hcit servers list their route templates at /endpoints.  The list does not
+change while a server runs, so it is fetched once per root address and shared
+by every client pointed at that address, e.g. all the axes of a Controller.
+
+Once a server's routes are known, the transports check requests made with
+its root address (root=, which the andor, motion and tmc clients pass)
+against them and raise DoNotRepeat for an unsupported route without sending
+it, instead of waiting for a 404 from the server.
+
+    >>> endpoints.supports('localhost:8000', '/burst/setup')  # fetches /endpoints
+    True
+    >>> endpoints.supports('localhost:8000', '/burst/frame')  # set lookup
+    True
+"""
+import re
+import threading
+
+from . import codec, niceaddr, raise_err
+from .retry import DoNotRepeat
+
+ROUTE = '/endpoints'
+
+_known = {}  # root address => Routes
+_lock = threading.Lock()  # guards _known and _fetch_locks
+_fetch_locks = {}  # root address => Lock, so concurrent first uses fetch once
+
+
+class Routes:
+    """Routes is the set of route templates one server supports."""
+
+    __slots__ = ('templates', '_patterns', '_paths')
+
+    def __init__(self, templates):
+        """Create a new Routes from a list of templates, e.g. /axis/{axis}/pos."""
+        self.templates = frozenset(templates)
+        self._patterns = [re.compile(re.sub(r'\\{\w+\\}', '[^/]+', re.escape(t)))
+                          for t in self.templates if '{' in t]
+        self._paths = {}  # concrete path => bool, memoized pattern matches
+
+    def __contains__(self, route):
+        """True if route, a template or a concrete path, is supported."""
+        if route in self.templates or route == ROUTE:
+            return True
+        ok = self._paths.get(route)
+        if ok is None:
+            ok = any(p.fullmatch(route) for p in self._patterns)
+            self._paths[route] = ok
+        return ok
+
+    def __iter__(self):
+        return iter(sorted(self.templates))
+
+    def __len__(self):
+        return len(self.templates)
+
+
+def _root(addr):
+    return niceaddr(addr).rstrip('/')
+
+
+def known(addr):
+    """Routes of the server at addr if they have been fetched, else None.  Never sends a request."""
+    return _known.get(_root(addr))
+
+
+def routes(addr, refresh=False):
+    """Routes of the server at addr, fetching /endpoints the first time.
+
+    Parameters
+    ----------
+    addr : str
+        root address of the server, as given to a client
+    refresh : bool
+        if True, fetch again even if the routes are known
+
+    Returns
+    -------
+    Routes
+        the server's routes
+
+    """
+    from . import transport  # transport imports this module
+
+    root = _root(addr)
+    r = _known.get(root)
+    if r is not None and not refresh:
+        return r
+
+    with _lock:
+        flock = _fetch_locks.setdefault(root, threading.Lock())
+    with flock:
+        r = _known.get(root)
+        if r is None or refresh:
+            resp = transport.get(root + ROUTE)
+            raise_err(resp)
+            r = Routes(codec.decode(resp))
+            with _lock:
+                _known[root] = r
+    return r
+
+
+async def aroutes(addr, refresh=False):
+    """Asyncio counterpart of routes."""
+    from . import aio
+
+    root = _root(addr)
+    r = _known.get(root)
+    if r is None or refresh:
+        resp = await aio.get(root + ROUTE)
+        raise_err(resp)
+        r = Routes(codec.decode(resp))
+        with _lock:
+            _known[root] = r
+    return r
+
+
+def supports(addr, route):
+    """True if the server at addr supports route, fetching its routes if they are not known yet.
+
+    route is relative to the root address, a template (/feature/{feature})
+    or a concrete path (/feature/AOIWidth).
+    """
+    return route in routes(addr)
+
+
+async def asupports(addr, route):
+    """Asyncio counterpart of supports."""
+    return route in await aroutes(addr)
+
+
+def forget(addr=None):
+    """Forget the routes of the server at addr, or of every server if addr is None."""
+    with _lock:
+        if addr is None:
+            _known.clear()
+        else:
+            _known.pop(_root(addr), None)
+
+
+def check(url, route=None, root=None):
+    """Raise DoNotRepeat if url goes to a server known not to support it; used by the transports.
+
+    Only the routes fetched for the client's own root are checked against,
+    and only if that root is given: other servers may be mounted under its
+    stems, so guessing the root from url could refuse routes they serve.
+
+    Parameters
+    ----------
+    url : str
+        full URL of the request
+    route : str, optional
+        route template relative to root
+    root : str, optional
+        root address of the client making the request
+
+    """
+    if root is None or not _known:
+        return
+    root = _root(root)
+    with _lock:
+        r = _known.get(root)
+    if r is None or not (url.startswith(root) and url[len(root):len(root) + 1] in ('/', '?', '')):
+        return
+
+    if route is None:
+        route = url[len(root):].split('?', 1)[0] or '/'
+    if route not in r:
+        raise DoNotRepeat(f'{route} is not supported by the server at {root}')
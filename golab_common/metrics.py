@@ -0,0 +1,269 @@
+"""Per-route request counters and latency histograms.
+
+Every request made through golab_common.transport or golab_common.aio is
+recorded into the module-level registry, keyed by server, route template
+(e.g. /axis/{axis}/pos), method and status.  Latencies go into HDR-style
+log-linear histograms: recording is a few integer operations and a dict
+increment, and any percentile is accurate to about 3% over the full range.
+
+    >>> from golab_common import metrics
+    >>> metrics.registry.summary()  # list of dicts, slowest routes first
+    >>> metrics.registry.write_prometheus('/var/lib/node_exporter/golab.prom')
+"""
+import os
+import threading
+
+SUB_BUCKET_BITS = 5
+
+# le values for the Prometheus export, seconds
+PROMETHEUS_BUCKETS = (
+    .0001, .00025, .0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30, 60,
+)
+
+
+class Histogram:
+    """Histogram is a log-linear histogram of non-negative integers.
+
+    Values below 2**(sub_bucket_bits+1) are counted exactly, larger values
+    land in one of 2**sub_bucket_bits linearly spaced buckets per power of
+    two, bounding the relative error at 2**-sub_bucket_bits.
+    """
+
+    __slots__ = ('sub_bucket_bits', 'counts', 'count', 'total', 'min', 'max')
+
+    def __init__(self, sub_bucket_bits=SUB_BUCKET_BITS):
+        """Create a new, empty Histogram."""
+        self.sub_bucket_bits = sub_bucket_bits
+        self.counts = {}  # bucket index => count
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def index(self, v):
+        """Bucket index for value v."""
+        e = v.bit_length() - self.sub_bucket_bits - 1
+        if e <= 0:
+            return v
+        return (e << self.sub_bucket_bits) + (v >> e)
+
+    def bounds(self, idx):
+        """Range [lower, upper) of values counted by bucket idx."""
+        s = 1 << self.sub_bucket_bits
+        if idx < 2 * s:
+            return idx, idx + 1
+        e = idx // s - 1
+        m = idx - e * s
+        return m << e, (m + 1) << e
+
+    def record(self, v):
+        """Count one occurrence of the non-negative integer v."""
+        idx = self.index(v)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.total += v
+        if self.min is None or v < self.min:
+            self.min = v
+        if self.max is None or v > self.max:
+            self.max = v
+
+    def percentile(self, q):
+        """Value at the q-th percentile, q in [0,100]; the midpoint of its bucket."""
+        if self.count == 0:
+            return None
+        target = max(1, round(q / 100 * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= target:
+                lo, hi = self.bounds(idx)
+                return min(max((lo + hi - 1) / 2, self.min), self.max)
+        return self.max
+
+    def cumulative(self, limits):
+        """Number of recorded values <= each of limits, which must be ascending."""
+        items = sorted(self.counts.items())
+        out = []
+        i = 0
+        seen = 0
+        for lim in limits:
+            while i < len(items) and self.bounds(items[i][0])[1] - 1 <= lim:
+                seen += items[i][1]
+                i += 1
+            out.append(seen)
+        return out
+
+    def mean(self):
+        """Mean of the recorded values."""
+        if self.count == 0:
+            return None
+        return self.total / self.count
+
+    def copy(self):
+        """A new Histogram holding the same counts."""
+        h = Histogram(self.sub_bucket_bits)
+        h.counts = dict(self.counts)
+        h.count, h.total, h.min, h.max = self.count, self.total, self.min, self.max
+        return h
+
+
+class RouteStats:
+    """RouteStats holds the counters for one (host, route, method, status)."""
+
+    __slots__ = ('latency_us', 'bytes_sent', 'bytes_received')
+
+    def __init__(self):
+        """Create a new, empty RouteStats."""
+        self.latency_us = Histogram()
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    @property
+    def calls(self):
+        """Number of requests recorded."""
+        return self.latency_us.count
+
+    def copy(self):
+        """A new RouteStats holding the same counters."""
+        st = RouteStats()
+        st.latency_us = self.latency_us.copy()
+        st.bytes_sent, st.bytes_received = self.bytes_sent, self.bytes_received
+        return st
+
+
+class Registry:
+    """Registry collects RouteStats for every request made by the transports."""
+
+    def __init__(self):
+        """Create a new, empty Registry."""
+        self.enabled = True
+        self._lock = threading.Lock()
+        self._stats = {}  # (host, route, method, status) => RouteStats
+
+    def record(self, host, route, method, status, seconds, bytes_sent=0, bytes_received=0):
+        """Record one request.
+
+        Parameters
+        ----------
+        host : str
+            server the request went to, scheme://host:port
+        route : str
+            route template, e.g. /axis/{axis}/pos
+        method : str
+            HTTP verb
+        status : int or str
+            HTTP status code, or 'error' if there was no response
+        seconds : float
+            latency, seconds
+        bytes_sent : int
+            size of the request body
+        bytes_received : int
+            size of the response body
+
+        """
+        if not self.enabled:
+            return
+        key = (host, route, method, str(status))
+        with self._lock:
+            st = self._stats.get(key)
+            if st is None:
+                st = RouteStats()
+                self._stats[key] = st
+            st.latency_us.record(int(seconds * 1e6))
+            st.bytes_sent += bytes_sent
+            st.bytes_received += bytes_received
+
+    def reset(self):
+        """Forget everything recorded so far."""
+        with self._lock:
+            self._stats.clear()
+
+    def stats(self):
+        """Dict of (host, route, method, status) => RouteStats, a snapshot consistent across routes.
+
+        The RouteStats are copies taken under the lock, so requests recorded
+        meanwhile neither change them nor race with reading them.
+        """
+        with self._lock:
+            return {k: st.copy() for k, st in self._stats.items()}
+
+    def summary(self):
+        """One dict per (host, route, method, status), largest total time first.
+
+        Keys are host, route, method, status, calls, total_s, mean_ms, p50_ms,
+        p99_ms, max_ms, bytes_sent and bytes_received.
+        """
+        rows = []
+        for (host, route, method, status), st in self.stats().items():
+            h = st.latency_us
+            rows.append({
+                'host': host,
+                'route': route,
+                'method': method,
+                'status': status,
+                'calls': h.count,
+                'total_s': h.total / 1e6,
+                'mean_ms': h.mean() / 1e3,
+                'p50_ms': h.percentile(50) / 1e3,
+                'p99_ms': h.percentile(99) / 1e3,
+                'max_ms': h.max / 1e3,
+                'bytes_sent': st.bytes_sent,
+                'bytes_received': st.bytes_received,
+            })
+        rows.sort(key=lambda r: r['total_s'], reverse=True)
+        return rows
+
+    def prometheus_text(self, prefix='golab'):
+        """The registry in the Prometheus text exposition format."""
+        limits_us = [int(b * 1e6) for b in PROMETHEUS_BUCKETS]
+        dur, sent, recv = [], [], []
+        for (host, route, method, status), st in sorted(self.stats().items()):
+            labels = f'host="{_escape(host)}",route="{_escape(route)}",method="{method}",status="{status}"'
+            h = st.latency_us
+            for le, n in zip(PROMETHEUS_BUCKETS, h.cumulative(limits_us)):
+                dur.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {n}')
+            dur.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {h.count}')
+            dur.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {h.total / 1e6}')
+            dur.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {h.count}')
+            sent.append(f'{prefix}_request_bytes_sent_total{{{labels}}} {st.bytes_sent}')
+            recv.append(f'{prefix}_request_bytes_received_total{{{labels}}} {st.bytes_received}')
+
+        lines = [
+            f'# HELP {prefix}_request_duration_seconds latency of requests to go-hcit servers',
+            f'# TYPE {prefix}_request_duration_seconds histogram',
+            *dur,
+            f'# HELP {prefix}_request_bytes_sent_total request body bytes sent to go-hcit servers',
+            f'# TYPE {prefix}_request_bytes_sent_total counter',
+            *sent,
+            f'# HELP {prefix}_request_bytes_received_total response body bytes received from go-hcit servers',
+            f'# TYPE {prefix}_request_bytes_received_total counter',
+            *recv,
+        ]
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path, prefix='golab'):
+        """Atomically write prometheus_text to path, e.g. for node_exporter's textfile collector."""
+        tmp = f'{path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            f.write(self.prometheus_text(prefix))
+        os.replace(tmp, path)
+
+
+def _escape(s):
+    return s.replace('\\', '\\\\').replace('"', '\\"')
+
+
+def route_label(path, route=None):
+    """Label for a request to path, made from the route template route if given.
+
+    The template is relative to the client's root, e.g. /axis/{axis}/pos; any
+    stem the root carries (/motion in /motion/axis/X/pos) is kept.
+    """
+    if route is None:
+        return path or '/'
+    n = route.count('/')
+    parts = path.split('/')
+    return '/'.join(parts[:len(parts) - n]) + route
+
+
+registry = Registry()
@@ -1,5 +1,8 @@
 """Retry, even simpler-er for windows support."""
+import inspect
 import logging
+import random
+import threading
 import time
 from functools import wraps
 
@@ -8,37 +11,208 @@ class DoNotRepeat(Exception):
     pass
 
 
-def retry(max_retries=2, interval=1):
+class CircuitOpen(ConnectionError):
+    """Raised without contacting a server its circuit breaker considers down."""
+
+
+class RetryPolicy:
+    """RetryPolicy describes when and how long to wait before trying a call again."""
+
+    def __init__(self, max_retries=2, interval=1, backoff=2, max_interval=30, jitter=0.1, deadline=None,
+                 idempotent=True):
+        """Create a new RetryPolicy.
+
+        Parameters
+        ----------
+        max_retries : int
+            maximum number of attempts, including the first
+        interval : float
+            delay before the second attempt, seconds
+        backoff : float
+            each subsequent delay is multiplied by this.  1 gives a fixed interval
+        max_interval : float
+            upper bound on any single delay, seconds
+        jitter : float
+            fraction of each delay that is randomized, [0,1].  Spreads out
+            clients that failed together so they do not retry in lockstep
+        deadline : float, optional
+            overall budget in seconds for all attempts and delays.  No retry
+            is started that would sleep past it.  If None, unbounded
+        idempotent : bool
+            if False, the call is never repeated (e.g., a relative move would
+            be applied twice if the first attempt reached the hardware)
+
+        """
+        self.max_retries = max_retries
+        self.interval = interval
+        self.backoff = backoff
+        self.max_interval = max_interval
+        self.jitter = jitter
+        self.deadline = deadline
+        self.idempotent = idempotent
+
+    def delay(self, attempt):
+        """Delay before attempt number attempt+1, seconds; attempt counts from 0."""
+        d = min(self.interval * self.backoff ** attempt, self.max_interval)
+        if self.jitter:
+            d -= d * self.jitter * random.random()
+        return d
+
+    def next_delay(self, attempt, exc, start):
+        """Delay before retrying after attempt failed with exc, or None to give up.
+
+        Parameters
+        ----------
+        attempt : int
+            index of the attempt that failed, counting from 0
+        exc : Exception
+            the exception it raised
+        start : float
+            time.monotonic() when the first attempt began
+
+        """
+        if not self.idempotent or isinstance(exc, CircuitOpen) or attempt + 1 >= self.max_retries:
+            return None
+
+        d = self.delay(attempt)
+        if self.deadline is not None and time.monotonic() - start + d > self.deadline:
+            return None
+        return d
+
+
+class CircuitBreaker:
+    """CircuitBreaker tracks consecutive connection failures per server and fails fast once one is down.
+
+    After failure_threshold consecutive failures the circuit for that server
+    opens and check raises CircuitOpen immediately.  Once reset_timeout has
+    passed a single trial request is let through; its success closes the
+    circuit, its failure keeps it open for another reset_timeout.
+    """
+
+    def __init__(self, failure_threshold=3, reset_timeout=10):
+        """Create a new CircuitBreaker.
+
+        Parameters
+        ----------
+        failure_threshold : int
+            consecutive failures before the circuit opens
+        reset_timeout : float
+            seconds an open circuit waits before letting a trial request through
+
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = {}  # host => consecutive failures
+        self._opened = {}  # host => time.monotonic() the circuit opened or the last trial began
+
+    def check(self, host):
+        """Raise CircuitOpen if requests to host should not be attempted."""
+        opened = self._opened.get(host)
+        if opened is None:
+            return
+
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return
+            now = time.monotonic()
+            if now - opened < self.reset_timeout:
+                raise CircuitOpen(f'{host} is unreachable, not retrying for {self.reset_timeout - (now - opened):.1f}s')
+
+            # half-open; this caller is the trial, everyone else keeps failing fast
+            self._opened[host] = now
+
+    def success(self, host):
+        """Record a request to host that reached the server."""
+        if host in self._failures or host in self._opened:
+            with self._lock:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+
+    def failure(self, host):
+        """Record a request to host that could not reach the server."""
+        with self._lock:
+            n = self._failures.get(host, 0) + 1
+            self._failures[host] = n
+            if n >= self.failure_threshold:
+                logging.warning(f'{host} failed {n} times in a row, opening circuit')
+                self._opened[host] = time.monotonic()
+
+    def reset(self, host=None):
+        """Close the circuit for host, or for every server if host is None."""
+        with self._lock:
+            if host is None:
+                self._failures.clear()
+                self._opened.clear()
+            else:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+
+
+# shared by the sync and async transports
+breaker = CircuitBreaker()
+
+
+def _not_supported(func):
+    return ValueError(f'{func.__qualname__} was not supported by the server or hardware')
+
+
+def retry(max_retries=2, interval=1, backoff=2, jitter=0.1, deadline=None, idempotent=True, policy=None):
+    """Retry the decorated function or coroutine function on exceptions.
+
+    Parameters
+    ----------
+    max_retries, interval, backoff, jitter, deadline, idempotent
+        see RetryPolicy
+    policy : RetryPolicy, optional
+        if given, used instead of the other arguments
+
+    """
+    if policy is None:
+        policy = RetryPolicy(max_retries=max_retries, interval=interval, backoff=backoff, jitter=jitter,
+                             deadline=deadline, idempotent=idempotent)
+
     # simplified retry decorator, for better windows support
 
     # no use of select from stdlib, other features not used removed
     def decorator(func):
         @wraps(func)
         def wrapper(*args, **kwargs):
-            result = None
-            last_exception = None
-            for n in range(max_retries):
+            start = time.monotonic()
+            n = 0
+            while True:
                 try:
-                    result = func(*args, **kwargs)
-                    last_exception = None
-                    break
-                except DoNotRepeat as e:
-                    funcname = func.__name__
-                    obj = getattr(func, '__self__', None)
-                    if obj is not None:
-                        # method, write it out nicely
-                        clsname = obj.__self__.__class__.__name__
-                        msg_front = f'{clsname}.{funcname}'
-                    else:
-                        msg_front = f'{funcname}'
-                    raise ValueError(f'{msg_front} was not supported by the server or hardware')
+                    return func(*args, **kwargs)
+                except DoNotRepeat:
+                    raise _not_supported(func)
                 except Exception as e:
-                    last_exception = e
-                    logging.info(f'Exception {e} encountered during {func.__name__}, retrying ({n}/max_retries)')
-                    time.sleep(interval)
+                    d = policy.next_delay(n, e, start)
+                    if d is None:
+                        raise
+                    n += 1
+                    logging.info(f'Exception {e} encountered during {func.__name__}, retrying ({n}/{policy.max_retries})')  # NOQA
+                    time.sleep(d)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.monotonic()
+                n = 0
+                while True:
+                    try:
+                        return await func(*args, **kwargs)
+                    except DoNotRepeat:
+                        raise _not_supported(func)
+                    except Exception as e:
+                        d = policy.next_delay(n, e, start)
+                        if d is None:
+                            raise
+                        n += 1
+                        logging.info(f'Exception {e} encountered during {func.__name__}, retrying ({n}/{policy.max_retries})')  # NOQA
+                        import asyncio  # loaded already, a coroutine is running
+                        await asyncio.sleep(d)
+            return async_wrapper
 
-            if result is None and last_exception is not None:
-                raise last_exception
-            return result
         return wrapper
     return decorator
@@ -0,0 +1,193 @@
+"""Multi-rate telemetry polling.
+
+A Poller samples any number of channels, each at its own period.  A single
+scheduler thread keeps the channels in a heap ordered by their next due time
+and hands due reads to a bounded thread pool, so a slow or dead instrument
+only delays its own channel.  Samples land in a per-channel ring buffer.
+
+    >>> p = Poller(workers=4)
+    >>> p.register('cryocon', tm.read, period=1)
+    >>> p.register('chiller', lambda: chiller.temperature, period=5)
+    >>> p.register('cam_temp', cam.temperature, period=0.5)
+    >>> with p:
+    ...     time.sleep(60)
+    >>> p.latest('cryocon')
+    (1592332800.1, [21.3, 20.9, nan, nan])
+"""
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_BUFFER_SIZE = 1000
+
+
+class Channel:
+    """Channel is one periodically sampled read and its recent history."""
+
+    def __init__(self, name, func, period, size=DEFAULT_BUFFER_SIZE):
+        """Create a new Channel.
+
+        Parameters
+        ----------
+        name : str
+            name of the channel
+        func : callable
+            called with no arguments to take a sample
+        period : float
+            seconds between samples
+        size : int
+            number of samples kept in the ring buffer
+
+        """
+        self.name = name
+        self.func = func
+        self.period = period
+        self.buffer = deque(maxlen=size)  # of (timestamp, value)
+        self.samples = 0
+        self.errors = 0
+        self.skipped = 0
+        self.last_error = None
+        self.busy = False
+
+    def sample(self):
+        """Take one sample into the buffer; run on a worker thread."""
+        t = time.time()
+        try:
+            v = self.func()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = e
+            logging.info(f'telemetry channel {self.name} failed: {e}')
+        else:
+            self.buffer.append((t, v))
+            self.samples += 1
+        finally:
+            self.busy = False
+
+
+class Poller:
+    """Poller samples registered channels at their own rates on a thread pool."""
+
+    def __init__(self, workers=8):
+        """Create a new Poller.
+
+        Parameters
+        ----------
+        workers : int
+            maximum number of reads in flight at once
+
+        """
+        self.workers = workers
+        self.channels = {}
+        self._heap = []  # of (due, seq, channel)
+        self._seq = itertools.count()
+        self._cv = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._pool = None
+
+    def register(self, name, func, period, size=DEFAULT_BUFFER_SIZE):
+        """Add a channel; may be called while the poller is running.
+
+        Parameters
+        ----------
+        name : str
+            name of the channel, must be unique
+        func : callable
+            called with no arguments to take a sample.  For a property, wrap it:
+            lambda: chiller.temperature
+        period : float
+            seconds between samples
+        size : int
+            number of samples kept for this channel
+
+        Returns
+        -------
+        Channel
+            the new channel
+
+        """
+        if name in self.channels:
+            raise ValueError(f'channel {name} is already registered')
+
+        ch = Channel(name, func, period, size)
+        with self._cv:
+            self.channels[name] = ch
+            heapq.heappush(self._heap, (time.monotonic(), next(self._seq), ch))
+            self._cv.notify()
+        return ch
+
+    def unregister(self, name):
+        """Stop sampling a channel and discard it."""
+        with self._cv:
+            ch = self.channels.pop(name)
+            self._heap = [e for e in self._heap if e[2] is not ch]
+            heapq.heapify(self._heap)
+
+    def latest(self, name):
+        """Most recent (timestamp, value) of a channel, or None if it has no samples."""
+        buf = self.channels[name].buffer
+        return buf[-1] if buf else None
+
+    def samples(self, name):
+        """List of (timestamp, value) held for a channel, oldest first."""
+        return list(self.channels[name].buffer)
+
+    def start(self):
+        """Start sampling on background threads and return self."""
+        if self._running:
+            return self
+        self._running = True
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='telemetry')
+        self._thread = threading.Thread(target=self._run, name='telemetry-scheduler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, wait=True):
+        """Stop sampling.  If wait, block until reads in flight finish."""
+        with self._cv:
+            self._running = False
+            self._cv.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=wait)
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        with self._cv:
+            while self._running:
+                if not self._heap:
+                    self._cv.wait()
+                    continue
+
+                due, _, ch = self._heap[0]
+                now = time.monotonic()
+                if due > now:
+                    self._cv.wait(due - now)
+                    continue
+
+                heapq.heappop(self._heap)
+                if ch.busy:
+                    # the previous read has not come back; don't pile up requests to a slow device
+                    ch.skipped += 1
+                else:
+                    ch.busy = True
+                    self._pool.submit(ch.sample)
+
+                due += ch.period
+                if due < now:
+                    # fell behind by a whole period; re-phase rather than firing a burst
+                    due = now + ch.period
+                heapq.heappush(self._heap, (due, next(self._seq), ch))
@@ -0,0 +1,171 @@
+"""Pooled HTTP transport shared by every client.
+
+Each go-hcit server (scheme + host + port) gets one requests.Session whose
+connection pool is reused by every client instance pointing at it, so
+repeated property reads ride on kept-alive TCP connections instead of paying
+a connect/teardown per call.
+
+Requests that cannot reach a server are counted by the circuit breaker in
+golab_common.retry; once it opens, calls to that server fail fast with
+CircuitOpen instead of waiting out a connect timeout each time.  Every
+request is recorded in golab_common.metrics.registry.
+"""
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from . import cache, codec, endpoints
+from .retry import breaker
+from .metrics import registry, route_label
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_CONNECT_TIMEOUT = 3.05
+
+_sessions = {}
+_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+_connect_timeout = DEFAULT_CONNECT_TIMEOUT
+
+
+def host_key(url):
+    """Key identifying the server a URL points at, "scheme://host:port"."""
+    parts = urlsplit(url)
+    return f'{parts.scheme}://{parts.netloc}'
+
+
+def _new_session(pool_size):
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+    s.mount('http://', adapter)
+    s.mount('https://', adapter)
+    return s
+
+
+def configure(pool_size=DEFAULT_POOL_SIZE, connect_timeout=DEFAULT_CONNECT_TIMEOUT):
+    """Configure the transport.
+
+    Sessions that already exist are closed and will be recreated on next use
+    with the new settings.
+
+    Parameters
+    ----------
+    pool_size : int
+        maximum number of kept-alive connections per server.  Raise this if
+        many threads talk to the same server concurrently.
+    connect_timeout : float
+        seconds to wait for a TCP connection before declaring the server
+        unreachable.  Reads are not bounded, bursts may take a long time.
+
+    """
+    global _pool_size, _connect_timeout
+    with _lock:
+        _pool_size = int(pool_size)
+        _connect_timeout = connect_timeout
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+
+
+def session_for(url):
+    """Return the shared requests.Session for the server url points at."""
+    key = host_key(url)
+    s = _sessions.get(key)
+    if s is None:
+        with _lock:
+            s = _sessions.get(key)
+            if s is None:
+                s = _new_session(_pool_size)
+                _sessions[key] = s
+    return s
+
+
+def close_all():
+    """Close every pooled session, dropping their connections."""
+    with _lock:
+        for s in _sessions.values():
+            s.close()
+        _sessions.clear()
+
+
+def request(method, url, route=None, root=None, **kwargs):
+    """Perform an HTTP request on the pooled session for url's server.
+
+    Parameters
+    ----------
+    method : str
+        HTTP verb, e.g. 'GET'
+    url : str
+        full URL, including the http:// prefix
+    route : str, optional
+        route template relative to the client's root, e.g. /axis/{axis}/pos,
+        used to label metrics and look up cache TTLs.  Only needed if the path
+        has variables in it
+    root : str, optional
+        root address of the client making the request.  Requests are only
+        checked against a server's routes (see golab_common.endpoints) when
+        it is given
+    kwargs
+        forwarded to requests.Session.request.  json is encoded by
+        golab_common.codec
+
+    Returns
+    -------
+    requests.Response
+        the response
+
+    Raises
+    ------
+    golab_common.retry.CircuitOpen
+        the server has been unreachable recently, the request was not sent
+    golab_common.retry.DoNotRepeat
+        the routes of root are known (see golab_common.endpoints) and do not
+        include this one, the request was not sent
+
+    """
+    cacheable = not (kwargs.get('stream') or kwargs.get('json') is not None or kwargs.get('data') is not None)
+    hit, pending = cache.read(method, url, route, kwargs.get('params'), cacheable)
+    if hit is not None:
+        return hit
+    endpoints.check(url, route, root)
+
+    parts = urlsplit(url)
+    host = f'{parts.scheme}://{parts.netloc}'
+    breaker.check(host)
+    kwargs.setdefault('timeout', (_connect_timeout, None))
+    doc = kwargs.pop('json', None)
+    if doc is not None:
+        kwargs['data'] = codec.encode(doc)
+        kwargs['headers'] = {**(kwargs.get('headers') or {}), 'Content-Type': 'application/json'}
+    start = time.perf_counter()
+    try:
+        resp = session_for(url).request(method, url, **kwargs)
+    except requests.ConnectionError:  # includes ConnectTimeout, but not read timeouts
+        breaker.failure(host)
+        registry.record(host, route_label(parts.path, route), method, 'error', time.perf_counter() - start)
+        raise
+
+    elapsed = time.perf_counter() - start
+    breaker.success(host)
+    if registry.enabled:
+        sent = len(resp.request.body or b'')
+        if kwargs.get('stream'):
+            received = int(resp.headers.get('Content-Length', 0))
+        else:
+            received = len(resp.content)
+        registry.record(host, route_label(parts.path, route), method, resp.status_code, elapsed, sent, received)
+
+    cache.write(pending, resp)
+    return resp
+
+
+def get(url, params=None, **kwargs):
+    """GET url over the pooled transport, see request."""
+    return request('GET', url, params=params, **kwargs)
+
+
+def post(url, data=None, json=None, **kwargs):
+    """POST to url over the pooled transport, see request."""
+    return request('POST', url, data=data, json=json, **kwargs)
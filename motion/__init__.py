@@ -3,16 +3,36 @@ import time
 import math
 import warnings
 
-import requests
-
 from golab_common.retry import retry
 
-from golab_common import niceaddr, raise_err
+from golab_common import niceaddr, raise_err, endpoints, codec, transport, aio
+
+
+# maps method_name -> URL
+ROUTES = {
+    'home':        '/axis/{axis}/home',
+    'stop':        '/axis/{axis}/stop',
+    'enable':      '/axis/{axis}/enabled',
+    'disable':     '/axis/{axis}/enabled',
+    'initialize':  '/axis/{axis}/initialize',
+    'enabled':     '/axis/{axis}/enabled',
+    'homed':       '/axis/{axis}/homed',
+    'pos':         '/axis/{axis}/pos',
+    'limits':      '/axis/{axis}/limits',
+    'velocity':    '/axis/{axis}/velocity',
+    'move_abs':    '/axis/{axis}/pos',
+    'move_rel':    '/axis/{axis}/pos',
+    'synchronous': '/axis/{axis}/synchronous',
+    'inpos':       '/axis/{axis}/inposition',
+}
 
 
 class Axis:
     """Axis represents an axis of a stage."""
 
+    # TTLs, seconds, for golab_common.cache.enable
+    cache_ttls = {'/axis/{axis}/limits': 300}
+
     def __init__(self, addr, name):
         """Create a new Axis instance.
 
@@ -26,24 +46,7 @@ class Axis:
         """
         self.addr = niceaddr(addr)
         self.name = name
-        # maps method_name -> URL
-        self.urls = {
-            'home':        '/axis/{axis}/home',
-            'stop':        '/axis/{axis}/stop',
-            'enable':      '/axis/{axis}/enabled',
-            'disable':     '/axis/{axis}/enabled',
-            'initialize':  '/axis/{axis}/initialize',
-            'enabled':     '/axis/{axis}/enabled',
-            'homed':       '/axis/{axis}/homed',
-            'pos':         '/axis/{axis}/pos',
-            'limits':      '/axis/{axis}/limits',
-            'velocity':    '/axis/{axis}/velocity',
-            'move_abs':    '/axis/{axis}/pos',
-            'move_rel':    '/axis/{axis}/pos',
-            'synchronous': '/axis/{axis}/synchronous',
-            'inpos':       '/axis/{axis}/inposition',
-        }
-        self.routes = None
+        self.urls = ROUTES
 
     def does_support(self, method):
         """Return True if this axis supports the given method, else False.
@@ -56,88 +59,82 @@ class Axis:
             a.does_support(a.inpos)
 
         """
-        # only get routes one time, does not change dynamically
-        # no need to spam network traffic
+        # routes are fetched once per server and shared by every Axis on it,
+        # see golab_common.endpoints
         name = method.__name__
         if name == 'wait_inpos':
             # forward test to the actual check, wait_inpos is client side logic
             name = 'inpos'
 
-        if self.routes is None:
-            meta_url = f'{self.addr}/endpoints'
-            resp = requests.get(meta_url)
-            raise_err(resp)
-            self.routes = resp.json()
-
-        return self.urls[name] in self.routes
+        return endpoints.supports(self.addr, self.urls[name])
 
     @retry(max_retries=3, interval=2)
     def home(self):
         """Home the axis."""
         url = f'{self.addr}/axis/{self.name}/home'
-        resp = requests.post(url)
+        resp = transport.post(url, route='/axis/{axis}/home', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def stop(self):
         """Stop the axis."""
         url = f'{self.addr}/axis/{self.name}/stop'
-        resp = requests.post(url)
+        resp = transport.post(url, route='/axis/{axis}/stop', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def enable(self):
         """Enable the axis."""
         url = f'{self.addr}/axis/{self.name}/enabled'
-        payload = {'bool': True}
-        resp = requests.post(url, json=payload)
+        payload = codec.TRUE
+        resp = transport.post(url, json=payload, route='/axis/{axis}/enabled', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def disable(self):
         """Disable the axis."""
         url = f'{self.addr}/axis/{self.name}/enabled'
-        payload = {'bool': False}
-        resp = requests.post(url, json=payload)
+        payload = codec.FALSE
+        resp = transport.post(url, json=payload, route='/axis/{axis}/enabled', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def initialize(self):
         """Initialize the axis."""
         url = f'{self.addr}/axis/{self.name}/initialize'
-        resp = requests.post(url)
+        resp = transport.post(url, route='/axis/{axis}/initialize', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def enabled(self):
         """Boolean for if the axis is enabled."""
         url = f'{self.addr}/axis/{self.name}/enabled'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/axis/{axis}/enabled', root=self.addr)
         raise_err(resp)
-        return resp.json()['bool']
+        return codec.unwrap(resp, 'bool')
 
     @retry(max_retries=3, interval=2)
     def homed(self):
         """Boolean for if the axis is homed."""
         url = f'{self.addr}/axis/{self.name}/homed'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/axis/{axis}/homed', root=self.addr)
         raise_err(resp)
-        return resp.json()['bool']
+        return codec.unwrap(resp, 'bool')
 
     @retry(max_retries=3, interval=2)
     def pos(self):
         """Position of the axis."""
         url = f'{self.addr}/axis/{self.name}/pos'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/axis/{axis}/pos', root=self.addr)
         raise_err(resp)
-        return resp.json()['f64']
+        return codec.unwrap(resp, 'f64')
 
     @retry(max_retries=3, interval=2)
     def limits(self):
         """Limits of the axis."""
-        resp = requests.get(f'{self.addr}/axis/{self.name}/limits')
+        resp = transport.get(f'{self.addr}/axis/{self.name}/limits', route='/axis/{axis}/limits', root=self.addr)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     @retry(max_retries=3, interval=2)
     def velocity(self, value=None):
@@ -156,12 +153,12 @@ class Axis:
         """
         url = f'{self.addr}/axis/{self.name}/velocity'
         if value is None:
-            resp = requests.get(url)
+            resp = transport.get(url, route='/axis/{axis}/velocity', root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': value}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, route='/axis/{axis}/velocity', root=self.addr)
             raise_err(resp)
 
     @retry(max_retries=3, interval=2)
@@ -182,10 +179,10 @@ class Axis:
         """
         url = f'{self.addr}/axis/{self.name}/pos'
         payload = {'f64': float(pos)}
-        resp = requests.post(url, json=payload)
+        resp = transport.post(url, json=payload, route='/axis/{axis}/pos', root=self.addr)
         raise_err(resp)
 
-    @retry(max_retries=3, interval=2)
+    @retry(max_retries=3, interval=2, idempotent=False)
     def move_rel(self, pos):
         """Move the axis by a relative amount.
 
@@ -197,7 +194,7 @@ class Axis:
         """
         url = f'{self.addr}/axis/{self.name}/pos'
         payload = {'f64': float(pos)}
-        resp = requests.post(url, json=payload, params={'relative': True})
+        resp = transport.post(url, json=payload, params={'relative': True}, route='/axis/{axis}/pos', root=self.addr)
         raise_err(resp)
 
     @retry(max_retries=3, interval=2)
@@ -221,21 +218,21 @@ class Axis:
         """
         url = f'{self.addr}/axis/{self.name}/synchronous'
         if sync is None:
-            resp = requests.get(url)
+            resp = transport.get(url, route='/axis/{axis}/synchronous', root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
             payload = {'bool': sync}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, route='/axis/{axis}/synchronous', root=self.addr)
             raise_err(resp)
 
     @retry(max_retries=3, interval=2)
     def inpos(self):
         """Position of the axis."""
         url = f'{self.addr}/axis/{self.name}/inposition'
-        resp = requests.get(url)
+        resp = transport.get(url, route='/axis/{axis}/inposition', root=self.addr)
         raise_err(resp)
-        return resp.json()['bool']
+        return codec.unwrap(resp, 'bool')
 
     @retry(max_retries=3, interval=2)
     def wait_inpos(self, max_check=None, max_time=None, min_interval=0.1, controller_latency_scale=4):
@@ -276,7 +273,7 @@ class Axis:
 
         if max_check is not None:
             checks = 1
-            while checks <= max_check and not self.inpos:
+            while checks <= max_check and not self.inpos():
                 end = time.time()
                 dT = end - start
                 if dT > max_time:
@@ -285,7 +282,7 @@ class Axis:
                 checks += 1
                 time.sleep(wait_t)
         else:
-            while not self.inpos:
+            while not self.inpos():
                 end = time.time()
                 dT = end - start
                 if dT > max_time:
@@ -311,7 +308,7 @@ class Controller:
             setattr(self, axis, ax)
             setattr(self, axis.lower(), ax)
 
-    @retry(max_retries=3, interval=2)
+    @retry(max_retries=3, interval=2, idempotent=False)
     def raw(self, text):
         """Send a string to the controller and get back any response.
 
@@ -328,6 +325,159 @@ class Controller:
         """
         url = f'{self.addr}/raw'
         payload = {'str': text}
-        resp = requests.post(url, json=payload)
+        resp = transport.post(url, json=payload, root=self.addr)
+        raise_err(resp)
+        return codec.decode(resp).get('str', None)
+
+
+class AsyncAxis:
+    """Asyncio counterpart of Axis."""
+
+    cache_ttls = Axis.cache_ttls
+
+    def __init__(self, addr, name):
+        """Create a new AsyncAxis instance, see Axis."""
+        self.addr = niceaddr(addr)
+        self.name = name
+        self.urls = ROUTES
+
+    async def does_support(self, method):
+        """Return True if this axis supports the given method, else False, see Axis.does_support."""
+        name = method.__name__
+        if name == 'wait_inpos':
+            name = 'inpos'
+
+        return await endpoints.asupports(self.addr, self.urls[name])
+
+    async def _post(self, route, payload=None, params=None):
+        resp = await aio.post(f'{self.addr}/axis/{self.name}/{route}', json=payload, params=params,
+                              route=f'/axis/{{axis}}/{route}', root=self.addr)
+        raise_err(resp)
+
+    async def _get(self, route, key):
+        resp = await aio.get(f'{self.addr}/axis/{self.name}/{route}', route=f'/axis/{{axis}}/{route}', root=self.addr)
+        raise_err(resp)
+        return codec.unwrap(resp, key)
+
+    @retry(max_retries=3, interval=2)
+    async def home(self):
+        """Home the axis."""
+        await self._post('home')
+
+    @retry(max_retries=3, interval=2)
+    async def stop(self):
+        """Stop the axis."""
+        await self._post('stop')
+
+    @retry(max_retries=3, interval=2)
+    async def enable(self):
+        """Enable the axis."""
+        await self._post('enabled', codec.TRUE)
+
+    @retry(max_retries=3, interval=2)
+    async def disable(self):
+        """Disable the axis."""
+        await self._post('enabled', codec.FALSE)
+
+    @retry(max_retries=3, interval=2)
+    async def initialize(self):
+        """Initialize the axis."""
+        await self._post('initialize')
+
+    @retry(max_retries=3, interval=2)
+    async def enabled(self):
+        """Boolean for if the axis is enabled."""
+        return await self._get('enabled', 'bool')
+
+    @retry(max_retries=3, interval=2)
+    async def homed(self):
+        """Boolean for if the axis is homed."""
+        return await self._get('homed', 'bool')
+
+    @retry(max_retries=3, interval=2)
+    async def pos(self):
+        """Position of the axis."""
+        return await self._get('pos', 'f64')
+
+    @retry(max_retries=3, interval=2)
+    async def limits(self):
+        """Limits of the axis."""
+        resp = await aio.get(f'{self.addr}/axis/{self.name}/limits', route='/axis/{axis}/limits', root=self.addr)
+        raise_err(resp)
+        return codec.decode(resp)
+
+    @retry(max_retries=3, interval=2)
+    async def velocity(self, value=None):
+        """Velocity setpoint of the axis, mm/s, see Axis.velocity."""
+        if value is None:
+            return await self._get('velocity', 'f64')
+        await self._post('velocity', {'f64': value})
+
+    @retry(max_retries=3, interval=2)
+    async def move_abs(self, pos):
+        """Move the axis to an absolute position."""
+        await self._post('pos', {'f64': float(pos)})
+
+    @retry(max_retries=3, interval=2, idempotent=False)
+    async def move_rel(self, pos):
+        """Move the axis by a relative amount."""
+        await self._post('pos', {'f64': float(pos)}, params={'relative': True})
+
+    @retry(max_retries=3, interval=2)
+    async def synchronous(self, sync=None):
+        """Synchronous mode for the axis, see Axis.synchronous."""
+        if sync is None:
+            return await self._get('synchronous', 'bool')
+        await self._post('synchronous', {'bool': sync})
+
+    @retry(max_retries=3, interval=2)
+    async def inpos(self):
+        """Boolean for if the axis is in position."""
+        return await self._get('inposition', 'bool')
+
+    async def wait_inpos(self, max_check=None, max_time=None, min_interval=0.1, controller_latency_scale=4):
+        """Return when an axis is in position, see Axis.wait_inpos.
+
+        Other coroutines keep running on the loop while this one waits.
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        inpos = await self.inpos()
+        wait_t = (loop.time() - start) * controller_latency_scale
+
+        if min_interval is not None and wait_t < min_interval:
+            wait_t = min_interval
+
+        if max_time is None:
+            max_time = math.inf
+
+        checks = 1
+        while not inpos:
+            if max_check is not None and checks > max_check:
+                return
+            if loop.time() - start > max_time:
+                return
+
+            await asyncio.sleep(wait_t)
+            inpos = await self.inpos()
+            checks += 1
+
+
+class AsyncController:
+    """Asyncio counterpart of Controller."""
+
+    def __init__(self, addr, axes=['X', 'Y', 'Z']):
+        """Create a new AsyncController instance, see Controller."""
+        self.addr = niceaddr(addr)
+        for axis in axes:
+            ax = AsyncAxis(self.addr, axis)
+            setattr(self, axis, ax)
+            setattr(self, axis.lower(), ax)
+
+    @retry(max_retries=3, interval=2, idempotent=False)
+    async def raw(self, text):
+        """Send a string to the controller and get back any response."""
+        resp = await aio.post(f'{self.addr}/raw', json={'str': text}, root=self.addr)
         raise_err(resp)
-        return resp.json().get('str', None)
+        return codec.decode(resp).get('str', None)
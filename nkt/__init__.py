@@ -1,10 +1,8 @@
 """nkt exposes control of the NKT superK Extreme sources."""
 
-import requests
-
 from golab_common.retry import retry
 
-from golab_common import raise_err, niceaddr
+from golab_common import raise_err, niceaddr, codec, transport, aio
 
 
 class SuperK:
@@ -46,13 +44,13 @@ class SuperK:
         """
         url = f'{self.addr}/wvl/center-bandwidth'
         if center is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            json = resp.json()
+            json = codec.decode(resp)
             return json['center'], json['bandwidth']
         else:
             data = {'center': float(center), 'bandwidth': float(bw)}
-            resp = requests.post(url, json=data)
+            resp = transport.post(url, json=data)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -72,12 +70,12 @@ class SuperK:
         """
         url = f'{self.addr}/wvl/short'
         if wvl_nm is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(wvl_nm)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -97,12 +95,12 @@ class SuperK:
         """
         url = f'{self.addr}/wvl/long'
         if wvl_nm is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(wvl_nm)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -126,12 +124,12 @@ class SuperK:
         """
         url = f'{self.addr}/emission'
         if on is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
             payload = {'bool': bool(on)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -151,12 +149,12 @@ class SuperK:
         """
         url = f'{self.addr}/nd'
         if pct is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(pct)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -176,35 +174,131 @@ class SuperK:
         """
         url = f'{self.addr}/power'
         if pct is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(pct)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @retry(max_retries=2, interval=1)
     def status_main(self):
         """Get the status bitfield from the main module."""
         url = f'{self.addr}/main-module-status'
-        resp = requests.get(url)
+        resp = transport.get(url)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     @retry(max_retries=2, interval=1)
     def status_varia(self):
         """Get the status bitfield from the VARIA module."""
         url = f'{self.addr}/varia-status'
-        resp = requests.get(url)
+        resp = transport.get(url)
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     @property
     @retry(max_retries=2, interval=1)
     def emission_runtime(self):
         """Emission runtime of the laser in seconds."""
         url = f'{self.addr}/emission-runtime'
-        resp = requests.get(url)
+        resp = transport.get(url)
+        raise_err(resp)
+        return codec.unwrap(resp, 'f64')
+
+
+class AsyncSuperK:
+    """Asyncio counterpart of SuperK."""
+
+    def __init__(self, addr):
+        """Create a new AsyncSuperK instance, see SuperK."""
+        self.addr = niceaddr(addr)
+
+    async def _get_f64(self, url):
+        resp = await aio.get(url)
+        raise_err(resp)
+        return codec.unwrap(resp, 'f64')
+
+    async def _set_f64(self, url, value):
+        resp = await aio.post(url, json={'f64': float(value)})
         raise_err(resp)
-        return resp.json()['f64']
+
+    @retry(max_retries=2, interval=1)
+    async def center_bandwidth(self, center=None, bw=None):
+        """Get or set the center wavelength and full bandwidth, see SuperK.center_bandwidth."""
+        url = f'{self.addr}/wvl/center-bandwidth'
+        if center is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            json = codec.decode(resp)
+            return json['center'], json['bandwidth']
+        else:
+            data = {'center': float(center), 'bandwidth': float(bw)}
+            resp = await aio.post(url, json=data)
+            raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def short_wave(self, wvl_nm=None):
+        """Get or set the short wavelength of the VARIA, nm."""
+        url = f'{self.addr}/wvl/short'
+        if wvl_nm is None:
+            return await self._get_f64(url)
+        await self._set_f64(url, wvl_nm)
+
+    @retry(max_retries=2, interval=1)
+    async def long_wave(self, wvl_nm=None):
+        """Get or set the long wavelength of the VARIA, nm."""
+        url = f'{self.addr}/wvl/long'
+        if wvl_nm is None:
+            return await self._get_f64(url)
+        await self._set_f64(url, wvl_nm)
+
+    @retry(max_retries=2, interval=1)
+    async def emission(self, on=None):
+        """Get or set the emission, see SuperK.emission."""
+        url = f'{self.addr}/emission'
+        if on is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.unwrap(resp, 'bool')
+        else:
+            payload = {'bool': bool(on)}
+            resp = await aio.post(url, json=payload)
+            raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def ND(self, pct=None):  # NOQA
+        """Get or set the VARIA ND strength, percent."""
+        url = f'{self.addr}/nd'
+        if pct is None:
+            return await self._get_f64(url)
+        await self._set_f64(url, pct)
+
+    @retry(max_retries=2, interval=1)
+    async def power(self, pct=None):
+        """Get or set the main module power level, percent."""
+        url = f'{self.addr}/power'
+        if pct is None:
+            return await self._get_f64(url)
+        await self._set_f64(url, pct)
+
+    @retry(max_retries=2, interval=1)
+    async def status_main(self):
+        """Get the status bitfield from the main module."""
+        resp = await aio.get(f'{self.addr}/main-module-status')
+        raise_err(resp)
+        return codec.decode(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def status_varia(self):
+        """Get the status bitfield from the VARIA module."""
+        resp = await aio.get(f'{self.addr}/varia-status')
+        raise_err(resp)
+        return codec.decode(resp)
+
+    @property
+    @retry(max_retries=2, interval=1)
+    async def emission_runtime(self):
+        """Emission runtime of the laser in seconds."""
+        return await self._get_f64(f'{self.addr}/emission-runtime')
@@ -0,0 +1,99 @@
+import time
+
+import pytest
+
+import andor
+import motion
+from benchmarks.server import FakeServer
+from golab_common import cache, metrics
+from golab_common.cache import TTLCache
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(frame_shape=(8, 8)) as s:
+        yield s
+
+
+def calls(route):
+    return sum(st.calls for (_, r, m, _), st in metrics.registry.stats().items() if r.endswith(route) and m == 'GET')
+
+
+def test_ttl_expiry_and_lru():
+    c = TTLCache({}, maxsize=2)
+    c.put('a', 0.05, 1)
+    c.put('b', 10, 2)
+    assert c.get('a') == 1
+    c.put('c', 10, 3)  # evicts b, a was used more recently
+    assert c.get('b') is None
+    time.sleep(0.06)
+    assert c.get('a') is None
+    assert c.get('c') == 3
+
+
+def test_camera_features_cached_and_invalidated(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    cache.enable(cam)
+    try:
+        metrics.registry.reset()
+        first = cam.features()
+        assert cam.features() == first
+        cam.get_feature_info('AOIWidth')
+        cam.get_feature_info('AOIWidth')
+        cam.temperature()
+        cam.temperature()
+        assert calls('/feature') == 1
+        assert calls('/feature/{feature}/options') == 1
+        assert calls('/temperature') == 2  # no TTL, never cached
+
+        cam.set_feature('AOIWidth', 4)
+        cam.features()
+        assert calls('/feature') == 2
+    finally:
+        cache.disable(cam)
+
+
+def test_axis_limits_cached(srv):
+    ax = motion.Axis(srv.addr('motion'), 'X')
+    c = cache.enable(ax)
+    try:
+        ax.limits()
+        ax.limits()
+        assert c.hits == 1
+        ax.velocity(3)
+        ax.limits()
+        assert c.hits == 1
+    finally:
+        cache.disable(ax)
+
+
+def test_nested_roots_use_the_innermost_cache():
+    from types import SimpleNamespace
+
+    from benchmarks.server import Device, default_devices
+    from golab_common import niceaddr, transport
+
+    devices = default_devices((8, 8), 10)
+    devices[''] = Device({'/status': {'str': 'ok'}, '/reset': {'null': None}})  # on the bare host, over the rest
+    with FakeServer(devices=devices) as s:
+        host = SimpleNamespace(addr=niceaddr(s.addr('')).rstrip('/'), cache_ttls={'/status': 300})
+        cam = andor.Camera(s.addr('camera'))
+        hc = cache.enable(host)  # the outer root first, so order alone would pick it
+        cc = cache.enable(cam)
+        try:
+            metrics.registry.reset()
+            for _ in range(2):
+                transport.get(f'{host.addr}/status')
+                cam.features()
+            assert calls('/status') == 1
+            assert calls('/feature') == 1  # by the camera's TTLs, not the host's
+            assert len(hc) == 1 and len(cc) == 1
+
+            cam.set_feature('AOIWidth', 4)  # clears the camera's cache only
+            assert len(hc) == 1 and len(cc) == 0
+            cam.features()
+            transport.post(f'{host.addr}/reset')  # and the host's only its own
+            assert len(hc) == 0 and len(cc) == 1
+        finally:
+            cache.disable(host)
+            cache.disable(cam)
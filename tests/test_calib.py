@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+
+import andor
+from andor.calib import CalibrationLibrary, Calibrator, camera_key, filename
+from benchmarks.server import FakeServer
+
+
+def test_calibrator():
+    dark = np.full((4, 6), 10, np.float32)
+    flat = np.full((4, 6), 2, np.float32)
+    flat[0, 0] = 0
+    cal = Calibrator(dark, flat)
+    frame = np.full((4, 6), 30, np.uint16)
+    out = cal.apply(frame)
+    assert out.dtype == np.float32 and out[0, 0] == 0
+    assert (out.ravel()[1:] == 10).all()
+    assert cal.apply(frame) is out  # the scratch buffer is reused
+    np.testing.assert_array_equal(Calibrator(dark).apply(frame), 20)
+    with pytest.raises(ValueError):
+        cal.apply(frame[:2])
+
+
+def test_library(tmp_path):
+    with FakeServer(frame_shape=(16, 24)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        lib = CalibrationLibrary(tmp_path, frames=5)
+        key = camera_key(cam)
+        assert key.aoi == (1, 1, 24, 16) and key.setpoint == '-30.00'
+        assert 'dark_t0.001s_g1_b1_aoi1-1-24x16' in filename('dark', key)
+        with pytest.raises(LookupError):
+            lib.calibrator(cam, acquire=False)
+
+        frame = lib.snap(cam)  # takes the dark
+        assert (tmp_path / filename('dark', key)).exists()
+        assert srv.devices['camera'].values['/shutter'] == {'bool': True}  # reopened
+        # burst frames differ from the snap in their first pixel only, 0..4 added; the median adds 2
+        assert frame[0, 0] == -2 and not frame.ravel()[1:].any()
+
+        # a new library finds it on disk, and a flat stored for the same settings
+        lib2 = CalibrationLibrary(tmp_path, frames=5)
+        np.testing.assert_array_equal(lib2.load('dark', key), lib.load('dark', key))
+        lib2.save('flat', key, np.full((16, 24), 0.5))
+        expected = (cam.snap() - lib2.load('dark', key)) * 2
+        np.testing.assert_array_equal(lib2.snap(cam), expected)
+        frames = [f.copy() for f in lib2.burst(cam, 3, 100)]
+        assert len(frames) == 3 and all(f.dtype == np.float32 for f in frames)
+
+        # the fake camera sees no light, so there is no flat field to take
+        with pytest.raises(ValueError):
+            lib2.acquire_flat(cam)
+
+
+def test_library_cubes_and_slots(tmp_path):
+    with FakeServer(frame_shape=(16, 24)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        lib = CalibrationLibrary(tmp_path, frames=5)
+        dark = lib.acquire_dark(cam)
+
+        (cube,) = lib.burst(cam, 3, 100, downloads='all')
+        assert cube.shape == (3, 16, 24) and cube.dtype == np.float32
+        np.testing.assert_array_equal(cube[:, 0, 0], np.arange(3) - dark[0, 0] + cam.snap()[0, 0])
+        assert not cube[:, 1:].any()
+
+        ring = cam.frame_ring(slots=1)
+        frame = lib.snap(cam, ring=ring)
+        assert ring.free == 1  # the slot went back once calibrated
+        np.testing.assert_array_equal(frame, cam.snap() - dark)
+        frames = [f.copy() for f in lib.burst(cam, 3, 100, ring=ring)]
+        assert len(frames) == 3 and ring.free == 1
+        with pytest.raises(ValueError, match='ret'):
+            lib.snap(cam, ret='file')
+
+
+def test_library_without_em_gain_or_shutter(tmp_path, caplog):
+    from benchmarks.server import Camera
+
+    fake = Camera((16, 24))
+    for route in ('/em-gain', '/em-gain-mode', '/em-gain-range', '/shutter', '/shutter-auto', '/shutter-speed'):
+        del fake.values[route]
+        fake.endpoints.remove(route)
+    with FakeServer(devices={'camera': fake}) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        key = camera_key(cam)
+        assert key.em_gain is None
+        assert filename('dark', key) == 'dark_t0.001s_b1_aoi1-1-24x16_T-30.00.npy'
+
+        lib = CalibrationLibrary(tmp_path, frames=5)
+        frame = lib.snap(cam)
+        assert frame[0, 0] == -2 and not frame.ravel()[1:].any()
+        assert 'no shutter' in caplog.text
+        assert (tmp_path / filename('dark', key)).exists()
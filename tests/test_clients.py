@@ -0,0 +1,189 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import andor
+import cryocon
+import motion
+import tmc
+from benchmarks.server import FakeServer
+from golab_common import aio, transport
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(frame_shape=(32, 48), waveform_samples=100) as s:
+        yield s
+
+
+def test_camera_snap_and_burst(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    img = cam.snap()
+    assert img.shape == (32, 48)
+    frames = list(cam.burst(3, 100))
+    assert len(frames) == 3
+    np.testing.assert_array_equal(frames[0], img)
+    cube, = cam.burst(3, 100, downloads='all')
+    assert cube.shape == (3, 32, 48)
+
+
+def test_camera_getset(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    cam.em_gain(100)
+    assert cam.em_gain() == 100
+    assert cam.aoi()['width'] == 48
+
+
+def test_axis(srv):
+    ax = motion.Axis(srv.addr('motion'), 'X')
+    ax.move_abs(1)
+    ax.move_rel(2)
+    assert ax.pos() == 3
+    assert ax.does_support(ax.wait_inpos)
+
+
+def test_cryocon_and_scope(srv):
+    assert cryocon.TemperatureMonitor(srv.addr('cryocon')).read('A') == 20
+    wf = tmc.Oscilloscope(srv.addr('scope')).acq_waveform()
+    assert wf.shape == (100, 5)
+
+
+
+@pytest.mark.parametrize('prefetch', [0, 3])
+def test_camera_burst_order(prefetch):
+    with FakeServer(frame_shape=(16, 16), latency=0.002, jitter=0.002) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        first = [f[0, 0] for f in cam.burst(12, 100, prefetch=prefetch)]
+        assert np.diff(first).tolist() == [1] * 11
+
+
+def test_prefetch_error_position(srv):
+    from andor.prefetch import FramePrefetcher
+    cam = andor.Camera(srv.addr('camera'))
+    list(cam.burst(2, 100))
+    # the server has 2 frames, the third request fails
+    transport.post(f'{cam.addr}/burst/setup', json={'fps': 100, 'frames': 2, 'spool': 0})
+    it = iter(FramePrefetcher(f'{cam.addr}/burst/frame', 4, depth=3))
+    next(it)
+    next(it)
+    with pytest.raises(Exception, match='no burst in progress'):
+        next(it)
+
+
+def test_camera_snap_raw(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    img = cam.snap(fmt='raw')
+    assert img.dtype == np.uint16
+    np.testing.assert_array_equal(img, cam.snap())
+    cam._frame_shape = (8, 8)  # stale cache, e.g. AOI changed by another client
+    np.testing.assert_array_equal(cam.snap(fmt='raw'), img)
+    assert cam.frame_shape() == (32, 48)
+    cam.binning(1)
+    assert cam._frame_shape is None
+    with pytest.raises(ValueError, match='no hdu'):
+        cam.snap(fmt='raw', ret='hdu')
+    with pytest.raises(ValueError, match='no hdu'):
+        asyncio.run(andor.AsyncCamera(srv.addr('camera')).snap(fmt='raw', ret='hdu'))
+
+
+def test_camera_settings_snapshot_restore():
+    with FakeServer(frame_shape=(8, 8)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        snap = cam.snapshot_settings()
+        assert snap['AOIWidth'] == 0
+        assert not {'SerialNumber', 'SensorTemperature', 'TimestampClock'} & set(snap)  # read-only
+        assert cam.restore_settings(snap) == []
+
+        cam.set_feature('FrameRate', 10.)
+        cam.set_feature('ExposureTime', 0.5)
+        cam.set_feature('AOIWidth', 4)
+        cam.set_feature('AOIHeight', 4)
+        fake = srv.devices['camera']
+        del fake.feature_writes[:]
+        written = cam.restore_settings(snap)
+        assert written == fake.feature_writes == ['AOIWidth', 'AOIHeight', 'ExposureTime', 'FrameRate']
+        assert cam.snapshot_settings() == snap
+
+
+def test_camera_restore_skips_read_only_and_reports_every_error():
+    with FakeServer(frame_shape=(8, 8)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        snap = cam.snapshot_settings()
+        # e.g. a snapshot of every feature, whose read-only values have since moved on
+        old = {**snap, 'SensorTemperature': cam.get_feature('SensorTemperature'), 'SerialNumber': 'other'}
+        assert cam.get_feature('SensorTemperature') != old['SensorTemperature']
+        assert cam.restore_settings(old) == []
+
+        async def restore():
+            try:
+                return await andor.AsyncCamera(srv.addr('camera')).restore_settings(old)
+            finally:
+                await aio.close_all()
+
+        assert asyncio.run(restore()) == []
+
+        for k, v in [('AOIWidth', 4), ('ExposureTime', 0.5), ('PixelEncoding', 'Mono12'), ('SensorCooling', True)]:
+            cam.set_feature(k, v)
+        set_feature = cam.set_feature
+
+        def failing(feature, value):
+            if feature in ('AOIWidth', 'SensorCooling'):
+                raise RuntimeError(f'{feature} refused')
+            set_feature(feature, value)
+
+        cam.set_feature = failing
+        with pytest.raises(andor.RestoreError) as info:
+            cam.restore_settings(old)
+        assert sorted(info.value.errors) == ['AOIWidth', 'SensorCooling']
+        assert sorted(info.value.written) == ['ExposureTime', 'PixelEncoding']
+        assert 'AOIWidth: AOIWidth refused' in str(info.value)
+        assert cam.get_feature('ExposureTime') == 0.0
+
+
+def test_camera_sweep(srv):
+    cam = andor.EMCCD(srv.addr('camera'))
+    ladder = [{'exposure_time': 0.01, 'em_gain': 1}, {'em_gain': 5}, {'exposure_time': 0.02, 'ExposureTime': 0.5}]
+    res = cam.sweep(ladder, repeat=2)
+    assert res.cube.shape == (6, 32, 48)
+    np.testing.assert_array_equal(res.cube[-1], cam.snap())
+    assert res.table.step.tolist() == [0, 0, 1, 1, 2, 2]
+    assert res.table.em_gain.tolist() == [1, 1, 5, 5, 5, 5]
+    assert res.table.exposure_time.tolist() == [0.01, 0.01, 0.01, 0.01, 0.02, 0.02]
+    assert (res.table.finish >= res.table.start).all()
+    assert cam.em_gain() == 5 and cam.get_feature('ExposureTime') == 0.5
+    with pytest.raises(ValueError):
+        cam.sweep([{'AOIWidth': 4}])
+    for name in ('snap', 'burst', 'restore_settings', 'binning', 'SerialNumber', 'NoSuchFeature'):
+        with pytest.raises(ValueError, match=name):
+            cam.sweep([{name: 1}])
+
+
+def test_camera_sweep_bounds_open_responses(srv, monkeypatch):
+    import threading
+    import time
+
+    from andor import sweep
+
+    lock = threading.Lock()
+    count = {'open': 0, 'peak': 0}
+    get, fetch = sweep.transport.get, sweep._fetch
+
+    def counting_get(url, **kwargs):
+        if url.endswith('/image'):
+            with lock:
+                count['open'] += 1
+                count['peak'] = max(count['peak'], count['open'])
+        return get(url, **kwargs)
+
+    def slow_fetch(*args):
+        time.sleep(0.01)  # decoding slower than snapping builds a backlog
+        fetch(*args)
+        with lock:
+            count['open'] -= 1
+
+    monkeypatch.setattr(sweep.transport, 'get', counting_get)
+    monkeypatch.setattr(sweep, '_fetch', slow_fetch)
+    res = sweep.sweep(andor.Camera(srv.addr('camera')), [{'ExposureTime': 0.1}] * 20, workers=3)
+    assert res.cube.shape[0] == 20
+    assert count == {'open': 0, 'peak': 3}
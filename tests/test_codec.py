@@ -0,0 +1,38 @@
+import pytest
+
+from golab_common import codec
+
+
+@pytest.fixture(params=codec.BACKENDS)
+def backend(request):
+    prev = codec.backend
+    codec.use(request.param)
+    yield request.param
+    codec.use(prev)
+
+
+@pytest.mark.parametrize('body,key,want', [
+    (b'{"f64":1.5}', 'f64', 1.5),
+    (b'{"f64": -2e-3}\n', 'f64', -2e-3),
+    (b'{"int":42}', 'int', 42),
+    (b'{"bool":true}', 'bool', True),
+    (b'{"bool":false}', 'bool', False),
+    (b'{"str":"sine"}', 'str', 'sine'),
+    (b'{"str":"a\\"b"}', 'str', 'a"b'),
+    (b'{"f64":[1,2]}', 'f64', [1, 2]),
+])
+def test_unwrap(backend, body, key, want):
+    got = codec.unwrap(body, key)
+    assert got == want
+    assert type(got) is type(want)
+
+
+def test_unwrap_wrong_key(backend):
+    with pytest.raises(KeyError):
+        codec.unwrap(b'{"f64":1.5}', 'int')
+
+
+def test_encode(backend):
+    assert codec.decode(codec.encode({'f64': 1.5})) == {'f64': 1.5}
+    assert codec.encode(codec.TRUE) is codec.TRUE
+    assert codec.decode(codec.FALSE) == {'bool': False}
@@ -0,0 +1,72 @@
+import io
+
+import numpy as np
+import pytest
+from astropy.io import fits
+
+from andor.decode import FITSFormatError, FrameDecoder, decode, parse_header
+from benchmarks.server import fits_bytes
+
+
+def astropy_decode(buf):
+    with fits.open(io.BytesIO(buf)) as hdu:
+        return hdu[0].data.copy()
+
+
+@pytest.mark.parametrize('shape', [(32, 48), (3, 16, 8)])
+def test_matches_astropy(shape):
+    data = np.random.default_rng(1).integers(0, 65536, shape, dtype=np.uint16)
+    buf = fits_bytes(data)
+    ary = decode(buf)
+    assert ary.dtype == np.uint16 and ary.dtype.isnative
+    np.testing.assert_array_equal(ary, data)
+    np.testing.assert_array_equal(ary, astropy_decode(buf))
+
+
+def test_signed_and_float():
+    for data in (np.arange(-6, 6, dtype=np.int16).reshape(3, 4), np.linspace(0, 1, 12).reshape(4, 3)):
+        hdu = fits.PrimaryHDU(data)
+        f = io.BytesIO()
+        hdu.writeto(f)
+        ary = decode(f.getvalue())
+        assert ary.dtype.isnative
+        np.testing.assert_array_equal(ary, data)
+
+        view = FrameDecoder().decode(f.getvalue(), native=False)
+        assert not view.flags.writeable
+        np.testing.assert_array_equal(view, data)
+
+
+def test_header_cached_and_out():
+    data = np.arange(64, dtype=np.uint16).reshape(8, 8)
+    dec = FrameDecoder()
+    out = np.empty((8, 8), np.uint16)
+    h = dec.parse(fits_bytes(data))
+    assert dec.decode(fits_bytes(data + 1), out=out) is out
+    assert dec.header is h
+    np.testing.assert_array_equal(out, data + 1)
+    with pytest.raises(ValueError):
+        dec.decode(fits_bytes(data), out=np.empty((4, 4), np.uint16))
+
+
+def test_decoder_shared_by_threads():
+    from concurrent.futures import ThreadPoolExecutor
+
+    # alternating shapes make the threads replace each other's cached header
+    bufs = [fits_bytes(np.full(shape, k, np.uint16)) for k, shape in enumerate([(8, 8), (4, 16)] * 200)]
+    dec = FrameDecoder()
+    with ThreadPoolExecutor(4) as pool:
+        arys = list(pool.map(dec.decode, bufs))
+    assert all(a.shape == ((8, 8), (4, 16))[k % 2] and (a == k).all() for k, a in enumerate(arys))
+
+
+def test_rejects_bad_files():
+    buf = fits_bytes(np.zeros((4, 4), np.uint16))
+    with pytest.raises(FITSFormatError):
+        decode(b'not a fits file' * 200)
+    with pytest.raises(FITSFormatError):
+        decode(buf[:2880 + 10])
+    with pytest.raises(FITSFormatError):
+        parse_header(buf.replace(b'NAXIS   =                    2', b'NAXIS   =                    1'))
+    with pytest.raises(FITSFormatError):
+        parse_header(buf.replace(b'BITPIX  =                   16', b'BITPIX  =                   12'))
@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from astropy.io import fits
+
+import andor
+import andor.disk
+from andor.disk import BurstWriter, read_index
+from benchmarks.server import FakeServer
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(frame_shape=(16, 24)) as s:
+        yield s
+
+
+@pytest.mark.parametrize('name', ['burst.fits', 'burst.npy'])
+def test_burst_to_disk(srv, tmp_path, name):
+    cam = andor.Camera(srv.addr('camera'))
+    path = tmp_path / name
+    w = cam.burst_to_disk(path, 6, 100, header={'EXPTIME': 0.001, 'OBJECT': "it's"})
+    expected = np.stack(list(cam.burst(6, 100)))
+
+    if name.endswith('.npy'):
+        cube = np.load(path)
+    else:
+        with fits.open(path) as hdu:
+            cube = hdu[0].data.copy()
+            assert hdu[0].header['OBJECT'] == "it's"
+            assert hdu[0].header['EXPTIME'] == 0.001
+    np.testing.assert_array_equal(cube, expected)
+
+    index = read_index(path)
+    assert [i for i, _, _ in index] == list(range(6))
+    assert [off for _, off, _ in index] == w.offsets
+    raw = np.fromfile(path, dtype='>u2' if name.endswith('.fits') else '<u2')
+    first = raw[w.offsets[1] // 2]
+    assert first ^ (0x8000 if name.endswith('.fits') else 0) == expected[1, 0, 0]
+
+
+def test_writer_rejects_extra_frames(tmp_path):
+    with BurstWriter(tmp_path / 'x.fits', 1, (2, 2)) as w:
+        with pytest.raises(ValueError):
+            w.write(np.zeros((3, 3), np.uint16))
+        w.write(np.zeros((2, 2), np.uint16))
+        with pytest.raises(IndexError):
+            w.write(np.zeros((2, 2), np.uint16))
+
+
+def test_writer_flushes_when_frames_stall(tmp_path):
+    import time
+
+    path = tmp_path / 'x.npy'
+    w = BurstWriter(path, 10, (2, 2), flush_every=8)
+    try:
+        for _ in range(3):  # fewer than flush_every, then nothing more comes
+            w.write(np.ones((2, 2), np.uint16))
+        deadline = time.monotonic() + andor.disk.FLUSH_INTERVAL + 2
+        while len(read_index(path)) < 3 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert [i for i, _, _ in read_index(path)] == [0, 1, 2]
+        assert (np.load(path, mmap_mode='r')[:3] == 1).all()
+    finally:
+        w.close()
+
+
+def test_settings_cards_round_trip(tmp_path):
+    settings = {f'SomeLongFeatureName{i}': v for i, v in
+                enumerate([1, 0.25, True, "it's", 'trailing space ', ' ' * 70, 'x' * 90])}
+    cards = andor.disk.settings_cards(settings)
+    assert all(len(k) <= 8 for k in cards)
+    path = tmp_path / 'settings.fits'
+    BurstWriter(path, 1, (2, 2), header=cards).close()
+    with fits.open(path) as hdu:
+        assert andor.disk.read_settings_cards(hdu[0].header) == settings
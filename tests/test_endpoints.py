@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import andor
+import motion
+from benchmarks.server import FakeServer
+from golab_common import DoNotRepeat, endpoints, metrics, transport
+from golab_common.endpoints import Routes
+
+
+@pytest.fixture
+def srv():
+    with FakeServer(frame_shape=(8, 8)) as s:
+        yield s
+    endpoints.forget()
+
+
+def endpoint_calls():
+    return sum(st.calls for (_, r, _, _), st in metrics.registry.stats().items() if r.endswith('/endpoints'))
+
+
+def test_routes_match_templates_and_paths():
+    r = Routes(['/axis/{axis}/pos', '/image'])
+    assert '/axis/{axis}/pos' in r
+    assert '/axis/X/pos' in r
+    assert '/axis/X/Y/pos' not in r
+    assert '/image' in r
+    assert '/burst/frame' not in r
+    assert '/endpoints' in r
+
+
+def test_fetched_once_per_server(srv):
+    metrics.registry.reset()
+    ctl = motion.Controller(srv.addr('motion'))
+    assert ctl.x.does_support(ctl.x.pos)
+    assert ctl.y.does_support(ctl.y.wait_inpos)
+    assert motion.Controller(srv.addr('motion')).z.does_support(ctl.z.home)
+    assert endpoint_calls() == 1
+
+
+def test_async_shares_registry(srv):
+    ax = motion.Axis(srv.addr('motion'), 'X')
+    ax.does_support(ax.pos)
+    metrics.registry.reset()
+    aax = motion.AsyncAxis(srv.addr('motion'), 'Y')
+    assert asyncio.run(aax.does_support(aax.velocity))
+    assert endpoint_calls() == 0
+
+
+def test_unsupported_fails_fast(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    assert cam.does_support('/burst/setup')
+    assert not cam.does_support('/spool')
+    metrics.registry.reset()
+    with pytest.raises(DoNotRepeat):
+        transport.get(f'{cam.addr}/spool', root=cam.addr)
+    assert metrics.registry.stats() == {}
+    # without root the request is sent, and refused by the server
+    assert transport.get(f'{cam.addr}/spool').status_code == 404
+    cam.get_feature('AOIWidth')  # templated routes still go through
+    assert len(metrics.registry.stats()) == 2
+
+
+def test_host_routes_do_not_cover_its_stems():
+    from benchmarks.server import Device, default_devices
+    from golab_common import niceaddr
+
+    devices = default_devices((8, 8), 10)
+    devices[''] = Device({'/status': {'str': 'ok'}})  # a device on the bare host, under whose stems the rest are
+    with FakeServer(devices=devices) as s:
+        host = niceaddr(s.addr('')).rstrip('/')
+        assert endpoints.supports(host, '/status')
+        cam = andor.Camera(s.addr('camera'))
+        try:
+            assert cam.temperature() is not None
+            cam.get_feature('AOIWidth')
+            with pytest.raises(DoNotRepeat):
+                transport.get(f'{host}/status/history', root=host)
+            # without the client's root known exactly, nothing is refused unsent
+            endpoints.check(f'{host}/camera/spool', root=s.addr('camera'))
+            endpoints.check(f'{host}/status/history')
+        finally:
+            endpoints.forget()
+
+
+def test_registry_safe_under_concurrent_inserts(srv):
+    import threading
+
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            endpoints._known[f'http://other-{i % 50}:1'] = Routes(['/x'])
+            endpoints.forget(f'http://other-{(i + 25) % 50}:1')
+            i += 1
+
+    t = threading.Thread(target=churn)
+    t.start()
+    try:
+        for _ in range(2000):
+            endpoints.check(f'http://{srv.addr("camera")}/image', root=srv.addr('camera'))
+    finally:
+        stop.set()
+        t.join()
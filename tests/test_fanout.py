@@ -0,0 +1,95 @@
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from andor.fanout import FrameOverwritten, FramePublisher, FrameSubscriber
+from andor.ring import FrameRing
+
+READER = '''
+import sys
+from andor.fanout import FrameSubscriber
+sub = FrameSubscriber(sys.argv[1])
+f = sub.read()
+print(f.index, int(f.array.sum()), f.array.shape, f.array.dtype)
+sub.close()
+'''
+
+
+@pytest.fixture
+def pub():
+    with FramePublisher(f'andor-test-{os.getpid()}', (8, 12), slots=4) as p:
+        yield p
+
+
+def test_publish_and_read(pub):
+    sub = FrameSubscriber(pub.name)
+    assert sub.latest == -1
+    with pytest.raises(LookupError):
+        sub.read()
+    frames = [np.full((8, 12), i, np.uint16) for i in range(6)]
+    for f in frames:
+        pub.publish(f)
+    assert sub.latest == 5
+    f = sub.read(4)
+    assert f.index == 4 and f.time > 0
+    np.testing.assert_array_equal(f.array, frames[4])
+    with pytest.raises(FrameOverwritten):
+        sub.read(1)
+
+    view = sub.read(copy=False)
+    assert view.array.base is not None and sub.valid(view)
+    pub.publish(np.arange(4, dtype=np.float32).reshape(2, 2))  # any shape and type that fits
+    pub.publish_all(frames[:3])
+    assert not sub.valid(view)
+    assert sub.read(6).array.dtype == np.float32
+    del view
+    sub.close()
+
+
+def test_follow_skips_overwritten(pub):
+    sub = FrameSubscriber(pub.name)
+    it = sub.follow(start=0, timeout=1)
+    for i in range(10):
+        pub.publish(np.full((8, 12), i, np.uint16))
+    got = [next(it).index for _ in range(4)]
+    assert got == [6, 7, 8, 9] and sub.missed == 6
+    with pytest.raises(TimeoutError):
+        next(it)
+    sub.close()
+
+
+def test_publish_slots_and_other_processes(pub):
+    ring = FrameRing((8, 12), slots=1)
+    slot = ring.acquire()
+    slot.array[:] = 3
+    pub.publish(slot)
+    assert ring.free == 1
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    for _ in range(2):  # a subscriber exiting must leave the block alone
+        out = subprocess.run([sys.executable, '-c', READER, pub.name], env=env,
+                             capture_output=True, text=True, check=True)
+        assert out.stdout.split() == ['0', str(3 * 96), '(8,', '12)', 'uint16']
+        assert 'leaked' not in out.stderr
+
+
+SAME_PROCESS = '''
+import sys
+import numpy as np
+from andor.fanout import FramePublisher, FrameSubscriber
+with FramePublisher(sys.argv[1], (4, 4)) as pub:
+    pub.publish(np.zeros((4, 4), np.uint16))
+    sub = FrameSubscriber(pub.name)
+    assert sub.read().index == 0
+    sub.close()
+'''
+
+
+def test_subscriber_in_publishing_process_keeps_its_registration():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run([sys.executable, '-c', SAME_PROCESS, f'andor-test-same-{os.getpid()}'], env=env,
+                         capture_output=True, text=True, check=True)
+    assert out.stderr == ''
@@ -0,0 +1,44 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import andor
+from benchmarks.server import FakeServer
+
+
+@pytest.fixture(scope='module')
+def servers():
+    with FakeServer(frame_shape=(8, 8)) as a, FakeServer(frame_shape=(4, 6)) as b:
+        yield a, b
+
+
+def test_group_snap_is_concurrent(servers):
+    group = andor.CameraGroup(andor.Camera(s.addr('camera')) for s in servers)
+    # every request waits for one to the other camera; snapping one after the other breaks the barrier
+    barrier = threading.Barrier(len(servers), timeout=5)
+    for s in servers:
+        s.delay = barrier.wait
+    try:
+        t0 = time.time()
+        shot = group.snap()
+        elapsed = time.time() - t0
+    finally:
+        for s in servers:
+            del s.delay
+    assert not barrier.broken
+    assert [f.shape for f in shot.frames] == [(8, 8), (4, 6)]
+    assert all(t0 <= s <= f <= t0 + elapsed for s, f in zip(shot.start, shot.finish))
+
+
+def test_group_burst_is_aligned(servers):
+    group = andor.CameraGroup(andor.Camera(s.addr('camera')) for s in servers)
+    shots = list(group.burst(5, 100, prefetch=2))
+    assert [s.index for s in shots] == list(range(5))
+    for cam in range(2):
+        first = [int(s.frames[cam][0, 0]) for s in shots]
+        assert np.diff(first).tolist() == [1] * 4
+
+    (cubes,) = group.burst(3, 100, downloads='all')
+    assert [c.shape for c in cubes.frames] == [(3, 8, 8), (3, 4, 6)]
@@ -0,0 +1,45 @@
+import subprocess
+import sys
+
+import pytest
+
+# every client package, imported together the way an experiment script does
+CLIENTS = ('andor', 'cryocon', 'daq', 'fluke', 'motion', 'nkt', 'thermocube', 'thorlabs', 'tmc')
+
+# heavy modules, with their submodules, that must only be imported by the calls that use them
+DEFERRED = ('numpy', 'astropy', 'aiohttp', 'imageio', 'asyncio', 'concurrent.futures', 'multiprocessing')
+
+# most time importing every client may take, relative to importing requests,
+# which every script pays for anyway; ~0.6 on a laptop
+RELATIVE_BUDGET = 1.
+
+SCRIPT = '''
+import sys, time
+start = time.perf_counter()
+import requests
+baseline = time.perf_counter() - start
+start = time.perf_counter()
+import {modules}
+print((time.perf_counter() - start) / baseline)
+print(",".join(m for m in sys.modules if m in {deferred!r} or m.startswith({prefixes!r})))
+'''
+
+
+def import_clients(modules=CLIENTS):
+    script = SCRIPT.format(modules=', '.join(modules), deferred=DEFERRED,
+                           prefixes=tuple(d + '.' for d in DEFERRED))
+    out = subprocess.run([sys.executable, '-c', script],
+                         capture_output=True, text=True, check=True).stdout.splitlines()
+    return float(out[0]), out[1]
+
+
+@pytest.mark.parametrize('modules', [('golab_common',), ('andor',), CLIENTS])
+def test_heavy_dependencies_are_deferred(modules):
+    _, loaded = import_clients(modules)
+    assert loaded == ''
+
+
+def test_import_time_relative_to_requests():
+    # best of a few runs, a cold disk cache or a busy CI box is not a regression
+    ratio = min(import_clients()[0] for _ in range(3))
+    assert ratio < RELATIVE_BUDGET
@@ -0,0 +1,46 @@
+import pytest
+
+import andor
+from benchmarks.server import FakeServer
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(latency=0.005, frame_shape=(16, 24)) as s:
+        yield s
+
+
+@pytest.mark.parametrize('fmt', ['fits', 'raw'])
+def test_live_latest(srv, fmt):
+    cam = andor.Camera(srv.addr('camera'))
+    expected = cam.snap()
+    with cam.live(fmt=fmt) as live:
+        first = live.latest(timeout=5)
+        assert first.index >= 1
+        assert (first.array == expected).all()
+        second = live.latest(after=first.index, timeout=5)
+        assert second.index > first.index and second.time >= first.time
+        with live.view() as f:
+            assert f.array.shape == (16, 24)
+        live.latest(after=second.index + 5, timeout=5)
+        assert live.fps > 0 and live.decode_time > 0
+        assert live.dropped > 0  # frames nobody asked for
+    assert live._thread is None
+
+
+def test_live_buffers_are_reused(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    with cam.live() as live:
+        live.latest(timeout=5)
+        live.latest(after=live.index + 2, timeout=5)
+        buffers = [id(b) for b in live._buffers]
+        live.latest(after=live.index + 2, timeout=5)
+        assert [id(b) for b in live._buffers] == buffers
+
+
+def test_live_errors_are_counted():
+    cam = andor.Camera('127.0.0.1:9/camera')  # nothing listens on the discard port
+    with cam.live() as live:
+        with pytest.raises(TimeoutError):
+            live.latest(timeout=0.3)
+    assert live.errors >= 1 and live.last_error is not None
@@ -0,0 +1,76 @@
+import random
+
+from golab_common.metrics import Histogram, Registry, route_label
+
+
+def test_histogram_exact_below_sub_buckets():
+    h = Histogram()
+    for v in range(64):
+        h.record(v)
+    assert h.percentile(50) in (31, 32)
+    assert h.min == 0
+    assert h.max == 63
+
+
+def test_histogram_relative_error_bounded():
+    h = Histogram()
+    values = sorted(random.randint(100, 10_000_000) for _ in range(10_000))
+    for v in values:
+        h.record(v)
+    for q in (50, 90, 99):
+        exact = values[round(q / 100 * len(values)) - 1]
+        assert abs(h.percentile(q) - exact) / exact < 2 ** -h.sub_bucket_bits
+
+
+def test_histogram_buckets_contiguous():
+    h = Histogram()
+    for v in range(100_000):
+        lo, hi = h.bounds(h.index(v))
+        assert lo <= v < hi
+
+
+def test_route_label_keeps_stem():
+    assert route_label('/motion/axis/X/pos', '/axis/{axis}/pos') == '/motion/axis/{axis}/pos'
+    assert route_label('/axis/X/pos', '/axis/{axis}/pos') == '/axis/{axis}/pos'
+    assert route_label('/temperature') == '/temperature'
+
+
+def test_prometheus_text():
+    r = Registry()
+    r.record('http://cam:8000', '/image', 'GET', 200, 0.003, 0, 1000)
+    r.record('http://cam:8000', '/image', 'GET', 200, 0.020, 0, 1000)
+    txt = r.prometheus_text()
+    assert 'golab_request_duration_seconds_bucket{host="http://cam:8000",route="/image",method="GET",status="200",le="0.005"} 1' in txt  # NOQA
+    assert 'golab_request_duration_seconds_count{host="http://cam:8000",route="/image",method="GET",status="200"} 2' in txt  # NOQA
+    assert 'golab_request_bytes_received_total{host="http://cam:8000",route="/image",method="GET",status="200"} 2000' in txt  # NOQA
+
+
+def test_summary_while_recording():
+    import threading
+
+    r = Registry()
+    stop = threading.Event()
+
+    def record():
+        v = 1
+        while not stop.is_set():
+            v = v * 7 % 10_000_019  # new buckets keep appearing
+            r.record('http://cam:8000', '/image', 'GET', 200, v / 1e6)
+
+    threads = [threading.Thread(target=record) for _ in range(3)]
+    for t in threads:
+        t.start()
+    try:
+        for _ in range(300):
+            row, = r.summary()
+            assert row['p50_ms'] <= row['p99_ms'] <= row['max_ms']
+            assert 'le="+Inf"' in r.prometheus_text()
+    finally:
+        stop.set()
+        for t in threads:
+            t.join()
+
+    st = r.stats()[('http://cam:8000', '/image', 'GET', '200')]
+    n = st.calls
+    r.record('http://cam:8000', '/image', 'GET', 200, 0.001)
+    assert st.calls == n  # a snapshot
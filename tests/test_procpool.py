@@ -0,0 +1,75 @@
+import os
+
+import numpy as np
+import pytest
+
+import andor
+from andor.decode import decode
+from andor.procpool import DecodePool
+from benchmarks.server import FakeServer, fits_bytes
+
+
+@pytest.fixture(scope='module')
+def pool():
+    with DecodePool(procs=2, slots=3) as p:
+        yield p
+
+
+def test_decode_pool_keeps_order(pool):
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 65535, size=(8, 12), dtype=np.uint16) for _ in range(10)]
+    for frame, slot in zip(frames, pool.map(fits_bytes(f) for f in frames)):
+        with slot as ary:
+            np.testing.assert_array_equal(ary, frame)
+    assert pool.ring.free == len(pool.ring)
+    with pytest.raises(ValueError):
+        list(pool.map([fits_bytes(frames[0][:4])]))
+
+
+def test_burst_through_pool(pool):
+    with FakeServer(frame_shape=(8, 12)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        first = []
+        for slot in cam.burst(9, 100, decode_pool=pool):
+            with slot as frame:
+                first.append(int(frame[0, 0]))
+                np.testing.assert_array_equal(frame[1:], cam.snap()[1:])
+        assert np.diff(first).tolist() == [1] * 8
+
+        # abandoning a burst hands back the slots
+        burst = cam.burst(9, 100, decode_pool=pool)
+        next(burst).release()
+        burst.close()
+        assert pool.ring.free == len(pool.ring)
+
+
+def test_close_frees_shared_memory():
+    p = DecodePool(procs=1)
+    slot = next(p.map([fits_bytes(np.ones((4, 4), np.uint16))]))
+    np.testing.assert_array_equal(slot.array, decode(fits_bytes(np.ones((4, 4), np.uint16))))
+    slot.release()
+    names = p._src.name, p._dst.name
+    p.close()
+    assert not any(os.path.exists(f'/dev/shm/{n}') for n in names)
+
+
+POOL_SCRIPT = '''
+import numpy as np
+from andor.procpool import DecodePool
+from benchmarks.server import fits_bytes
+if __name__ == '__main__':
+    with DecodePool(procs=2, slots=2) as pool:
+        for slot in pool.map(fits_bytes(np.full((4, 4), k, np.uint16)) for k in range(6)):
+            slot.release()
+'''
+
+
+def test_workers_leave_tracking_to_the_pool(tmp_path):
+    import subprocess
+    import sys
+
+    script = tmp_path / 'pool.py'
+    script.write_text(POOL_SCRIPT)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    out = subprocess.run([sys.executable, str(script)], env=env, capture_output=True, text=True, check=True)
+    assert out.stderr == ''
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import andor
+from andor.quicklook import QuickLook
+from andor.ring import FrameRing
+from benchmarks.server import FakeServer
+
+
+def _expected(frame, ql):
+    y, x = np.indices(frame.shape)
+    total = frame.sum(dtype=np.float64)
+    return {
+        'sum': total,
+        'peak': frame.max(),
+        'saturated': np.count_nonzero(frame >= ql.saturation),
+        'cy': (y * frame).sum() / total,
+        'cx': (x * frame).sum() / total,
+        'hist': np.histogram(frame, ql.edges)[0],
+    }
+
+
+@pytest.mark.parametrize('dtype', [np.uint16, np.float32])
+def test_compute_matches_numpy(dtype):
+    ql = QuickLook(bins=10, value_range=(0, 1000), saturation=900)
+    frame = np.random.default_rng(0).integers(0, 1200, size=(20, 30)).astype(dtype)
+    rec = ql.compute(frame, index=7)
+    assert rec['index'] == 7
+    for k, v in _expected(frame, ql).items():
+        np.testing.assert_allclose(rec[k], v, err_msg=k)
+    assert np.isnan(ql.compute(np.zeros((4, 4), np.uint16))['cx'])
+
+
+@pytest.mark.parametrize('bins, value_range', [
+    (3, (0, 100)), (7, (0, 65536)), (64, (0, 65536)), (10, (-25, 1000)), (9, (17, 4000)),
+])
+def test_histogram_matches_numpy(bins, value_range):
+    ql = QuickLook(bins=bins, value_range=value_range)
+    rng = np.random.default_rng(1)
+    frame = rng.integers(0, value_range[1] + 50, size=(64, 64)).astype(np.uint16)
+    frame.flat[:len(ql.edges)] = np.clip(np.ceil(ql.edges), 0, None)  # pixels on the edges, hi among them
+    np.testing.assert_array_equal(ql.compute(frame)['hist'], np.histogram(frame, ql.edges)[0])
+
+
+def test_run_in_order_and_releases_slots():
+    ql = QuickLook(bins=4, workers=3)
+    ring = FrameRing((4, 4), slots=2)
+
+    def frames():
+        for i in range(9):
+            slot = ring.acquire(timeout=1)
+            slot.array[:] = i
+            yield slot
+    table = ql.run(frames())
+    assert table.index.tolist() == list(range(9))
+    assert table.peak.tolist() == list(range(9))
+    assert table.hist.shape == (9, 4)
+    assert ring.free == 2
+
+    pairs = list(ql.map([np.ones((2, 2), np.uint16)] * 3, with_frames=True))
+    assert [r['sum'] for _, r in pairs] == [4, 4, 4]
+
+
+def test_burst_metrics():
+    with FakeServer(frame_shape=(16, 24)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        table = cam.burst_metrics(5, 100, quicklook=QuickLook(bins=16))
+        snap = cam.snap()
+    assert len(table) == 5 and table.hist.shape == (5, 16)
+    # only the first pixel differs between burst frames
+    assert np.diff(table['sum']).tolist() == [1] * 4
+    assert table['hist'].sum(axis=1).tolist() == [snap.size] * 5
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+import andor
+from andor.reduce import FrameStats
+from andor.ring import FrameRing
+from benchmarks.server import FakeServer
+
+
+def _cube(n=20, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 65535, size=(n, 8, 12), dtype=np.uint16)
+
+
+def test_stats_match_numpy():
+    cube = _cube()
+    s = FrameStats().update(cube[:5])
+    s.add(cube[5:])  # a cube at once
+    assert s.count == 20
+    np.testing.assert_allclose(s.mean, cube.mean(axis=0))
+    np.testing.assert_allclose(s.variance(), cube.var(axis=0))
+    np.testing.assert_allclose(s.std(ddof=1), cube.std(axis=0, ddof=1))
+    np.testing.assert_array_equal(s.sum, cube.sum(axis=0, dtype=np.float64))
+    np.testing.assert_array_equal(s.min, cube.min(axis=0))
+    np.testing.assert_array_equal(s.max, cube.max(axis=0))
+    assert s.min.dtype == np.uint16
+    with pytest.raises(ValueError):
+        s.add(cube[0, :4])
+
+
+def test_merge():
+    cube = _cube(31, seed=1)
+    a = FrameStats().update(cube[:7])
+    b = FrameStats().update(cube[7:])
+    merged = FrameStats().merge(a).merge(b).merge(FrameStats())
+    np.testing.assert_allclose(merged.mean, cube.mean(axis=0))
+    np.testing.assert_allclose(merged.variance(), cube.var(axis=0))
+    np.testing.assert_array_equal(merged.max, cube.max(axis=0))
+    assert merged.count == 31
+
+
+def test_slots_are_released():
+    ring = FrameRing((8, 12), slots=2)
+    s = FrameStats()
+    for frame in _cube(5):
+        slot = ring.acquire()
+        slot.array[:] = frame
+        s.add(slot)
+    assert ring.free == 2 and s.count == 5
+
+
+def test_burst_stats():
+    with FakeServer(frame_shape=(16, 24)) as srv:
+        cam = andor.Camera(srv.addr('camera'))
+        s = cam.burst_stats(10, 100)
+    assert s.count == 10 and s.mean.shape == (16, 24)
+    # the fake server stamps frame k with base + k in its first pixel
+    assert s.max[0, 0] - s.min[0, 0] == 9
+    assert s.mean[0, 0] == s.min[0, 0] + 4.5
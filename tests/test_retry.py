@@ -1,4 +1,7 @@
-from golab_common.retry import retry
+import asyncio
+import time
+
+from golab_common.retry import retry, RetryPolicy, CircuitBreaker, CircuitOpen
 
 import pytest
 
@@ -40,3 +43,81 @@ def test_retry_ameliorates_flaky_behavior():
 def test_retry_fails_not_enough_iter():
     with pytest.raises(StopIteration, match=error_text):
         flaky_function_that_will_fail()
+
+
+CNTR3 = 0
+
+
+@retry(max_retries=3, interval=0.001)
+async def flaky_coroutine_that_will_pass():
+    global CNTR3
+    if CNTR3 < STOP_FAIL_AT1:
+        CNTR3 += 1
+        raise StopIteration(error_text)
+
+    return CNTR3
+
+
+def test_retry_ameliorates_flaky_coroutine():
+    assert asyncio.run(flaky_coroutine_that_will_pass()) == STOP_FAIL_AT1
+
+
+def test_policy_backs_off_exponentially():
+    p = RetryPolicy(interval=1, backoff=2, max_interval=5, jitter=0)
+    assert [p.delay(n) for n in range(5)] == [1, 2, 4, 5, 5]
+
+
+def test_policy_jitter_only_shortens():
+    p = RetryPolicy(interval=1, backoff=1, jitter=0.5)
+    for _ in range(100):
+        assert 0.5 <= p.delay(0) <= 1
+
+
+def test_policy_gives_up_at_deadline():
+    p = RetryPolicy(max_retries=10, interval=1, jitter=0, deadline=0.5)
+    assert p.next_delay(0, Exception(), time.monotonic()) is None
+
+
+def test_non_idempotent_is_not_repeated():
+    calls = []
+
+    @retry(max_retries=3, interval=0.001, idempotent=False)
+    def move_rel():
+        calls.append(1)
+        raise StopIteration(error_text)
+
+    with pytest.raises(StopIteration):
+        move_rel()
+    assert len(calls) == 1
+
+
+def test_breaker_opens_and_half_opens():
+    b = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    host = 'http://chiller:8000'
+    b.check(host)
+    b.failure(host)
+    b.check(host)
+    b.failure(host)
+    with pytest.raises(CircuitOpen):
+        b.check(host)
+
+    time.sleep(0.06)
+    b.check(host)  # the trial request
+    with pytest.raises(CircuitOpen):
+        b.check(host)  # everyone else still fails fast
+
+    b.success(host)
+    b.check(host)
+
+
+def test_circuit_open_is_not_retried():
+    calls = []
+
+    @retry(max_retries=3, interval=0.001)
+    def read():
+        calls.append(1)
+        raise CircuitOpen('down')
+
+    with pytest.raises(CircuitOpen):
+        read()
+    assert len(calls) == 1
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import andor
+from andor.ring import FrameRing
+from benchmarks.server import FakeServer
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(frame_shape=(16, 24)) as s:
+        yield s
+
+
+def test_ring_acquire_release():
+    ring = FrameRing((4, 4), slots=2)
+    a = ring.acquire()
+    with ring.acquire() as ary:
+        assert ary.shape == (4, 4) and ary.dtype == np.uint16
+        assert ring.free == 0
+        with pytest.raises(TimeoutError):
+            ring.acquire(timeout=0.01)
+    assert ring.free == 1
+    a.release()
+    with pytest.raises(ValueError):
+        a.release()
+    assert ring.free == 2
+
+
+def test_snap_into_ring(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    ring = cam.frame_ring(slots=2)
+    assert ring.shape == (16, 24)
+    for _ in range(5):
+        with cam.snap(ring=ring) as frame:
+            assert frame.base is ring.slots[0].array.base
+            np.testing.assert_array_equal(frame, cam.snap())
+    assert ring.free == 2
+
+
+@pytest.mark.parametrize('prefetch', [0, 3])
+def test_burst_into_ring(srv, prefetch):
+    cam = andor.Camera(srv.addr('camera'))
+    ring = cam.frame_ring(slots=4)
+    first = []
+    for slot in cam.burst(10, 100, prefetch=prefetch, ring=ring):
+        with slot as frame:
+            first.append(int(frame[0, 0]))
+    assert np.diff(first).tolist() == [1] * 9
+    assert ring.free == 4
+
+    # abandoning a burst hands back the slots of frames fetched ahead
+    burst = cam.burst(10, 100, prefetch=prefetch, ring=ring)
+    next(burst).release()
+    burst.close()
+    assert ring.free == 4
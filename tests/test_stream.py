@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import andor
+from andor.stream import BurstStream
+from benchmarks.server import FakeServer
+from golab_common import metrics, transport
+
+
+@pytest.fixture(scope='module')
+def srv():
+    with FakeServer(frame_shape=(16, 24)) as s:
+        yield s
+
+
+def setup_burst(cam, frames):
+    transport.post(f'{cam.addr}/burst/setup', json={'fps': 100, 'frames': frames, 'spool': 0})
+
+
+def all_frames_calls():
+    return sum(st.calls for (_, r, _, _), st in metrics.registry.stats().items() if r.endswith('/all-frames'))
+
+
+def test_stream_in_chunks(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    setup_burst(cam, 10)
+    metrics.registry.reset()
+    # 3 frames per request after the first
+    s = BurstStream(f'{cam.addr}/burst/all-frames', 10, chunk_bytes=3 * 16 * 24 * 2 + 1)
+    first = [int(f[0, 0]) for f in s]
+    assert np.diff(first).tolist() == [1] * 9
+    assert s.out.shape == (10, 16, 24) and s.out.dtype == np.uint16
+    assert all_frames_calls() == 1 + 3
+    np.testing.assert_array_equal(s.out[:, 1:], np.broadcast_to(cam.snap()[1:], (10, 15, 24)))
+
+
+def test_stream_into_memmap(srv, tmp_path):
+    cam = andor.Camera(srv.addr('camera'))
+    out = np.lib.format.open_memmap(tmp_path / 'burst.npy', mode='w+', dtype=np.uint16, shape=(5, 16, 24))
+    cube, = cam.burst(5, 100, downloads='all', out=out)
+    assert cube is out
+    out.flush()
+    np.testing.assert_array_equal(np.load(tmp_path / 'burst.npy'), cube)
+
+
+def test_stream_wrong_out(srv):
+    cam = andor.Camera(srv.addr('camera'))
+    with pytest.raises(ValueError):
+        list(cam.burst(2, 100, downloads='stream', out=np.empty((2, 8, 8), np.uint16)))
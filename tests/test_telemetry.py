@@ -0,0 +1,36 @@
+import time
+
+from golab_common.telemetry import Poller
+
+
+def test_slow_channel_does_not_drag_fast_one():
+    def slow():
+        time.sleep(0.2)
+        return 1
+
+    p = Poller(workers=4)
+    p.register('fast', lambda: 2, period=0.01)
+    p.register('slow', slow, period=0.01)
+    with p:
+        time.sleep(0.3)
+
+    fast, slow = p.channels['fast'], p.channels['slow']
+    assert fast.samples > 10
+    assert slow.samples <= 2
+    assert slow.skipped > 0
+    assert p.latest('fast')[1] == 2
+
+
+def test_errors_are_recorded():
+    def broken():
+        raise OSError('unplugged')
+
+    p = Poller()
+    p.register('broken', broken, period=0.01)
+    with p:
+        time.sleep(0.05)
+
+    ch = p.channels['broken']
+    assert ch.errors > 0
+    assert isinstance(ch.last_error, OSError)
+    assert p.latest('broken') is None
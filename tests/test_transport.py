@@ -0,0 +1,44 @@
+from golab_common import transport
+
+
+def test_session_shared_per_host():
+    a = transport.session_for('http://localhost:8000/camera/image')
+    b = transport.session_for('http://localhost:8000/motion/axis/X/pos')
+    c = transport.session_for('http://localhost:8001/image')
+    assert a is b
+    assert a is not c
+
+
+def test_configure_drops_sessions():
+    a = transport.session_for('http://localhost:8000/image')
+    transport.configure(pool_size=4)
+    b = transport.session_for('http://localhost:8000/image')
+    assert a is not b
+    transport.configure()
+
+
+def test_async_session_closed_with_its_loop():
+    import asyncio
+
+    import motion
+    from benchmarks.server import FakeServer
+    from golab_common import aio
+
+    with FakeServer() as srv:
+        async def pos():
+            await motion.AsyncController(srv.addr('motion')).x.pos()
+            return aio.session()
+
+        s = asyncio.run(pos())
+        assert s.closed
+        assert aio._sessions == {}
+
+        async def reopen():
+            a = aio.session()
+            await aio.close_all()
+            await motion.AsyncController(srv.addr('motion')).x.pos()
+            return a, aio.session()
+
+        a, b = asyncio.run(reopen())
+        assert a.closed and b.closed and a is not b
+        assert aio._sessions == {}
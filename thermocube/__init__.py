@@ -1,9 +1,7 @@
 """thermocube provides tools for accessing thermocube chillers thanks to a go-hcit middleman."""
-import requests
-
 from golab_common.retry import retry
 
-from golab_common import raise_err, niceaddr
+from golab_common import raise_err, niceaddr, codec, transport, aio
 
 
 class Chiller:
@@ -25,9 +23,9 @@ class Chiller:
     @retry(max_retries=2, interval=1)
     def temperature(self):
         """Temperature at the output of the cube."""
-        resp = requests.get(f'{self.addr}/temperature')
+        resp = transport.get(f'{self.addr}/temperature')
         raise_err(resp)
-        return resp.json()['f64']
+        return codec.unwrap(resp, 'f64')
 
     @retry(max_retries=2, interval=1)
     def temperature_setpoint(self, celcius=None):
@@ -46,24 +44,66 @@ class Chiller:
         """
         url = f'{self.addr}/temperature-setpoint'
         if celcius is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(celcius)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload)
             raise_err(resp)
 
     @property
     @retry(max_retries=2, interval=1)
     def faults(self):
         """Faults displayed by the thermocube."""
-        resp = requests.get(f'{self.addr}/faults')
+        resp = transport.get(f'{self.addr}/faults')
         raise_err(resp)
-        return resp.json()
+        return codec.decode(resp)
 
     # no need to decorate this since the inner function is decorated
     @property
     def tank_level_low(self):
         """If True, the tank needs to be refilled."""
         return self.faults['tankLevelLow']
+
+
+class AsyncChiller:
+    """Asyncio counterpart of Chiller.  Properties return awaitables."""
+
+    def __init__(self, addr):
+        """Create a new AsyncChiller instance, see Chiller."""
+        self.addr = niceaddr(addr)
+
+    @property
+    @retry(max_retries=2, interval=1)
+    async def temperature(self):
+        """Temperature at the output of the cube."""
+        resp = await aio.get(f'{self.addr}/temperature')
+        raise_err(resp)
+        return codec.unwrap(resp, 'f64')
+
+    @retry(max_retries=2, interval=1)
+    async def temperature_setpoint(self, celcius=None):
+        """Get (celcius=None) or set (celcius != None) the temperature setpoint, see Chiller.temperature_setpoint."""
+        url = f'{self.addr}/temperature-setpoint'
+        if celcius is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            return codec.unwrap(resp, 'f64')
+        else:
+            payload = {'f64': float(celcius)}
+            resp = await aio.post(url, json=payload)
+            raise_err(resp)
+
+    @property
+    @retry(max_retries=2, interval=1)
+    async def faults(self):
+        """Faults displayed by the thermocube."""
+        resp = await aio.get(f'{self.addr}/faults')
+        raise_err(resp)
+        return codec.decode(resp)
+
+    @property
+    async def tank_level_low(self):
+        """If True, the tank needs to be refilled."""
+        return (await self.faults)['tankLevelLow']
@@ -1,14 +1,7 @@
 """Thorlabs provides HTTP clients for Thorlabs hardware enabled by go-hcit."""
-import requests
-
-try:
-    from astropy import units as u
-except ImportError:
-    pass
-
 from golab_common.retry import retry
 
-from golab_common import raise_err, niceaddr
+from golab_common import raise_err, niceaddr, is_quantity, codec, transport, aio
 
 
 class ITC4000:
@@ -49,21 +42,23 @@ class ITC4000:
         """
         url = f'{self.addr}/current'
         if value is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
             raise_err(resp)
-            val = resp.json()['f64']
+            val = codec.unwrap(resp, 'f64')
             if self.convention == 'float':
                 return val
             else:
+                from astropy import units as u
                 return u.mA * val
 
-        if isinstance(value, u.Quantity):
+        if is_quantity(value):
+            from astropy import units as u
             value = float(value.to(u.mA))
         else:
             value = float(value)
 
         payload = {'f64': value}
-        resp = requests.post(url, json=payload)
+        resp = transport.post(url, json=payload)
         raise_err(resp)
 
     @retry(max_retries=2, interval=1)
@@ -83,10 +78,56 @@ class ITC4000:
         """
         url = f'{self.addr}/emission'
         if value is None:
-            resp = requests.get(url)
+            resp = transport.get(url)
+            raise_err(resp)
+            return codec.unwrap(resp, 'bool')
+        else:
+            payload = {'bool': value}
+            resp = transport.post(url, json=payload)
+            raise_err(resp)
+
+
+class AsyncITC4000:
+    """Asyncio counterpart of ITC4000."""
+
+    def __init__(self, addr, convention='float'):
+        """Create a new AsyncITC4000 instance, see ITC4000."""
+        self.addr = niceaddr(addr)
+        self.convention = convention
+
+    @retry(max_retries=2, interval=1)
+    async def current(self, value=None):
+        """Get or set the current setpoint, see ITC4000.current."""
+        url = f'{self.addr}/current'
+        if value is None:
+            resp = await aio.get(url)
+            raise_err(resp)
+            val = codec.unwrap(resp, 'f64')
+            if self.convention == 'float':
+                return val
+            else:
+                from astropy import units as u
+                return u.mA * val
+
+        if is_quantity(value):
+            from astropy import units as u
+            value = float(value.to(u.mA))
+        else:
+            value = float(value)
+
+        payload = {'f64': value}
+        resp = await aio.post(url, json=payload)
+        raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def emission(self, value=None):
+        """Get or set the emission status, see ITC4000.emission."""
+        url = f'{self.addr}/emission'
+        if value is None:
+            resp = await aio.get(url)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
         else:
             payload = {'bool': value}
-            resp = requests.post(url, json=payload)
+            resp = await aio.post(url, json=payload)
             raise_err(resp)
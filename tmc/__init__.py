@@ -1,13 +1,12 @@
 """tmc provides tools for working with test and measurement equipment through go-hcit."""
 import io
 
-import requests
-
-import numpy as np
+# numpy is imported by the methods that return arrays, so that scripts which
+# only drive the instruments do not pay for it
 
 from golab_common.retry import retry
 
-from golab_common import raise_err
+from golab_common import raise_err, niceaddr, endpoints, codec, transport, aio
 
 
 class FunctionGenerator:
@@ -31,6 +30,19 @@ class FunctionGenerator:
 
         self.addr = addr
 
+    def does_support(self, route):
+        """Return True if the server supports route, else False.
+
+        Parameters
+        ----------
+        route : str
+            route relative to the root address, e.g. '/waveform'.
+            The server's routes are fetched once per process and shared, see
+            golab_common.endpoints
+
+        """
+        return endpoints.supports(self.addr, route)
+
     @retry(max_retries=2, interval=1)
     def function(self, signal_type=None):
         """Get or set the function type used by the generator.
@@ -49,11 +61,11 @@ class FunctionGenerator:
         """
         url = f'{self.addr}/function'
         if signal_type is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
 
-        resp = requests.post(url, json={'str': signal_type})
+        resp = transport.post(url, json={'str': signal_type}, root=self.addr)
         raise_err(resp)
         return
 
@@ -75,11 +87,11 @@ class FunctionGenerator:
         """
         url = f'{self.addr}/voltage'
         if volts is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
 
-        resp = requests.post(url, json={'f64': float(volts)})
+        resp = transport.post(url, json={'f64': float(volts)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -101,11 +113,11 @@ class FunctionGenerator:
         """
         url = f'{self.addr}/frequency'
         if hertz is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
 
-        resp = requests.post(url, json={'f64': float(hertz)})
+        resp = transport.post(url, json={'f64': float(hertz)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -127,11 +139,11 @@ class FunctionGenerator:
         """
         url = f'{self.addr}/offset'
         if volts is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
 
-        resp = requests.post(url, json={'f64': float(volts)})
+        resp = transport.post(url, json={'f64': float(volts)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -153,11 +165,11 @@ class FunctionGenerator:
         """
         url = f'{self.addr}/output'
         if on is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['bool']
+            return codec.unwrap(resp, 'bool')
 
-        resp = requests.post(url, json={'bool': on})
+        resp = transport.post(url, json={'bool': on}, root=self.addr)
         raise_err(resp)
         return
 
@@ -177,19 +189,19 @@ class FunctionGenerator:
         """
         if ary.ndim != 1:
             raise ValueError("array must be of dimension 1")
-        if ary.dtype != np.uint16:
+        if ary.dtype != 'uint16':
             raise ValueError("array must be of dtype uint16")
 
         url = f'{self.addr}/waveform'
-        resp = requests.post(url, ary.tobytes())
+        resp = transport.post(url, ary.tobytes(), root=self.addr)
         raise_err(resp)
 
     def raw(self, cmd):
         """Raw sends text to the device and returns any response."""
         url = f'{self.addr}/raw'
-        resp = requests.post(url, json={'str': cmd})
+        resp = transport.post(url, json={'str': cmd}, root=self.addr)
         raise_err(resp)
-        return resp.json()['str']
+        return codec.unwrap(resp, 'str')
 
 
 class Oscilloscope:
@@ -213,6 +225,19 @@ class Oscilloscope:
 
         self.addr = addr
 
+    def does_support(self, route):
+        """Return True if the server supports route, else False.
+
+        Parameters
+        ----------
+        route : str
+            route relative to the root address, e.g. '/acq-waveform'.
+            The server's routes are fetched once per process and shared, see
+            golab_common.endpoints
+
+        """
+        return endpoints.supports(self.addr, route)
+
     def scale(self, channel='1', volts_full_scale=None):
         """Full vertical scale of the oscilloscope.
 
@@ -231,11 +256,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/scale'
         if volts_full_scale is None:
-            resp = requests.get(url, json={'channel': channel})
+            resp = transport.get(url, json={'channel': channel}, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
 
-        resp = requests.post(url, json={'scale': float(volts_full_scale), 'channel': channel})
+        resp = transport.post(url, json={'scale': float(volts_full_scale), 'channel': channel}, root=self.addr)
         raise_err(resp)
         return
 
@@ -255,11 +280,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/timebase'
         if seconds_full_width is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
 
-        resp = requests.post(url, json={'f64': float(seconds_full_width)})
+        resp = transport.post(url, json={'f64': float(seconds_full_width)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -279,11 +304,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/bit-depth'
         if bits is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
 
-        resp = requests.post(url, json={'int': int(bits)})
+        resp = transport.post(url, json={'int': int(bits)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -303,11 +328,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/sample-rate'
         if samples_per_second is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
 
-        resp = requests.post(url, json={'int': int(samples_per_second)})
+        resp = transport.post(url, json={'int': int(samples_per_second)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -327,11 +352,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/acq-length'
         if samples is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
 
-        resp = requests.post(url, json={'int': int(samples)})
+        resp = transport.post(url, json={'int': int(samples)}, root=self.addr)
         raise_err(resp)
         return
 
@@ -351,11 +376,11 @@ class Oscilloscope:
         """
         url = f'{self.addr}/acq-mode'
         if mode is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['str']
+            return codec.unwrap(resp, 'str')
 
-        resp = requests.post(url, json={'str': mode})
+        resp = transport.post(url, json={'str': mode}, root=self.addr)
         raise_err(resp)
         return
 
@@ -377,8 +402,9 @@ class Oscilloscope:
 
         """
         url = f'{self.addr}/acq-waveform'
-        resp = requests.get(url, json={'channels': channels})
+        resp = transport.get(url, json={'channels': channels}, root=self.addr)
         raise_err(resp)
+        import numpy as np
         file = io.BytesIO(resp.content)
         ary = np.loadtxt(file, skiprows=1, delimiter=',')
         return ary
@@ -386,9 +412,9 @@ class Oscilloscope:
     def raw(self, cmd):
         """Raw sends text to the device and returns any response."""
         url = f'{self.addr}/raw'
-        resp = requests.post(url, json={'str': cmd})
+        resp = transport.post(url, json={'str': cmd}, root=self.addr)
         raise_err(resp)
-        return resp.json()['str']
+        return codec.unwrap(resp, 'str')
 
 
 class DAQ:
@@ -412,6 +438,19 @@ class DAQ:
 
         self.addr = addr
 
+    def does_support(self, route):
+        """Return True if the server supports route, else False.
+
+        Parameters
+        ----------
+        route : str
+            route relative to the root address, e.g. '/record'.
+            The server's routes are fetched once per process and shared, see
+            golab_common.endpoints
+
+        """
+        return endpoints.supports(self.addr, route)
+
     @retry(max_retries=2, interval=1)
     def label(self, channel, label):
         """Set the label for a given channel.
@@ -426,7 +465,7 @@ class DAQ:
         """
         url = f'{self.addr}/channel-label'
         payload = {'channel': int(channel), 'label': label}
-        resp = requests.post(url, json=payload)
+        resp = transport.post(url, json=payload, root=self.addr)
         raise_err(resp)
         return
 
@@ -474,12 +513,12 @@ class DAQ:
         """
         url = f'{self.addr}/sample-rate'
         if samples_per_second is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['f64']
+            return codec.unwrap(resp, 'f64')
         else:
             payload = {'f64': float(samples_per_second)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, root=self.addr)
             raise_err(resp)
             return
 
@@ -500,12 +539,12 @@ class DAQ:
         """
         url = f'{self.addr}/recording-channel'
         if channel is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
         else:
             payload = {'int': int(channel)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, root=self.addr)
             raise_err(resp)
             return
 
@@ -526,12 +565,12 @@ class DAQ:
         """
         url = f'{self.addr}/recording-length'
         if samples is None:
-            resp = requests.get(url)
+            resp = transport.get(url, root=self.addr)
             raise_err(resp)
-            return resp.json()['int']
+            return codec.unwrap(resp, 'int')
         else:
             payload = {'int': int(samples)}
-            resp = requests.post(url, json=payload)
+            resp = transport.post(url, json=payload, root=self.addr)
             raise_err(resp)
             return
 
@@ -539,8 +578,9 @@ class DAQ:
     def record(self):
         """Capture a recording and return the data as a numpy array."""
         url = f'{self.addr}/record'
-        resp = requests.get(url)
+        resp = transport.get(url, root=self.addr)
         raise_err(resp)
+        import numpy as np
         src = io.BytesIO(resp.content)
         return np.loadtxt(src, delimiter=',', skiprows=1)
 
@@ -548,6 +588,212 @@ class DAQ:
     def raw(self, cmd):
         """Raw sends text to the device and returns any response."""
         url = f'{self.addr}/raw'
-        resp = requests.post(url, json={'str': cmd})
+        resp = transport.post(url, json={'str': cmd}, root=self.addr)
+        raise_err(resp)
+        return codec.unwrap(resp, 'str')
+
+
+class AsyncFunctionGenerator:
+    """Asyncio counterpart of FunctionGenerator."""
+
+    def __init__(self, addr):
+        """Create a new AsyncFunctionGenerator instance, see FunctionGenerator."""
+        self.addr = niceaddr(addr)
+
+    async def does_support(self, route):
+        """Return True if the server supports route, else False, see FunctionGenerator.does_support."""
+        return await endpoints.asupports(self.addr, route)
+
+    async def _get_or_set(self, route, key, value):
+        url = f'{self.addr}/{route}'
+        if value is None:
+            resp = await aio.get(url, root=self.addr)
+            raise_err(resp)
+            return codec.unwrap(resp, key)
+
+        resp = await aio.post(url, json={key: value}, root=self.addr)
+        raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def function(self, signal_type=None):
+        """Get or set the function type used by the generator, see FunctionGenerator.function."""
+        return await self._get_or_set('function', 'str', signal_type)
+
+    @retry(max_retries=2, interval=1)
+    async def voltage(self, volts=None):
+        """Get or set the voltage used by the generator, Vpp."""
+        return await self._get_or_set('voltage', 'f64', None if volts is None else float(volts))
+
+    @retry(max_retries=2, interval=1)
+    async def frequency(self, hertz=None):
+        """Get or set the frequency used by the generator, Hz."""
+        return await self._get_or_set('frequency', 'f64', None if hertz is None else float(hertz))
+
+    @retry(max_retries=2, interval=1)
+    async def offset(self, volts=None):
+        """Get or set the offset used by the generator, Volts."""
+        return await self._get_or_set('offset', 'f64', None if volts is None else float(volts))
+
+    @retry(max_retries=2, interval=1)
+    async def output(self, on=None):
+        """Get or set the output state, on=True -> output on."""
+        return await self._get_or_set('output', 'bool', on)
+
+    @retry(max_retries=2, interval=1)
+    async def upload_arb(self, ary):
+        """Upload an arbitrary waveform to the the function generator, see FunctionGenerator.upload_arb."""
+        if ary.ndim != 1:
+            raise ValueError("array must be of dimension 1")
+        if ary.dtype != 'uint16':
+            raise ValueError("array must be of dtype uint16")
+
+        resp = await aio.post(f'{self.addr}/waveform', ary.tobytes(), root=self.addr)
+        raise_err(resp)
+
+    async def raw(self, cmd):
+        """Raw sends text to the device and returns any response."""
+        resp = await aio.post(f'{self.addr}/raw', json={'str': cmd}, root=self.addr)
+        raise_err(resp)
+        return codec.unwrap(resp, 'str')
+
+
+class AsyncOscilloscope:
+    """Asyncio counterpart of Oscilloscope."""
+
+    def __init__(self, addr):
+        """Create a new AsyncOscilloscope instance, see Oscilloscope."""
+        self.addr = niceaddr(addr)
+
+    async def does_support(self, route):
+        """Return True if the server supports route, else False, see Oscilloscope.does_support."""
+        return await endpoints.asupports(self.addr, route)
+
+    async def _get_or_set(self, route, key, value):
+        url = f'{self.addr}/{route}'
+        if value is None:
+            resp = await aio.get(url, root=self.addr)
+            raise_err(resp)
+            return codec.unwrap(resp, key)
+
+        resp = await aio.post(url, json={key: value}, root=self.addr)
+        raise_err(resp)
+
+    async def scale(self, channel='1', volts_full_scale=None):
+        """Full vertical scale of the oscilloscope, see Oscilloscope.scale."""
+        url = f'{self.addr}/scale'
+        if volts_full_scale is None:
+            resp = await aio.get(url, json={'channel': channel}, root=self.addr)
+            raise_err(resp)
+            return codec.unwrap(resp, 'f64')
+
+        resp = await aio.post(url, json={'scale': float(volts_full_scale), 'channel': channel}, root=self.addr)
+        raise_err(resp)
+
+    async def timebase(self, seconds_full_width=None):
+        """Full horizontal scale of the oscilloscope, seconds."""
+        return await self._get_or_set('timebase', 'f64',
+                                      None if seconds_full_width is None else float(seconds_full_width))
+
+    async def bit_depth(self, bits=None):
+        """Bit depth of the scope acquisition."""
+        return await self._get_or_set('bit-depth', 'int', None if bits is None else int(bits))
+
+    async def sample_rate(self, samples_per_second=None):
+        """Sample rate of the scope acquisition."""
+        return await self._get_or_set('sample-rate', 'int',
+                                      None if samples_per_second is None else int(samples_per_second))
+
+    async def acq_length(self, samples=None):
+        """Length of the scope acquisition, samples."""
+        return await self._get_or_set('acq-length', 'int', None if samples is None else int(samples))
+
+    async def acq_mode(self, mode=None):
+        """Acquisition mode of the scope, nominally "RTIME" for realtime."""
+        return await self._get_or_set('acq-mode', 'str', mode)
+
+    async def acq_waveform(self, channels=('1', '2', '3', '4')):
+        """Acquire a waveform from the scope, see Oscilloscope.acq_waveform."""
+        resp = await aio.get(f'{self.addr}/acq-waveform', json={'channels': channels}, root=self.addr)
+        raise_err(resp)
+        import numpy as np
+        file = io.BytesIO(resp.content)
+        return np.loadtxt(file, skiprows=1, delimiter=',')
+
+    async def raw(self, cmd):
+        """Raw sends text to the device and returns any response."""
+        resp = await aio.post(f'{self.addr}/raw', json={'str': cmd}, root=self.addr)
+        raise_err(resp)
+        return codec.unwrap(resp, 'str')
+
+
+class AsyncDAQ:
+    """Asyncio counterpart of DAQ."""
+
+    def __init__(self, addr):
+        """Create a new AsyncDAQ instance, see DAQ."""
+        self.addr = niceaddr(addr)
+
+    async def does_support(self, route):
+        """Return True if the server supports route, else False, see DAQ.does_support."""
+        return await endpoints.asupports(self.addr, route)
+
+    @retry(max_retries=2, interval=1)
+    async def label(self, channel, label):
+        """Set the label for a given channel."""
+        payload = {'channel': int(channel), 'label': label}
+        resp = await aio.post(f'{self.addr}/channel-label', json=payload, root=self.addr)
+        raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def configure(self, measurement, range_, resolution, channels, dc=True):
+        """Configure the selected channel(s), see DAQ.configure."""
+        if isinstance(channels, int):
+            channels = [channels]
+
+        channels = ','.join((str(e) for e in channels))
+        string = f'*CLS;:CONF:{measurement.upper()}:{"DC" if dc else "AC"} {range_},{resolution}, (@{channels});:SYST:ERROR?'  # NOQA
+        resp = await self.raw(string)
+        if not resp[:2] == "+0":
+            raise Exception(resp)
+
+    async def _get_or_set(self, route, key, value):
+        url = f'{self.addr}/{route}'
+        if value is None:
+            resp = await aio.get(url, root=self.addr)
+            raise_err(resp)
+            return codec.unwrap(resp, key)
+
+        resp = await aio.post(url, json={key: value}, root=self.addr)
+        raise_err(resp)
+
+    @retry(max_retries=2, interval=1)
+    async def sample_rate(self, samples_per_second=None):
+        """Configure the sampling (scan) rate of the DAQ."""
+        return await self._get_or_set('sample-rate', 'f64',
+                                      None if samples_per_second is None else float(samples_per_second))
+
+    @retry(max_retries=2, interval=1)
+    async def recording_channel(self, channel=None):
+        """Get or set the channel used in recording."""
+        return await self._get_or_set('recording-channel', 'int', None if channel is None else int(channel))
+
+    @retry(max_retries=2, interval=1)
+    async def recording_length(self, samples=None):
+        """Get or set the length of a recording in samples."""
+        return await self._get_or_set('recording-length', 'int', None if samples is None else int(samples))
+
+    @retry(max_retries=2, interval=1)
+    async def record(self):
+        """Capture a recording and return the data as a numpy array."""
+        resp = await aio.get(f'{self.addr}/record', root=self.addr)
+        raise_err(resp)
+        import numpy as np
+        src = io.BytesIO(resp.content)
+        return np.loadtxt(src, delimiter=',', skiprows=1)
+
+    @retry(max_retries=2, interval=1)
+    async def raw(self, cmd):
+        """Raw sends text to the device and returns any response."""
+        resp = await aio.post(f'{self.addr}/raw', json={'str': cmd}, root=self.addr)
         raise_err(resp)
-        return resp.json()['str']
+        return codec.unwrap(resp, 'str')